@@ -0,0 +1,366 @@
+"""
+analyzers.py
+Per-test analysis logic shared by the Flask routes and the report orchestrator.
+Each analyzer takes an already fetched session row and returns (payload, status).
+"""
+import numpy as np
+
+from utils.audio import download_audio
+from utils.speech import transcribe_many
+from utils.image import download_image
+from utils.handwriting_batch import score_image
+
+# Dyscalculia
+from utils.features import extract_features as extract_math_features
+from utils.model import predict as predict_math
+
+# Reading (speech)
+from utils.features2 import extract_features as extract_reading_features
+from utils.features2 import combine_features as combine_reading_features
+from utils.model2 import predict as predict_reading
+
+# Emotion
+from utils.features3 import extract_features as extract_emotion_features
+from utils.model3 import predict as predict_emotion
+
+# Test 5 / Test 6
+from utils.features_test5 import extract_features as extract_test5
+from utils.test5_model import predict_test5
+from utils.features_test6 import extract_features as extract_test6_features
+from utils.test6_model import predict_test6
+
+
+# ---------------- Dyscalculia ----------------
+def analyze_dyscalculia(session_id, row):
+    # Raw answers & times
+    q = [0 if x is None else float(x) for x in row[0:6]]
+    t = [0 if x is None else float(x) for x in row[6:12]]
+
+    # ML features + prediction
+    features = extract_math_features(row)
+    result = predict_math(features)
+
+    # ------------------------
+    # Question-wise Analysis
+    # ------------------------
+    questions = [
+        "Counting objects",
+        "Comparing quantities",
+        "Comparing numbers",
+        "Addition",
+        "Money calculation",
+        "Subtraction"
+    ]
+
+    strengths = []
+    weaknesses = []
+    detailed = []
+
+    for i in range(6):
+        speed = "fast" if t[i] < np.mean(t) else "slow"
+
+        entry = {
+            "skill": questions[i],
+            "correct": bool(q[i]),
+            "time": t[i],
+            "performance": "good" if q[i] == 1 and speed == "fast" else
+                           "slow but correct" if q[i] == 1 else
+                           "struggled"
+        }
+
+        detailed.append(entry)
+
+        # Cognitive meaning
+        if q[i] == 1:
+            strengths.append(questions[i])
+        else:
+            weaknesses.append(questions[i])
+
+    # Cognitive style
+    if np.mean(t) > 6:
+        weaknesses.append("Slow mathematical processing")
+    if np.std(t) > 3:
+        weaknesses.append("Inconsistent attention during math")
+
+    return {
+        "session_id": session_id,
+        "prediction": result["prediction"],
+        "confidence": result["confidence"],
+        "probabilities": result["probabilities"],
+
+        "math_profile": {
+            "accuracy": round(np.mean(q), 2),
+            "avg_time": round(np.mean(t), 2),
+            "consistency": round(np.std(t), 2)
+        },
+
+        "question_analysis": detailed,
+
+        "child_strengths": list(set(strengths)),
+        "child_struggles": list(set(weaknesses))
+    }, 200
+
+
+# ---------------- Reading Disability ----------------
+def analyze_reading(session_id, row):
+    # audio URLs
+    audio1 = row[12]
+    audio2 = row[13]
+
+    if not audio1 or not audio2:
+        return {"error": "Missing reading audio"}, 400
+
+    # Download & transcribe
+    f1 = download_audio(audio1)
+    f2 = download_audio(audio2)
+
+    # Both clips run concurrently on the Whisper pool
+    w1, w2 = transcribe_many([f1, f2])
+
+    # Feature extraction per audio
+    ftrs1 = extract_reading_features(w1)
+    ftrs2 = extract_reading_features(w2)
+
+    # Combine for ML
+    combined = combine_reading_features(ftrs1, ftrs2)
+
+    # ML prediction
+    result = predict_reading(combined)
+
+    # ---------------- Interpretation ----------------
+    strengths = []
+    weaknesses = []
+
+    # Audio 1 (simple reading)
+    if ftrs1["wpm"] < 80:
+        weaknesses.append("Slow word decoding")
+    else:
+        strengths.append("Good basic reading speed")
+
+    if ftrs1["avg_pause"] > 0.6:
+        weaknesses.append("Hesitates between words")
+    else:
+        strengths.append("Smooth word flow")
+
+    # Audio 2 (paragraph reading)
+    if ftrs2["pause_count"] > 5:
+        weaknesses.append("Poor reading stamina (many long pauses)")
+    else:
+        strengths.append("Good reading endurance")
+
+    if ftrs2["max_pause"] > 2.5:
+        weaknesses.append("Loses place while reading")
+
+    if ftrs2["wpm"] < ftrs1["wpm"] * 0.7:
+        weaknesses.append("Fluency drops in longer text (working memory issue)")
+
+    return {
+        "session_id": session_id,
+
+        "audio_1_features": ftrs1,
+        "audio_2_features": ftrs2,
+
+        "combined_features": combined,
+
+        "reading_risk": result["status"],
+        "LD_score": round(result["LD_score"], 4),
+        "threshold": result["threshold"],
+
+        "child_strengths": list(set(strengths)),
+        "child_struggles": list(set(weaknesses))
+    }, 200
+
+
+# ---------------- Emotion ----------------
+def analyze_emotion(session_id, row):
+    features = extract_emotion_features(row)
+    result = predict_emotion(features)
+
+    q1, q2, q3, q4, t1, t2, t3, t4 = features
+
+    emotions = ["Happiness", "Sadness", "Anger", "Distress"]
+    answers = [q1, q2, q3, q4]
+    times = [t1, t2, t3, t4]
+
+    strengths = []
+    weaknesses = []
+    details = []
+
+    avg_time = sum(times) / 4
+
+    for i in range(4):
+        emotion = emotions[i]
+
+        if answers[i] == 1:
+            strengths.append(f"Recognizes {emotion.lower()}")
+        else:
+            weaknesses.append(f"Struggles to recognize {emotion.lower()}")
+
+        speed = "slow" if times[i] > avg_time else "normal"
+
+        details.append({
+            "emotion": emotion,
+            "correct": bool(answers[i]),
+            "reaction_time": round(times[i], 2),
+            "speed": speed
+        })
+
+    # High-level social insight
+    if sum(answers) <= 2:
+        weaknesses.append("Weak emotional recognition (possible social perception difficulty)")
+
+    if max(times) > 4:
+        weaknesses.append("Slow emotional processing")
+
+    return {
+        "session_id": session_id,
+
+        "emotion_prediction": result,
+
+        "question_analysis": details,
+
+        "child_strengths": list(set(strengths)),
+        "child_struggles": list(set(weaknesses))
+    }, 200
+
+
+# ---------------- Test 6 : Visual + Memory + Logic ----------------
+def analyze_test6(session_id, row):
+    # Raw scores and times
+    scores = [0 if x is None else int(x) for x in row[22:26]]
+    times  = [8 if x is None else float(x) for x in row[26:30]]
+
+    # ML features
+    features = extract_test6_features(row)
+
+    # ML prediction
+    prediction = predict_test6(features)
+
+    strengths = []
+    weaknesses = []
+
+    # Memory
+    if scores[1] == 1:
+        strengths.append("Strong visual working memory (can remember images well)")
+    else:
+        weaknesses.append("Weak image memory (forgets visual information)")
+
+    # Spatial (mirror)
+    if scores[2] == 1:
+        strengths.append("Good visual-spatial ability")
+    else:
+        weaknesses.append("Mirror image confusion (spatial processing weak)")
+
+    # Pattern
+    if scores[3] == 1:
+        strengths.append("Strong pattern and logical reasoning")
+    else:
+        weaknesses.append("Difficulty understanding patterns and sequences")
+
+    # Processing speed
+    avg_time = np.mean(times)
+    if avg_time < 4:
+        strengths.append("Fast thinking and response speed")
+    else:
+        weaknesses.append("Slow cognitive processing")
+
+    # Attention stability
+    if np.std(times) > 1.5:
+        weaknesses.append("Inconsistent attention during tasks")
+
+    return {
+        "session_id": session_id,
+        "test6_scores": {
+            "odd_one_out": scores[0],
+            "memory": scores[1],
+            "mirror": scores[2],
+            "pattern": scores[3]
+        },
+        "test6_times": {
+            "odd_one_out": times[0],
+            "memory": times[1],
+            "mirror": times[2],
+            "pattern": times[3]
+        },
+        "cognitive_prediction": prediction,
+        "strengths": strengths,
+        "weaknesses": weaknesses
+    }, 200
+
+
+# ---------------- Handwriting Geometry ----------------
+def analyze_handwriting_session(session_id, row):
+    image_url = row[14]
+    if not image_url:
+        return {"error": "No handwriting image found"}, 400
+
+    image_bytes = download_image(image_url)
+    score, diagnosis = score_image(image_bytes)
+
+    strengths = []
+    weaknesses = []
+
+    if diagnosis == "NORMAL":
+        strengths.append("Good handwriting structure")
+        strengths.append("Strong fine motor control")
+    elif diagnosis == "MILD IRREGULARITY":
+        weaknesses.append("Inconsistent spacing between lines")
+        weaknesses.append("Handwriting still developing")
+    else:
+        weaknesses.append("Poor motor planning while writing")
+        weaknesses.append("Possible dysgraphia (writing difficulty)")
+
+    if score > 0.7:
+        weaknesses.append("Visual-motor coordination difficulty")
+
+    return {
+        "session_id": session_id,
+        "handwriting_risk": diagnosis,
+        "risk_score": round(score,3),
+
+        "child_strengths": strengths,
+        "child_struggles": weaknesses
+    }, 200
+
+
+# ---------------- Test 5 : Auditory Processing ----------------
+def analyze_test5(session_id, row):
+    feats = extract_test5(row)
+
+    pred = predict_test5(feats)
+
+    mean_rt, var, missed, impulsive, slow, q2t, q2s, q3t, q3s = feats
+
+    strengths=[]
+    weaknesses=[]
+
+    if missed > 2:
+        weaknesses.append("Poor sustained attention (missed beeps)")
+    if impulsive > 2:
+        weaknesses.append("High impulsivity (clicked before hearing sound)")
+    if slow > 2:
+        weaknesses.append("Very slow auditory responses (auditory processing weakness)")
+    if q3s == 0:
+        weaknesses.append("Poor phoneme discrimination (dyslexia marker)")
+    if q2s == 0:
+        weaknesses.append("Weak auditory word comprehension")
+
+    if mean_rt < 350:
+        strengths.append("Fast auditory reaction")
+    if q3s == 1:
+        strengths.append("Good sound discrimination")
+    if q2s == 1:
+        strengths.append("Good spoken word understanding")
+
+    return {
+        "prediction": pred,
+        "features": {
+            "mean_reaction_time": mean_rt,
+            "reaction_variability": var,
+            "missed_beeps": missed,
+            "impulsivity": impulsive,
+            "slow_responses": slow
+        },
+        "strengths": strengths,
+        "weaknesses": weaknesses
+    }, 200
@@ -0,0 +1,60 @@
+"""
+batch_scoring.py
+Scores many sessions at once: one DB query, one feature matrix and one
+model call per test. Used for cohort re-scoring after a model update.
+"""
+from utils.fetch import fetch_sessions
+
+from utils.features import extract_features_batch as extract_math_batch
+from utils.model import predict_batch as predict_math_batch
+from utils.features3 import extract_features_batch as extract_emotion_batch
+from utils.model3 import predict_batch as predict_emotion_batch
+from utils.features_test5 import extract_features_batch as extract_test5_batch
+from utils.test5_model import predict_test5_batch
+from utils.features_test6 import extract_features_batch as extract_test6_batch
+from utils.test6_model import predict_test6_batch
+from utils.handwriting_batch import predict_handwriting_batch
+
+
+def extract_handwriting_batch(rows):
+    return [row[14] for row in rows]   # test3_image URL
+
+
+# Same keys as the full report. Tabular tests are one model call;
+# handwriting downloads concurrently and scores in a process pool.
+BATCH_MODULES = {
+    "math": (extract_math_batch, predict_math_batch),
+    "emotion": (extract_emotion_batch, predict_emotion_batch),
+    "hearing": (extract_test5_batch, predict_test5_batch),
+    "cognition": (extract_test6_batch, predict_test6_batch),
+    "handwriting": (extract_handwriting_batch, predict_handwriting_batch),
+}
+
+
+def score_sessions(session_ids, modules=None):
+    """
+    Returns (results, missing):
+    results = {session_id: {module: prediction}}, missing = ids not in the DB
+    """
+    modules = modules or list(BATCH_MODULES)
+    unknown = [m for m in modules if m not in BATCH_MODULES]
+    if unknown:
+        raise ValueError(f"Unsupported batch modules: {unknown}")
+
+    rows_by_id = fetch_sessions(session_ids)
+
+    ids = [str(sid) for sid in session_ids if str(sid) in rows_by_id]
+    missing = [str(sid) for sid in session_ids if str(sid) not in rows_by_id]
+    rows = [rows_by_id[sid] for sid in ids]
+
+    results = {sid: {} for sid in ids}
+    if not rows:
+        return results, missing
+
+    for name in modules:
+        extract, predict = BATCH_MODULES[name]
+        predictions = predict(extract(rows))
+        for sid, pred in zip(ids, predictions):
+            results[sid][name] = pred
+
+    return results, missing
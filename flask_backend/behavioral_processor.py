@@ -2,75 +2,250 @@
 behavioral_processor.py
 Extracts biometric features from raw HID (Human Interface Device) logs.
 """
+import math
+import heapq
 import numpy as np
 
+# Columnar log layouts accepted besides lists of tuples
+MOUSE_DTYPE = np.dtype([("t", np.float64), ("x", np.float64), ("y", np.float64)])
+KEY_DTYPE = np.dtype([("t", np.float64), ("key", "U32"), ("event", "U8")])
+
+IDLE_VELOCITY = 0.1   # Pixel per ms threshold
+
+
+def _columns(logs, dtype):
+    """
+    Splits a log into column arrays: structured array / dict of arrays by
+    field name, list of tuples by position (packed into dtype first).
+    """
+    if not (isinstance(logs, dict) or getattr(getattr(logs, "dtype", None), "names", None)):
+        logs = np.fromiter(map(tuple, logs), dtype=dtype, count=len(logs))
+    return [np.asarray(logs[name]) for name in dtype.names]
+
+
 class BehavioralProcessor:
     def __init__(self):
         pass
 
     def process_keystrokes(self, key_logs):
         """
-        key_logs: list of (timestamp, key, event_type)
+        key_logs: list of (timestamp, key, event_type), or columns with
+        fields t / key / event (KEY_DTYPE structured array or dict)
         Returns: {flight_time_var, error_rate, dwell_time_avg}
         """
-        if not key_logs:
+        if len(key_logs) == 0:
             return {"flight_time_var": 0, "error_rate": 0, "dwell_time_avg": 0}
 
-        # Calculate Flight Time (Time between Release A and Press B)
-        flight_times = []
-        dwell_times = []
-        errors = 0
-        
-        for i in range(1, len(key_logs)):
-            t1, k1, evt1 = key_logs[i-1]
-            t2, k2, evt2 = key_logs[i]
-            
-            # Simple dwell calculation (approximate for simulation)
-            if evt1 == "PRESS" and evt2 == "RELEASE" and k1 == k2:
-                dwell_times.append(t2 - t1)
-            
-            # Flight time
-            flight_times.append(t2 - t1)
-
-            if k2 == "BACKSPACE":
-                errors += 1
+        t, keys, events = _columns(key_logs, KEY_DTYPE)
+
+        # Flight time: gap between consecutive events
+        flight_times = np.diff(t)
+
+        # Simple dwell calculation (approximate for simulation)
+        dwell_mask = (events[:-1] == "PRESS") & (events[1:] == "RELEASE") & (keys[:-1] == keys[1:])
+        dwell_times = flight_times[dwell_mask]
+
+        errors = np.count_nonzero(keys[1:] == "BACKSPACE")
 
         return {
-            "flight_time_var": np.var(flight_times) if flight_times else 0,
-            "dwell_time_avg": np.mean(dwell_times) if dwell_times else 0,
-            "error_rate": errors / len(key_logs) if len(key_logs) > 0 else 0
+            "flight_time_var": np.var(flight_times) if len(flight_times) else 0,
+            "dwell_time_avg": np.mean(dwell_times) if len(dwell_times) else 0,
+            "error_rate": errors / len(t)
         }
 
     def process_mouse(self, mouse_logs):
         """
-        mouse_logs: list of (timestamp, x, y)
+        mouse_logs: list of (timestamp, x, y), or columns with fields t / x / y
+        (MOUSE_DTYPE structured array or dict)
         Returns: {velocity_avg, jerk_avg, idle_ratio}
         """
         if len(mouse_logs) < 2:
             return {"velocity_avg": 0, "jerk_avg": 0, "idle_ratio": 1.0}
 
-        velocities = []
-        idle_frames = 0
-        
-        for i in range(1, len(mouse_logs)):
-            t1, x1, y1 = mouse_logs[i-1]
-            t2, x2, y2 = mouse_logs[i]
-            
-            dt = (t2 - t1) if (t2 - t1) > 0 else 0.001
-            dist = np.sqrt((x2-x1)**2 + (y2-y1)**2)
-            vel = dist / dt
-            
-            if vel < 0.1: # Pixel per ms threshold
-                idle_frames += 1
-                
-            velocities.append(vel)
+        t, x, y = _columns(mouse_logs, MOUSE_DTYPE)
+
+        dt = np.diff(t)
+        dt = np.where(dt > 0, dt, 0.001)
+        velocities = np.sqrt(np.diff(x) ** 2 + np.diff(y) ** 2) / dt
+
+        idle_frames = np.count_nonzero(velocities < IDLE_VELOCITY)
 
         # Jerk is rate of change of acceleration (2nd derivative of velocity)
-        accelerations = np.diff(velocities)
-        jerks = np.diff(accelerations)
+        jerks = np.diff(velocities, n=2)
 
         return {
             "velocity_avg": np.mean(velocities),
             "jerk_avg": np.mean(np.abs(jerks)) if len(jerks) > 0 else 0,
-            "idle_ratio": idle_frames / len(mouse_logs)
-        }
\ No newline at end of file
+            "idle_ratio": idle_frames / len(t)
+        }
+
+
+MOUSE_DEFAULTS = {"velocity_avg": 0, "jerk_avg": 0, "idle_ratio": 1.0}
+KEY_DEFAULTS = {"flight_time_var": 0, "error_rate": 0, "dwell_time_avg": 0}
+BEHAVIOR_WINDOW = 5000   # ms, same time unit as the HID logs
+
+
+class _Pane:
+    """Running sums for one hop-sized slice of time."""
+
+    __slots__ = ("m_events", "v_sum", "v_n", "idle", "j_sum", "j_n",
+                 "k_events", "f_n", "f_mean", "f_m2", "d_sum", "d_n", "errors")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+class BehaviorStream:
+    """
+    Incremental BehavioralProcessor over time windows of the HID stream.
+    Events are added as they arrive, in time order. Each window is made of
+    hop-sized panes of running sums (Welford for flight time), so memory is
+    O(window / hop) however long the session is. hop=None gives tumbling
+    windows (hop = window).
+
+    A pair of consecutive events (velocity, flight time) belongs to the
+    window of its later event, and jerk uses the continuous velocity
+    sequence, so one window spanning the whole log gives the same numbers
+    as process_mouse / process_keystrokes.
+    """
+
+    def __init__(self, window=BEHAVIOR_WINDOW, hop=None, start=0):
+        self.hop = hop or window
+        self.n_panes = max(1, int(round(window / self.hop)))
+        self.start = start
+        self.pane_idx = 0
+        self.pane = _Pane()
+        self.recent = []        # last n_panes - 1 closed panes
+        self.windows = []       # (window_end, features) emitted so far
+
+        self._last_mouse = None      # (t, x, y)
+        self._velocities = []        # last two velocities, for jerk
+        self._last_key = None        # (t, key, event)
+
+    def _roll(self, t):
+        """Closes every pane that ends at or before t, emitting their windows."""
+        idx = int((t - self.start) // self.hop)
+        while self.pane_idx < idx:
+            panes = self.recent + [self.pane]
+            self.pane_idx += 1
+            self.windows.append((self.start + self.pane_idx * self.hop, self._features(panes)))
+            self.recent = panes[-(self.n_panes - 1):] if self.n_panes > 1 else []
+            self.pane = _Pane()
+
+    def add_mouse(self, t, x, y):
+        self._roll(t)
+        p = self.pane
+        p.m_events += 1
+
+        if self._last_mouse is not None:
+            t1, x1, y1 = self._last_mouse
+            dt = (t - t1) if (t - t1) > 0 else 0.001
+            vel = math.sqrt((x - x1) ** 2 + (y - y1) ** 2) / dt
+            p.v_sum += vel
+            p.v_n += 1
+            if vel < IDLE_VELOCITY:
+                p.idle += 1
+
+            self._velocities = (self._velocities + [vel])[-3:]
+            if len(self._velocities) == 3:
+                v0, v1, v2 = self._velocities
+                p.j_sum += abs((v2 - v1) - (v1 - v0))
+                p.j_n += 1
+
+        self._last_mouse = (t, x, y)
+
+    def add_key(self, t, key, event):
+        self._roll(t)
+        p = self.pane
+        p.k_events += 1
+
+        if self._last_key is not None:
+            t1, k1, evt1 = self._last_key
+            flight = t - t1
+            p.f_n += 1
+            delta = flight - p.f_mean
+            p.f_mean += delta / p.f_n
+            p.f_m2 += delta * (flight - p.f_mean)
+
+            if evt1 == "PRESS" and event == "RELEASE" and k1 == key:
+                p.d_sum += flight
+                p.d_n += 1
+            if key == "BACKSPACE":
+                p.errors += 1
+
+        self._last_key = (t, key, event)
+
+    def advance(self, t):
+        """Moves the clock to t (e.g. the current frame time) without an event."""
+        self._roll(t)
+
+    def flush(self):
+        """Emits the window ending with the current (partial) pane."""
+        self._roll(self.start + (self.pane_idx + 1) * self.hop)
+        return self.windows
+
+    @staticmethod
+    def _features(panes):
+        feats = dict(MOUSE_DEFAULTS, **KEY_DEFAULTS)
+
+        m_events = sum(p.m_events for p in panes)
+        v_n = sum(p.v_n for p in panes)
+        if v_n:
+            j_n = sum(p.j_n for p in panes)
+            feats["velocity_avg"] = sum(p.v_sum for p in panes) / v_n
+            feats["jerk_avg"] = sum(p.j_sum for p in panes) / j_n if j_n else 0
+            feats["idle_ratio"] = sum(p.idle for p in panes) / m_events
+
+        k_events = sum(p.k_events for p in panes)
+        if k_events:
+            # Chan et al. merge of the per-pane flight time Welford stats
+            n, mean, m2 = 0, 0.0, 0.0
+            for p in panes:
+                if p.f_n:
+                    total = n + p.f_n
+                    delta = p.f_mean - mean
+                    mean += delta * p.f_n / total
+                    m2 += p.f_m2 + delta ** 2 * n * p.f_n / total
+                    n = total
+            d_n = sum(p.d_n for p in panes)
+            feats["flight_time_var"] = m2 / n if n else 0
+            feats["dwell_time_avg"] = sum(p.d_sum for p in panes) / d_n if d_n else 0
+            feats["error_rate"] = sum(p.errors for p in panes) / k_events
+
+        return feats
+
+
+def stream_windows(mouse_logs=(), key_logs=(), window=BEHAVIOR_WINDOW, hop=None, start=0):
+    """
+    Runs both logs (each in time order) through one BehaviorStream, merged
+    by timestamp. Returns the list of (window_end, features).
+    """
+    stream = BehaviorStream(window, hop, start)
+    mouse = ((row[0], 0, row) for row in mouse_logs)
+    keys = ((row[0], 1, row) for row in key_logs)
+
+    for _, kind, row in heapq.merge(mouse, keys, key=lambda e: (e[0], e[1])):
+        if kind == 0:
+            stream.add_mouse(*row)
+        else:
+            stream.add_key(*row)
+
+    return stream.flush()
+
+
+def features_for_times(windows, times):
+    """
+    Joins per-window features onto sample times (e.g. video frames, same
+    time unit as the logs): each time gets the first window ending at or
+    after it, i.e. the latest window that contains it. Returns a dict of
+    (n,) arrays ready for MetricsEngine.compute_arrays.
+    """
+    keys = list(MOUSE_DEFAULTS) + list(KEY_DEFAULTS)
+    if not windows:
+        return {k: np.full(len(times), float(dict(MOUSE_DEFAULTS, **KEY_DEFAULTS)[k])) for k in keys}
+
+    ends = np.array([end for end, _ in windows])
+    idx = np.minimum(np.searchsorted(ends, times, side="left"), len(windows) - 1)
+    table = {k: np.array([feats[k] for _, feats in windows], dtype=np.float64) for k in keys}
+    return {k: col[idx] for k, col in table.items()}
@@ -0,0 +1,86 @@
+"""
+Soak test for the in-memory audio ingestion path.
+
+Serves one clip from a local HTTP server and runs N reading-style requests
+(two downloads each) through utils.audio.download_audio, then decodes
+both clips to PCM the way faster-whisper does. Every --report requests
+it prints RSS and the number/size of files in the temp directory; both
+should stay flat.
+
+Run from flask_backend/:
+    python -m benchmarks.audio_soak path/to/clip.webm --requests 10000
+    python -m benchmarks.audio_soak clip.webm --transcribe   # full Whisper path (cache hits after the first)
+"""
+import os
+import argparse
+import tempfile
+import threading
+from functools import partial
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+
+from faster_whisper import decode_audio
+
+from utils.audio import download_audio
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024   # peak, not current
+
+
+def tempdir_usage():
+    root = tempfile.gettempdir()
+    count, size = 0, 0
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            count += 1
+            size += os.path.getsize(path)
+    return count, size / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("clip")
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--report", type=int, default=1000)
+    parser.add_argument("--transcribe", action="store_true")
+    args = parser.parse_args()
+
+    directory, filename = os.path.split(os.path.abspath(args.clip))
+    server = HTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/{filename}"
+
+    if args.transcribe:
+        from utils.speech import transcribe_many
+
+    print(f"{'requests':>9} {'rss MB':>8} {'tmp files':>10} {'tmp MB':>8}")
+    for i in range(1, args.requests + 1):
+        clips = [download_audio(url), download_audio(url)]
+
+        if args.transcribe:
+            transcribe_many(clips)
+        else:
+            for clip in clips:
+                decode_audio(clip)
+
+        if i == 1 or i % args.report == 0:
+            files, mb = tempdir_usage()
+            print(f"{i:>9} {rss_mb():>8.1f} {files:>10} {mb:>8.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+BehavioralProcessor: vectorized process_mouse / process_keystrokes vs the
+original per-event loops (kept below as the reference).
+
+For each size, builds a synthetic mouse log and keystroke log, checks the
+vectorized results equal the loop results for list input and for columnar
+(structured array) input, and reports timings. Above --loop-max only the
+columnar path runs (the Python row lists alone would need several GB).
+
+Run from flask_backend/:
+    python -m benchmarks.behavior_logs
+    python -m benchmarks.behavior_logs --sizes 1000 100000 --loop-max 100000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from behavioral_processor import BehavioralProcessor, MOUSE_DTYPE, KEY_DTYPE
+
+KEYS = ["A", "S", "D", "F", "SPACE", "BACKSPACE"]
+
+
+def reference_keystrokes(key_logs):
+    if not key_logs:
+        return {"flight_time_var": 0, "error_rate": 0, "dwell_time_avg": 0}
+    flight_times, dwell_times, errors = [], [], 0
+    for i in range(1, len(key_logs)):
+        t1, k1, evt1 = key_logs[i-1]
+        t2, k2, evt2 = key_logs[i]
+        if evt1 == "PRESS" and evt2 == "RELEASE" and k1 == k2:
+            dwell_times.append(t2 - t1)
+        flight_times.append(t2 - t1)
+        if k2 == "BACKSPACE":
+            errors += 1
+    return {
+        "flight_time_var": np.var(flight_times) if flight_times else 0,
+        "dwell_time_avg": np.mean(dwell_times) if dwell_times else 0,
+        "error_rate": errors / len(key_logs) if len(key_logs) > 0 else 0
+    }
+
+
+def reference_mouse(mouse_logs):
+    if len(mouse_logs) < 2:
+        return {"velocity_avg": 0, "jerk_avg": 0, "idle_ratio": 1.0}
+    velocities, idle_frames = [], 0
+    for i in range(1, len(mouse_logs)):
+        t1, x1, y1 = mouse_logs[i-1]
+        t2, x2, y2 = mouse_logs[i]
+        dt = (t2 - t1) if (t2 - t1) > 0 else 0.001
+        vel = np.sqrt((x2-x1)**2 + (y2-y1)**2) / dt
+        if vel < 0.1:
+            idle_frames += 1
+        velocities.append(vel)
+    jerks = np.diff(np.diff(velocities))
+    return {
+        "velocity_avg": np.mean(velocities),
+        "jerk_avg": np.mean(np.abs(jerks)) if len(jerks) > 0 else 0,
+        "idle_ratio": idle_frames / len(mouse_logs)
+    }
+
+
+def make_logs(n, seed=0):
+    rng = np.random.default_rng(seed)
+
+    mouse = np.zeros(n, dtype=MOUSE_DTYPE)
+    mouse["t"] = np.cumsum(rng.choice([0, 8, 16, 17], n, p=[0.02, 0.48, 0.4, 0.1]))   # ms, some repeats
+    still = rng.random(n) < 0.3
+    mouse["x"] = np.cumsum(np.where(still, 0, rng.normal(0, 4, n)))
+    mouse["y"] = np.cumsum(np.where(still, 0, rng.normal(0, 4, n)))
+
+    keys = np.zeros(n, dtype=KEY_DTYPE)
+    keys["t"] = np.cumsum(rng.exponential(0.12, n))
+    pressed = rng.choice(KEYS, (n + 1) // 2, p=[0.2, 0.2, 0.2, 0.2, 0.15, 0.05])
+    keys["key"] = np.repeat(pressed, 2)[:n]
+    keys["event"] = np.tile(["PRESS", "RELEASE"], (n + 1) // 2)[:n]
+    return mouse, keys
+
+
+def timed(fn, logs):
+    start = time.perf_counter()
+    out = fn(logs)
+    return out, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000, 10000000])
+    parser.add_argument("--loop-max", type=int, default=1000000)
+    args = parser.parse_args()
+    proc = BehavioralProcessor()
+
+    print(f"{'log':<6} {'events':>9} {'loop s':>8} {'list s':>8} {'array s':>8} {'speed-up':>9} {'match':>6}")
+    for n in args.sizes:
+        mouse, keys = make_logs(n)
+        cases = [
+            ("mouse", reference_mouse, proc.process_mouse, mouse),
+            ("keys", reference_keystrokes, proc.process_keystrokes, keys),
+        ]
+        for name, reference, vectorized, columns in cases:
+            from_array, t_array = timed(vectorized, columns)
+
+            if n <= args.loop_max:
+                rows = columns.tolist()   # list of (t, ...) tuples, as the old callers passed
+                from_list, t_list = timed(vectorized, rows)
+                assert from_list == from_array, f"{name}: list and columnar input disagree"
+                ref, t_loop = timed(reference, rows)
+                match = "yes" if ref == from_list else "NO"
+                print(f"{name:<6} {n:>9} {t_loop:>8.3f} {t_list:>8.3f} {t_array:>8.4f} {t_loop / t_array:>8.0f}x {match:>6}")
+            else:
+                print(f"{name:<6} {n:>9} {'-':>8} {'-':>8} {t_array:>8.4f} {'-':>9} {'-':>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+EEG synthesis: per-epoch generate_epoch loop vs vectorized generate_epochs.
+
+Times both paths per state and compares per-band mean and std of the
+generated powers (the two paths use different random streams, so they
+should agree statistically, not value by value).
+
+Run from flask_backend/:
+    python -m benchmarks.eeg_synthesis
+    python -m benchmarks.eeg_synthesis --epochs 1000000 --loop-epochs 100000
+"""
+import time
+import random
+import argparse
+
+import numpy as np
+
+from signal_generator import EEGSimulator, BAND_NAMES, STATE_NAMES
+
+
+def run_loop(n, state):
+    sim = EEGSimulator()
+    start = time.perf_counter()
+    rows = [sim.generate_epoch(state=state) for _ in range(n)]
+    secs = time.perf_counter() - start
+    return np.array([[r[b] for b in BAND_NAMES] for r in rows]), secs
+
+
+def run_vectorized(n, state, seed):
+    sim = EEGSimulator(seed=seed)
+    start = time.perf_counter()
+    epochs = np.concatenate(list(sim.stream_epochs(n, state)))
+    return epochs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int, default=1000000)
+    parser.add_argument("--loop-epochs", type=int, default=100000, help="loop is extrapolated above this")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f"{'state':<11} {'loop s*':>9} {'vector s':>9} {'speed-up':>9} {'max |d mean|%':>14} {'max |d std|%':>13}")
+    for state in STATE_NAMES:
+        ref, t_loop = run_loop(min(args.epochs, args.loop_epochs), state)
+        t_loop *= args.epochs / len(ref)
+
+        out, t_vec = run_vectorized(args.epochs, state, args.seed)
+        assert out.shape == (args.epochs, len(BAND_NAMES)) and out.dtype == np.float32
+
+        d_mean = np.max(np.abs(out.mean(0) - ref.mean(0)) / ref.mean(0)) * 100
+        d_std = np.max(np.abs(out.std(0) - ref.std(0)) / ref.std(0)) * 100
+        print(f"{state:<11} {t_loop:>9.2f} {t_vec:>9.3f} {t_loop / t_vec:>8.0f}x {d_mean:>14.2f} {d_std:>13.2f}")
+
+    print("\n* loop time extrapolated from --loop-epochs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Raw EEG path benchmark: simulated 256 Hz samples -> Welch band powers.
+
+1. Recovery: per state, mean band power from the stream vs the target
+   PSD (BASE_POWERS x state gain), and the resulting theta/beta ratio.
+   With 1 Hz Welch bins the 2 Hz wide bands pick up leakage from their
+   neighbours, so expect roughly +-10-20% on the narrow bands.
+2. Throughput: band_powers on a large batch of windows, reported as
+   windows per second of CPU time (single core).
+3. Latency: 1 s pushes into EEGStream, per-push time p50/p99/max.
+4. Long push: one push longer than buffer_sec gives the same band
+   powers as 1 s pushes of the same samples.
+
+Run from flask_backend/:
+    python -m benchmarks.eeg_welch
+    python -m benchmarks.eeg_welch --minutes 10 --windows 200000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from config import BASE_POWERS, SAMPLING_RATE
+from signal_generator import BAND_NAMES, STATE_GAINS
+from eeg_stream import RawEEGSimulator, EEGStream, band_powers, sliding_windows
+from metrics_engine import MetricsEngine
+
+BEHAVIOR = {'velocity_avg': 0.8, 'jerk_avg': 0.2, 'idle_ratio': 0.1, 'flight_time_var': 150, 'error_rate': 0.02}
+VISION = {'yaw_velocity': 0.0, 'gaze_deviation': 0.0}
+
+
+def recovery(minutes, seed):
+    print(f"{'state':<11} " + " ".join(f"{b[:9]:>9}" for b in BAND_NAMES) + f" {'tbr':>6} {'tbr ref':>7}")
+    for state in ["NEUTRAL"] + list(STATE_GAINS):
+        sim, stream = RawEEGSimulator(seed=seed), EEGStream()
+        gains = STATE_GAINS.get(state, {})
+        target = np.array([BASE_POWERS[b] * gains.get(b, 1.0) for b in BAND_NAMES])
+
+        chunks = [stream.push(sim.generate(SAMPLING_RATE, state)) for _ in range(minutes * 60)]
+        powers = np.concatenate(chunks)
+        err = (powers.mean(0) - target) / target * 100
+
+        eeg = {b: powers[:, i] for i, b in enumerate(BAND_NAMES)}
+        tbr = MetricsEngine.compute_arrays(eeg, BEHAVIOR, VISION)["theta_beta_ratio"].mean()
+        ref = MetricsEngine.compute_all(dict(zip(BAND_NAMES, target)), BEHAVIOR, VISION)["theta_beta_ratio"]
+        print(f"{state:<11} " + " ".join(f"{e:>+8.1f}%" for e in err) + f" {tbr:>6.2f} {ref:>7.2f}")
+
+
+def throughput(n_windows, seed):
+    stream = EEGStream()
+    samples = RawEEGSimulator(seed=seed).generate(stream.window + (n_windows - 1) * stream.hop)
+    windows = sliding_windows(samples, stream.window, stream.hop)
+
+    start = time.process_time()
+    band_powers(windows)
+    cpu = time.process_time() - start
+    print(f"\n{len(windows)} windows of {stream.window} samples: {len(windows) / cpu:,.0f} windows/s per core")
+
+
+def latency(minutes, seed):
+    sim, stream = RawEEGSimulator(seed=seed), EEGStream()
+    pushes = [sim.generate(SAMPLING_RATE) for _ in range(minutes * 60)]
+    times = []
+    for chunk in pushes:
+        start = time.perf_counter()
+        stream.push_metrics(chunk, BEHAVIOR, VISION)
+        times.append((time.perf_counter() - start) * 1000)
+    p50, p99 = np.percentile(times, [50, 99])
+    print(f"1 s pushes -> metrics: p50 {p50:.3f} ms, p99 {p99:.3f} ms, max {max(times):.3f} ms")
+
+
+def long_push(seed):
+    stream = EEGStream()
+    samples = RawEEGSimulator(seed=seed).generate(3 * stream.buffer.capacity + 77)
+    once = stream.push(samples)
+
+    chunked = EEGStream()
+    parts = [chunked.push(samples[i:i + SAMPLING_RATE]) for i in range(0, len(samples), SAMPLING_RATE)]
+    expected = np.concatenate(parts)
+    ok = once.shape == expected.shape and np.allclose(once, expected)
+    print(f"one {len(samples) / SAMPLING_RATE:.0f} s push (buffer {stream.buffer.capacity / SAMPLING_RATE:.0f} s): "
+          f"{len(once)} windows, {'PASS' if ok else 'FAIL'}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, default=5)
+    parser.add_argument("--windows", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    recovery(args.minutes, args.seed)
+    throughput(args.windows, args.seed)
+    latency(args.minutes, args.seed)
+    long_push(args.seed)
+
+
+if __name__ == "__main__":
+    main()
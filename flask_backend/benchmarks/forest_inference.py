@@ -0,0 +1,70 @@
+"""
+RandomForest inference: sklearn predict_proba vs the fused FlatForest.
+
+For each screener model, times predict_proba at batch sizes 1, 64, 512
+and 4096 (median of --repeats) on both backends and checks the
+probabilities and predicted labels are bit-identical. Batches above
+FOREST_FLAT_MAX_ROWS go back to sklearn ("path" column); raise it to
+time the flat traversal on large batches. Inputs are random rows scaled
+like the features, small integer rows that hit exact thresholds and
+rows with NaN features (routed like sklearn's missing_go_to_left).
+
+Run from flask_backend/:
+    python -m benchmarks.forest_inference
+    python -m benchmarks.forest_inference --models dysgraphia --batches 1 4096
+"""
+import time
+import argparse
+import warnings
+
+import joblib
+import numpy as np
+
+from utils.forest import FLAT_MAX_ROWS, FlatForest
+
+MODELS = ["dysgraphia", "emotion_model", "test5_model", "test6_model"]
+
+
+def median_ms(fn, X, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--models", nargs="+", default=MODELS)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 64, 512, 4096])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")   # sklearn version / feature-name warnings
+    rng = np.random.default_rng(0)
+
+    print(f"{'model':<14} {'trees':>5} {'batch':>6} {'sklearn ms':>11} {'flat ms':>9} {'speed-up':>9} {'identical':>10} {'path':>8}")
+    for name in args.models:
+        model = joblib.load(f"models/{name}.pkl")
+        start = time.perf_counter()
+        flat = FlatForest(model)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        nf = model.n_features_in_
+        for batch in args.batches:
+            X = rng.normal(0, 1, (batch, nf)) * rng.uniform(0.1, 100, nf)
+            X[::2] = rng.integers(0, 5, (len(X[::2]), nf))
+            # Unanswered questions reach the models as NaN (utils/features.py)
+            X[1::4] = np.where(rng.random((len(X[1::4]), nf)) < 0.3, np.nan, X[1::4])
+
+            same = (np.array_equal(model.predict_proba(X), flat.predict_proba(X))
+                    and np.array_equal(model.predict(X), flat.predict(X)))
+            t_sk = median_ms(model.predict_proba, X, args.repeats)
+            t_flat = median_ms(flat.predict_proba, X, args.repeats)
+            print(f"{name:<14} {flat.n_trees:>5} {batch:>6} {t_sk:>11.2f} {t_flat:>9.2f} "
+                  f"{t_sk / t_flat:>8.1f}x {str(same):>10} {'flat' if batch <= FLAT_MAX_ROWS else 'sklearn':>8}")
+        print(f"{'':<14} flatten at load: {build_ms:.0f} ms\n")
+
+
+if __name__ == "__main__":
+    main()
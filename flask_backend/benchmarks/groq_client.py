@@ -0,0 +1,126 @@
+"""
+Groq client against the local stub: retries, rate limiting, streaming
+and schema validation. Each scenario prints PASS/FAIL with what it saw,
+then a backlog drain compares the token bucket with an unlimited client.
+
+  - stream:    streamed report is assembled and validated
+  - 5xx:       two 503s, then success (two retries)
+  - 429:       Retry-After is honoured before the retry
+  - schema:    a reply that is not a report is abandoned on the first
+               chunk and every attempt fails -> call_groq returns None
+  - truncated: an object missing required keys fails validation
+  - drain:     --backlog concurrent reports against a stub that allows
+               --server-rps requests per second
+
+Run from flask_backend/:
+    python -m benchmarks.groq_client
+    python -m benchmarks.groq_client --backlog 40 --server-rps 10
+"""
+import io
+import json
+import time
+import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+
+import utils.groq_api as groq_api
+import utils.llm_client as llm_client
+from utils.llm_client import ChatClient, LLMError
+from benchmarks.groq_stub import GroqStub, SAMPLE_REPORT
+
+PAYLOAD = {"model": "stub", "messages": [{"role": "user", "content": "report"}]}
+
+
+def check(name, ok, detail):
+    print(f"{'PASS' if ok else 'FAIL'}  {name:<10} {detail}")
+    return ok
+
+
+def run(stub, **client_args):
+    client = ChatClient(stub.url, "test-key", **client_args)
+    start = time.perf_counter()
+    try:
+        content = client.complete(PAYLOAD)
+    except LLMError as e:
+        content = e
+    return client, content, time.perf_counter() - start
+
+
+def scenarios():
+    results = []
+
+    stub = GroqStub(latency=0.0, chunk_size=25).start()
+    client, content, _ = run(stub)
+    results.append(check("stream", json.loads(content) == SAMPLE_REPORT,
+                         f"{stub.chunks_sent} chunks assembled, {client.stats}"))
+    stub.stop()
+
+    stub = GroqStub(latency=0.0, failures=[(503, None), (503, None)]).start()
+    client, content, _ = run(stub)
+    results.append(check("5xx", isinstance(content, str) and client.stats["retries"] == 2,
+                         f"{stub.requests} requests, {client.stats}"))
+    stub.stop()
+
+    stub = GroqStub(latency=0.0, failures=[(429, 1.0)]).start()
+    client, content, elapsed = run(stub)
+    results.append(check("429", isinstance(content, str) and elapsed >= 1.0,
+                         f"succeeded after {elapsed:.2f}s (Retry-After 1.0), {client.stats}"))
+    stub.stop()
+
+    stub = GroqStub(latency=0.0, content="Sorry, I cannot help with that request today." * 20,
+                    chunk_size=10, chunk_delay=0.05).start()
+    groq_api.GROQ_URL = stub.url
+    start = time.perf_counter()
+    none = groq_api.call_groq("report")
+    elapsed = time.perf_counter() - start
+    client = groq_api.get_client()
+    results.append(check("schema", none is None and client.stats["schema_errors"] == client.max_retries + 1,
+                         f"None after {elapsed:.2f}s, {stub.chunks_sent} chunks read of "
+                         f"{(client.max_retries + 1) * 90} sent in full, {client.stats}"))
+    stub.stop()
+
+    partial = json.dumps({"screenings": [], "risk_level_summary": "Low"})
+    stub = GroqStub(latency=0.0, content=partial).start()
+    client, content, _ = run(stub, max_retries=0)
+    results.append(check("truncated", isinstance(content, LLMError), f"{content}"))
+    stub.stop()
+    return all(results)
+
+
+def drain(backlog, server_rps, latency):
+    print(f"\ndrain: {backlog} reports, stub allows {server_rps}/s, {latency}s per reply")
+    print(f"{'client':<10} {'wall s':>7} {'ok':>4} {'429s':>5} {'retries':>8}")
+    for name, rate in [("bucket", server_rps * 60 * 0.9), ("unlimited", 1e9)]:
+        stub = GroqStub(latency=latency, rate_limit=server_rps).start()
+        client = ChatClient(stub.url, "test-key", max_inflight=8, rate_per_min=rate, burst=2, max_retries=8)
+        start = time.perf_counter()
+
+        def one(_):
+            try:
+                return client.complete(PAYLOAD) is not None
+            except LLMError:
+                return False
+
+        with ThreadPoolExecutor(max_workers=backlog) as pool, redirect_stdout(io.StringIO()):   # per-retry log lines
+            ok = sum(pool.map(one, range(backlog)))
+        print(f"{name:<10} {time.perf_counter() - start:>7.2f} {ok:>4} {stub.rejected:>5} {client.stats['retries']:>8}")
+        stub.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backlog", type=int, default=30)
+    parser.add_argument("--server-rps", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+
+    llm_client.BACKOFF_BASE = 0.05   # keep the failure scenarios short
+    passed = scenarios()
+    llm_client.BACKOFF_BASE = 1.0
+    drain(args.backlog, args.server_rps, args.latency)
+    if not passed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Local stand-in for the Groq chat-completions endpoint, for benchmarks
+and checks. Replies after a fixed latency with a canned report in the
+same schema as the real prompt asks for, and counts the requests.
+Streams server-sent events when the request has "stream": true.
+
+    stub = GroqStub(latency=0.5).start()
+    groq_api.GROQ_URL = stub.url
+
+Failure modes: `failures` is a list of (status, retry_after) answered
+before any success, `rate_limit` answers 429 once more than that many
+requests arrived within the last second.
+"""
+import json
+import time
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+SAMPLE_REPORT = {
+    "screenings": [
+        {"disability": "Dyscalculia", "status": "Low Risk", "finding": "Slow multi-digit answers",
+         "biological_cause": "Weak number sense in the intraparietal sulcus"},
+    ],
+    "child_profile": {
+        "strengths": [{"area": "Memory", "description": "Recalls sequences quickly"}],
+        "weaknesses": [{"area": "Math", "description": "Slow on carrying"}],
+        "parental_precautions": ["Avoid timed drills"],
+    },
+    "intervention_plan": {
+        "daily_activities": [{"name": "Number line hop", "goal": "Number sense", "instructions": "Hop and count"}],
+        "therapeutic_recommendations": [{"therapy": "OT", "reason": "Fine motor support"}],
+    },
+    "risk_level_summary": "Low",
+}
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 64   # the default backlog of 5 drops concurrent connects
+    daemon_threads = True
+
+
+class GroqStub:
+    def __init__(self, latency=0.5, content=None, chunk_size=40, chunk_delay=0.0,
+                 failures=None, rate_limit=None):
+        self.latency = latency
+        self.content = content if content is not None else json.dumps(SAMPLE_REPORT)
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.failures = deque(failures or [])
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.rejected = 0
+        self.chunks_sent = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _admit(self):
+        """None to serve the request, else the (status, retry_after) to answer with."""
+        with self._lock:
+            self.requests += 1
+            if self.failures:
+                self.rejected += 1
+                return self.failures.popleft()
+            if self.rate_limit:
+                now = time.monotonic()
+                while self._recent and now - self._recent[0] > 1.0:
+                    self._recent.popleft()
+                if len(self._recent) >= self.rate_limit:
+                    self.rejected += 1
+                    return 429, 1.0 - (now - self._recent[0])
+                self._recent.append(now)
+            return None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                failure = stub._admit()
+                if failure is not None:
+                    status, retry_after = failure
+                    body = json.dumps({"error": {"message": f"stub {status}"}}).encode()
+                    self.send_response(status)
+                    if retry_after is not None:
+                        self.send_header("Retry-After", f"{retry_after:.2f}")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+
+                time.sleep(stub.latency)
+                if request.get("stream"):
+                    return self._stream()
+
+                body = json.dumps({"choices": [{"message": {"role": "assistant", "content": stub.content}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                try:
+                    for i in range(0, len(stub.content), stub.chunk_size):
+                        delta = {"choices": [{"delta": {"content": stub.content[i:i + stub.chunk_size]}}]}
+                        self.wfile.write(f"data: {json.dumps(delta)}\n\n".encode())
+                        self.wfile.flush()
+                        with stub._lock:
+                            stub.chunks_sent += 1
+                        time.sleep(stub.chunk_delay)
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass   # client stopped reading
+
+        return Handler
+
+    def start(self):
+        self._server = Server(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/openai/v1/chat/completions"
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,78 @@
+"""
+Batch handwriting scoring: serial inline analysis vs score_images.
+
+Serves synthetic page photos from a local HTTP server and scores their
+URLs three ways:
+  - serial: download_image + analyze_handwriting per URL (the old route)
+  - cold:   score_images with an empty cache (process pool)
+  - warm:   score_images again (every image is a cache hit)
+and checks all three give the same (score, diagnosis).
+
+Run from flask_backend/:
+    python -m benchmarks.handwriting_batch
+    python -m benchmarks.handwriting_batch --images 64 --height 3000 --workers 4
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import utils.handwriting_batch as hb
+from utils.image import download_image
+from utils.handwriting import analyze_handwriting
+from benchmarks.handwriting_fixtures import STYLES, make_page
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    request_queue_size = 64   # the default backlog of 5 drops concurrent connects
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        styles = list(STYLES)
+        for i in range(args.images):
+            with open(os.path.join(tmp, f"page{i}.jpg"), "wb") as f:
+                f.write(make_page(args.height, styles[i % len(styles)], seed=i))
+
+        server = Server(("127.0.0.1", 0), partial(QuietHandler, directory=tmp))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        urls = [f"http://127.0.0.1:{server.server_port}/page{i}.jpg" for i in range(args.images)]
+        hb.CACHE_DIR = os.path.join(tmp, "cache")
+
+        start = time.perf_counter()
+        serial = [analyze_handwriting(download_image(u)) for u in urls]
+        t_serial = time.perf_counter() - start
+
+        hb.score_images(urls[:2], workers=args.workers)   # start the pool outside the timing
+        hb.evict_cache(0)
+
+        start = time.perf_counter()
+        cold = hb.score_images(urls, workers=args.workers)
+        t_cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = hb.score_images(urls, workers=args.workers)
+        t_warm = time.perf_counter() - start
+
+        same = [(float(s), d) for s, d in serial] == cold == warm
+        print(f"{args.images} images at {args.height}px, {args.workers} workers")
+        print(f"serial {t_serial:.2f}s  cold {t_cold:.2f}s  warm {t_warm:.3f}s  identical: {same}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
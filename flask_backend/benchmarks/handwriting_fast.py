@@ -0,0 +1,66 @@
+"""
+Handwriting fast path: speed and diagnosis agreement.
+
+Renders every synthetic page (benchmarks.handwriting_fixtures) at several
+photo heights and runs analyze_handwriting in the original full-resolution
+mode (target 0) and at each --targets height. The reference diagnosis is
+the original pipeline on the page rendered at REFERENCE_HEIGHT, the size
+its kernels were tuned for. Per mode and photo height it reports:
+  - ms per image
+  - % of pages with the reference diagnosis
+  - % agreeing with the original pipeline on the same photo
+  - mean |score - reference score|
+
+Run from flask_backend/:
+    python -m benchmarks.handwriting_fast
+    python -m benchmarks.handwriting_fast --heights 1000 3000 --targets 1000 --pages 10
+"""
+import time
+import argparse
+from collections import defaultdict
+
+import numpy as np
+
+from utils.handwriting import analyze_handwriting, REFERENCE_HEIGHT
+from benchmarks.handwriting_fixtures import STYLES, make_page
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--heights", type=int, nargs="+", default=[1000, 2000, 3000, 4000])
+    parser.add_argument("--targets", type=int, nargs="+", default=[1000, 800, 600])
+    parser.add_argument("--pages", type=int, default=5, help="pages per style")
+    args = parser.parse_args()
+
+    modes = [0] + args.targets
+    stats = defaultdict(lambda: {"secs": 0.0, "ref": 0, "orig": 0, "dscore": [], "n": 0})
+
+    for style in STYLES:
+        for seed in range(args.pages):
+            ref_score, ref_diag = analyze_handwriting(make_page(REFERENCE_HEIGHT, style, seed), 0)
+            for height in args.heights:
+                photo = make_page(height, style, seed)
+                orig_diag = None
+                for target in modes:
+                    start = time.perf_counter()
+                    score, diag = analyze_handwriting(photo, target)
+                    s = stats[target, height]
+                    s["secs"] += time.perf_counter() - start
+                    orig_diag = diag if target == 0 else orig_diag
+                    s["ref"] += diag == ref_diag
+                    s["orig"] += diag == orig_diag
+                    s["dscore"].append(abs(score - ref_score))
+                    s["n"] += 1
+
+    print(f"{'mode':<12} {'height':>7} {'ms/img':>8} {'= ref %':>8} {'= orig %':>9} {'|d score|':>10}")
+    for target in modes:
+        for height in args.heights:
+            s = stats[target, height]
+            name = "original" if target == 0 else f"fast {target}"
+            print(f"{name:<12} {height:>7} {s['secs'] / s['n'] * 1000:>8.1f} "
+                  f"{100 * s['ref'] / s['n']:>8.0f} {100 * s['orig'] / s['n']:>9.0f} "
+                  f"{np.mean(s['dscore']):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
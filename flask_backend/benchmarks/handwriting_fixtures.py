@@ -0,0 +1,55 @@
+"""
+Synthetic handwriting page photos for the handwriting benchmarks.
+
+Script-font lines of random words on an unevenly lit page, with line
+spacing jitter per style:
+  regular   - small jitter (expected NORMAL)
+  uneven    - moderate jitter (mostly NORMAL)
+  irregular - large jitter (NORMAL / MILD IRREGULARITY)
+  sparse    - only two lines (structure checks)
+Pages are drawn at the requested height, so the same page exists at
+several resolutions, and returned as JPEG bytes.
+"""
+import cv2
+import numpy as np
+
+STYLES = {"regular": 0.05, "uneven": 0.2, "irregular": 0.4, "sparse": 0.05}
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def make_page(height, style="regular", seed=0, quality=90):
+    rng = np.random.default_rng(seed)
+    width = int(height * 0.75)
+    u = height / 1000.0   # layout unit, so the page looks the same at every size
+
+    # Paper with a shadow gradient and sensor noise
+    yy, xx = np.mgrid[0:height, 0:width]
+    light = 225 - 45 * (xx / width) * (yy / height)
+    page = np.clip(light + rng.normal(0, 3, light.shape), 0, 255).astype(np.uint8)
+    page = cv2.cvtColor(page, cv2.COLOR_GRAY2BGR)
+
+    n_lines = 2 if style == "sparse" else int(rng.integers(9, 14))
+    base_gap = 60 * u
+    y = 90 * u
+    for _ in range(n_lines):
+        x = 50 * u + rng.uniform(0, 20) * u
+        while x < width - 120 * u:
+            word = "".join(rng.choice(list(LETTERS), int(rng.integers(2, 8))))
+            dy = rng.normal(0, 2) * u   # words wander off the line a little
+            cv2.putText(page, word, (int(x), int(y + dy)), cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+                        1.1 * u, (40, 40, 60), max(1, int(round(2.2 * u))), cv2.LINE_AA)
+            x += (len(word) * 19 + rng.uniform(20, 45)) * u
+        y += base_gap * max(0.4, 1 + rng.normal(0, STYLES[style]))
+        if y > height - 60 * u:
+            break
+
+    ok, buf = cv2.imencode(".jpg", page, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buf.tobytes()
+
+
+def corpus(heights, pages_per_style=5, styles=STYLES):
+    """Yields (style, seed, height, jpeg_bytes) for every page at every height."""
+    for style in styles:
+        for seed in range(pages_per_style):
+            for height in heights:
+                yield style, seed, height, make_page(height, style, seed)
@@ -0,0 +1,99 @@
+"""
+LLM report cache: send_to_groq against a local Groq stub.
+
+  - cold:    --reports distinct reports, one request each (all misses)
+  - retry:   the same reports again, keys reordered, numpy scalars and
+             float noise below NORMALIZE_DECIMALS (all hits)
+  - burst:   --concurrency threads ask for one new report at once
+             (one upstream call, the rest coalesce onto it)
+
+Prints wall time and upstream calls per phase, then llm_cache.stats().
+The cache lives in a temp file, the real one is untouched.
+
+Run from flask_backend/:
+    python -m benchmarks.llm_cache
+    python -m benchmarks.llm_cache --latency 2 --reports 50 --concurrency 16
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import utils.groq_api as groq_api
+from utils import llm_cache
+from benchmarks.groq_stub import GroqStub
+
+
+def make_report(i):
+    """Shaped like orchestrator.run_all_modules output."""
+    rng = random.Random(i)
+    return {
+        "session_id": f"session-{i}",
+        "math": {"prediction": rng.choice(["Normal", "Low Risk", "High Risk"]), "confidence": round(rng.uniform(50, 99), 2)},
+        "reading": {"LD_score": rng.random() / 5, "threshold": 0.0778, "strengths": ["Good basic reading speed"]},
+        "emotion": {"result": "Normal", "confidence": round(rng.uniform(50, 99), 2)},
+        "test5": {"prediction": "Normal", "avg_response_time": rng.uniform(0.5, 3)},
+        "test6": {"prediction": "adhd", "scores": [rng.randint(0, 10) for _ in range(5)]},
+        "handwriting": {"score": rng.uniform(0, 100), "diagnosis": "Normal"},
+    }
+
+
+def perturb(report):
+    """Same report as a retry might build it: other key order, numpy types, float noise."""
+    def walk(obj):
+        if isinstance(obj, dict):
+            items = list(obj.items())
+            random.shuffle(items)
+            return {k: walk(v) for k, v in items}
+        if isinstance(obj, list):
+            return [walk(v) for v in obj]
+        if isinstance(obj, float):
+            return np.float64(obj + 1e-9)
+        if isinstance(obj, int) and not isinstance(obj, bool):
+            return np.int64(obj)
+        return obj
+    return walk(report)
+
+
+def phase(name, stub, fn, items, workers=1):
+    before = stub.requests
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(fn, items))
+    elapsed = time.perf_counter() - start
+    ok = all(groq_api.is_valid_report(r) for r in results)
+    print(f"{name:<7} {len(items):>9} {stub.requests - before:>9} {elapsed:>9.2f} {str(ok):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.5, help="stub response time (s)")
+    parser.add_argument("--reports", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    stub = GroqStub(latency=args.latency).start()
+    groq_api.GROQ_URL = stub.url
+    groq_api.get_client().bucket.rate = 1e6   # time the cache, not the rate limiter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        llm_cache.CACHE_PATH = os.path.join(tmp, "llm_cache.sqlite3")
+        reports = [make_report(i) for i in range(args.reports)]
+
+        print(f"{'phase':<7} {'requests':>9} {'upstream':>9} {'wall s':>9} {'valid':>6}")
+        phase("cold", stub, groq_api.send_to_groq, reports)
+        phase("retry", stub, groq_api.send_to_groq, [perturb(r) for r in reports])
+        burst = make_report(args.reports)
+        phase("burst", stub, groq_api.send_to_groq, [burst] * args.concurrency, workers=args.concurrency)
+
+        print(json.dumps(llm_cache.stats(), indent=2))
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Local rule-based report engine (utils/local_report.py).
+
+  - synthesize: one report per synthetic child (same full_json as
+    benchmarks/prompt_payload.py), timed, every report checked with
+    llm_client.validate_report and one rendered with create_pdf
+  - auto:       report_engine.generate_report against a local Groq stub
+    that answers in time, too slowly (past LLM_SLA_SECONDS) and with
+    an error; shows which engine wrote the report and how long it took
+
+Prints the status counts per screening as well. Run from flask_backend/:
+    python -m benchmarks.local_report
+    python -m benchmarks.local_report --children 1000 --sla 0.5
+"""
+import os
+import io
+import time
+import argparse
+import tempfile
+import contextlib
+from collections import Counter
+
+import numpy as np
+
+import utils.groq_api as groq_api
+from utils import llm_cache, local_report, report_engine
+from utils.llm_client import validate_report
+from pdf_generator import create_pdf
+from benchmarks.groq_stub import GroqStub
+from benchmarks.prompt_payload import load_rows, synthetic_media, full_json_for
+
+
+def run_synthesize(reports):
+    times = []
+    statuses = {name: Counter() for name in local_report.SCREENINGS}
+    for full_json in reports:
+        start = time.perf_counter()
+        report = local_report.synthesize(full_json)
+        times.append((time.perf_counter() - start) * 1000)
+        validate_report(report)
+        for item in report["screenings"]:
+            statuses[item["disability"]][item["status"]] += 1
+
+    # same input, same report
+    assert local_report.synthesize(reports[0]) == local_report.synthesize(reports[0])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            start = time.perf_counter()
+            pdf = create_pdf(reports[0], local_report.synthesize(reports[0]), "local")
+            pdf_ms = (time.perf_counter() - start) * 1000
+            pdf_kb = os.path.getsize(pdf) / 1024
+        finally:
+            os.chdir(cwd)
+
+    print(f"synthesize: {len(reports)} reports, all valid, mean {np.mean(times):.3f} ms, "
+          f"p95 {np.percentile(times, 95):.3f} ms, max {max(times):.3f} ms")
+    print(f"create_pdf: {pdf_ms:.0f} ms, {pdf_kb:.0f} KB\n")
+
+    labels = local_report.STATUS_ORDER
+    print(f"{'screening':<36}" + "".join(f"{s:>14}" for s in labels))
+    for name, counts in statuses.items():
+        print(f"{name:<36}" + "".join(f"{counts[s]:>14}" for s in labels))
+
+
+def run_auto(full_json, sla):
+    report_engine.LLM_SLA_SECONDS = sla
+    cases = [
+        ("in time", GroqStub(latency=sla / 4)),
+        ("slow", GroqStub(latency=sla * 4)),
+        ("error", GroqStub(latency=0.01, failures=[(400, None)])),   # not retried
+    ]
+
+    print(f"\nauto engine, LLM_SLA_SECONDS={sla}")
+    print(f"{'upstream':<10} {'engine':<16} {'wall s':>8}")
+    for i, (label, stub) in enumerate(cases):
+        stub.start()
+        groq_api.GROQ_URL = stub.url
+        groq_api.get_client().bucket.rate = 1e6
+        report = dict(full_json, math=dict(full_json["math"], confidence=float(i)))   # a new cache key per case
+        try:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                text, engine = report_engine.generate_report(report, "auto")
+            wall = time.perf_counter() - start
+        finally:
+            time.sleep(sla * 4 if label == "slow" else 0)   # let the late reply finish before shutdown
+            stub.stop()
+        print(f"{label:<10} {engine:<16} {wall:>8.2f}")
+    print(report_engine.stats())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--children", type=int, default=200)
+    parser.add_argument("--sla", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = load_rows(args.children)
+        with synthetic_media():
+            reports = [full_json_for(i, row) for i, row in enumerate(rows)]
+
+    run_synthesize(reports)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        llm_cache.CACHE_PATH = os.path.join(tmp, "llm_cache.sqlite3")
+        run_auto(reports[0], args.sla)
+
+
+if __name__ == "__main__":
+    main()
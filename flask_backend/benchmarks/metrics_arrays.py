@@ -0,0 +1,139 @@
+"""
+MetricsEngine: vectorized compute_arrays vs the per-dict loop.
+
+For each size, builds random epoch arrays, then times
+  - loop:   reference_compute_all (the original scalar code) per epoch dict
+  - wrap:   MetricsEngine.compute_all per epoch dict (thin wrapper)
+  - arrays: one MetricsEngine.compute_arrays call
+and checks every metric matches the reference. The loop times include
+building the per-epoch dicts, as the old callers did.
+
+Run from flask_backend/:
+    python -m benchmarks.metrics_arrays
+    python -m benchmarks.metrics_arrays --sizes 1000 100000 --loop-max 100000
+"""
+import time
+import argparse
+
+import numpy as np
+
+from config import BASE_POWERS
+from metrics_engine import MetricsEngine
+
+BEHAVIOR_KEYS = ["velocity_avg", "jerk_avg", "idle_ratio", "flight_time_var", "error_rate"]
+
+
+def reference_compute_all(eeg_power, behavior_metrics, vision_metrics):
+    """The original scalar implementation, kept as the correctness reference."""
+    theta = eeg_power['theta']
+    beta = eeg_power['low_beta']
+    alpha = eeg_power['low_alpha'] + eeg_power['high_alpha']
+    gamma = eeg_power['low_gamma'] + eeg_power['mid_gamma']
+
+    tbr = theta / beta if beta > 0 else 0
+    cli = gamma / theta if theta > 0 else 0
+    stress_index = eeg_power['high_beta'] / alpha if alpha > 0 else 0
+    engagement = beta / (theta + alpha) if (theta + alpha) > 0 else 0
+
+    motor_fatigue = 0.0
+    if behavior_metrics['velocity_avg'] > 1.0:
+        motor_fatigue = (alpha / 20000.0)
+
+    head_instability = abs(vision_metrics.get('yaw_velocity', 0))
+    hyperactivity = (behavior_metrics['jerk_avg'] * 10) + head_instability
+
+    lookaway_penalty = vision_metrics.get('gaze_deviation', 0) * 0.5
+    idle_penalty = behavior_metrics['idle_ratio'] * 0.3
+    focus_ratio = 1.0 - (lookaway_penalty + idle_penalty)
+    focus_ratio = max(0.0, min(1.0, focus_ratio))
+
+    writing_inconsistency = (behavior_metrics['error_rate'] * 2) + \
+                            (behavior_metrics['flight_time_var'] / 1000.0)
+
+    return {
+        "engagement_score": round(engagement, 2),
+        "motor_fatigue_rate": round(motor_fatigue, 2),
+        "focus_ratio": round(focus_ratio, 2),
+        "hyperactivity_index": round(hyperactivity, 2),
+        "theta_beta_ratio": round(tbr, 2),
+        "lookaway_frequency": round(vision_metrics.get('gaze_deviation', 0) * 10, 1),
+        "cognitive_load_index": round(cli, 2),
+        "stress_index": round(stress_index, 2),
+        "head_stability": round(100 - head_instability, 1),
+        "writing_consistency_score": round(1.0 - min(1.0, writing_inconsistency), 2),
+        "blink_variability": 0.5,
+        "distraction_time_sec": round((1.0 - focus_ratio) * 60, 1)
+    }
+
+
+def make_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    eeg = np.zeros(n, dtype=[(band, np.float64) for band in BASE_POWERS])
+    for band, base in BASE_POWERS.items():
+        eeg[band] = base + rng.normal(0, 1000, n)
+    behavior = {
+        "velocity_avg": rng.uniform(0, 2, n),
+        "jerk_avg": rng.uniform(0, 1, n),
+        "idle_ratio": rng.uniform(0, 0.5, n),
+        "flight_time_var": rng.uniform(50, 400, n),
+        "error_rate": rng.uniform(0, 0.1, n),
+    }
+    vision = {
+        "yaw_velocity": rng.uniform(0, 30, n),
+        "gaze_deviation": rng.uniform(0, 1, n),
+    }
+    return eeg, behavior, vision
+
+
+def run_loop(fn, eeg, behavior, vision):
+    bands = eeg.dtype.names
+    columns = [eeg[b].tolist() for b in bands]
+    beh = {k: behavior[k].tolist() for k in BEHAVIOR_KEYS}
+    vis = {k: v.tolist() for k, v in vision.items()}
+
+    start = time.perf_counter()
+    rows = []
+    for i in range(len(eeg)):
+        rows.append(fn(
+            {b: columns[j][i] for j, b in enumerate(bands)},
+            {k: beh[k][i] for k in BEHAVIOR_KEYS},
+            {k: vis[k][i] for k in vis},
+        ))
+    return rows, time.perf_counter() - start
+
+
+def mismatches(rows, arrays):
+    bad = 0
+    for key, values in arrays.items():
+        ref = np.array([r[key] for r in rows], dtype=np.float64)
+        bad += int(np.count_nonzero(ref != values[:len(ref)]))
+    return bad
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--loop-max", type=int, default=1000000, help="skip the loops above this size")
+    args = parser.parse_args()
+
+    print(f"{'epochs':>9} {'loop s':>9} {'wrap s':>9} {'arrays s':>9} {'speed-up':>9} {'mismatch':>9}")
+    for n in args.sizes:
+        eeg, behavior, vision = make_inputs(n)
+
+        start = time.perf_counter()
+        arrays = MetricsEngine.compute_arrays(eeg, behavior, vision)
+        t_arrays = time.perf_counter() - start
+
+        if n <= args.loop_max:
+            ref_rows, t_loop = run_loop(reference_compute_all, eeg, behavior, vision)
+            wrap_rows, t_wrap = run_loop(MetricsEngine.compute_all, eeg, behavior, vision)
+            # np.round and round() may differ on exact .xx5 ties; wrapper must match exactly
+            bad = mismatches(ref_rows, arrays)
+            assert wrap_rows == ref_rows, "compute_all wrapper drifted from the reference"
+            print(f"{n:>9} {t_loop:>9.3f} {t_wrap:>9.3f} {t_arrays:>9.4f} {t_loop / t_arrays:>8.0f}x {bad:>9}")
+        else:
+            print(f"{n:>9} {'-':>9} {'-':>9} {t_arrays:>9.4f} {'-':>9} {'-':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+App start-up time and per-worker memory with the lazy model registry.
+
+Import: starts a fresh interpreter per mode, times `import app` and reads
+its RSS.
+  - lazy:    nothing loaded at import (the default)
+  - eager:   all models loaded at import as plain sklearn pickles, no
+             mmap and no flat-forest cache (close to the old behaviour,
+             minus torch)
+  - preload: all models loaded at import through the registry (flat
+             forests memory-mapped from cache/forests)
+
+Workers: imports the app in a master process, forks --workers children
+the way gunicorn does, scores one row per model in each child, then
+reads /proc/self/smaps_rollup in every child while all are alive.
+USS = private memory of one worker, PSS = its fair share of shared pages.
+  - lazy:    each worker loads after the fork (no preload_app)
+  - eager:   as above, but the models are loaded in the master as plain
+             pickles before the fork
+  - preload: the registry models are loaded in the master before the
+             fork and gc.freeze() is called (gunicorn.conf.py)
+
+Whisper is not included (it needs the model download and is not
+preloaded). Run from flask_backend/:
+    python -m benchmarks.model_startup
+    python -m benchmarks.model_startup --workers 4
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+MODELS = "math,emotion,emotion_encoder,hearing,cognition,reading_scaler,reading"
+
+MODES = {
+    "lazy": {"PRELOAD_MODELS": ""},
+    "eager": {"PRELOAD_MODELS": MODELS, "MODEL_MMAP": "", "FOREST_BACKEND": "sklearn"},
+    "preload": {"PRELOAD_MODELS": MODELS},
+}
+
+
+def memory_mb():
+    """Rss / Pss / Uss (private) of this process from smaps_rollup, in MB."""
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def score_one_row():
+    """Touches every preloaded model the way a request would."""
+    import numpy as np
+    from main import _get_cascades
+    from utils.model import predict_batch as math_batch
+    from utils.model3 import predict_batch as emotion_batch
+    from utils.model2 import predict_batch as reading_batch
+    from utils.test5_model import predict_test5_batch
+    from utils.test6_model import predict_test6_batch
+
+    math_batch(np.zeros((1, 11)))
+    emotion_batch(np.zeros((1, 8)))
+    reading_batch(np.zeros((1, 5)))
+    predict_test5_batch(np.zeros((1, 9)))
+    predict_test6_batch(np.zeros((1, 14)))
+    _get_cascades()
+
+
+def run_import():
+    import time
+    start = time.perf_counter()
+    import app  # noqa: F401
+    print(json.dumps({"import_s": time.perf_counter() - start, **memory_mb()}))
+
+
+def _worker(barrier, results, preloaded):
+    import gc
+    if not preloaded:
+        from utils import registry
+        registry.warmup(MODELS)
+    score_one_row()
+    gc.collect()
+    barrier.wait()            # all workers loaded before anyone measures
+    results.put(memory_mb())
+    barrier.wait()            # nobody exits (and frees shared pages) before all measured
+
+
+def run_workers(mode, n):
+    import gc
+    import multiprocessing
+    import app  # noqa: F401  (PRELOAD_MODELS from the mode's env)
+
+    preloaded = mode != "lazy"
+    if mode == "preload":
+        gc.freeze()
+
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(n + 1)   # the master measures alongside the workers
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(barrier, results, preloaded)) for _ in range(n)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    master = memory_mb()
+    stats = [results.get() for _ in procs]
+    barrier.wait()
+    for p in procs:
+        p.join()
+
+    avg = {k: sum(s[k] for s in stats) / n for k in stats[0]}
+    print(json.dumps({"master": master, "worker": avg}))
+
+
+def child(args_list, mode):
+    env = dict(os.environ, **MODES[mode])
+    out = subprocess.run([sys.executable, "-W", "ignore", "-m", "benchmarks.model_startup", *args_list],
+                         env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--child", choices=["import", "workers"])
+    parser.add_argument("--mode", choices=list(MODES), default="lazy")
+    args = parser.parse_args()
+
+    if args.child == "import":
+        return run_import()
+    if args.child == "workers":
+        return run_workers(args.mode, args.workers)
+
+    child(["--child", "import"], "preload")   # builds the flat-forest cache once, not timed
+
+    print(f"{'mode':<8} {'import s':>9} {'RSS MB':>8}")
+    for mode in MODES:
+        r = child(["--child", "import"], mode)
+        print(f"{mode:<8} {r['import_s']:>9.2f} {r['rss']:>8.0f}")
+
+    print(f"\n{args.workers} forked workers, one row scored per model in each")
+    print(f"{'mode':<8} {'master RSS':>11} {'worker RSS':>11} {'worker PSS':>11} {'worker USS':>11} {'total PSS':>10}")
+    for mode in MODES:
+        r = child(["--child", "workers", "--mode", mode, "--workers", str(args.workers)], mode)
+        m, w = r["master"], r["worker"]
+        total = m["pss"] + w["pss"] * args.workers
+        print(f"{mode:<8} {m['rss']:>11.0f} {w['rss']:>11.0f} {w['pss']:>11.0f} {w['uss']:>11.0f} {total:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
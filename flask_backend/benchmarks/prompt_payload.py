@@ -0,0 +1,179 @@
+"""
+LLM prompt size: the old str(full_json) prompt vs the compact payload
+(utils/prompt_payload.py).
+
+Builds one full_json per synthetic child with the real analyzers. Row i
+takes math answers from realistic_synthetic_dysgraphia.csv, emotion from
+emotion_social_dataset.csv, hearing from test5_synthetic.csv and
+cognition from test6_synthetic.csv. The reading clips and handwriting
+photo can't be fetched here, so the analyzers get synthetic Whisper word
+timings and fixture pages (benchmarks/handwriting_fixtures.py) instead.
+
+Prints estimated tokens (prompt_payload.estimate_tokens) and characters
+for the data block and the whole prompt, per-module tokens, and how
+often the budget trimmed anything.
+
+Run from flask_backend/:
+    python -m benchmarks.prompt_payload
+    python -m benchmarks.prompt_payload --children 500 --budget 300
+"""
+import csv
+import json
+import time
+import random
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+import analyzers
+from orchestrator import MODULES, _json_default
+from utils import prompt_payload
+from utils.groq_api import PROMPT_TEMPLATE
+from utils.handwriting_batch import score_image
+from benchmarks.handwriting_fixtures import STYLES, make_page
+
+# CSV -> (columns in SESSION_COLUMNS order, first row index they fill)
+SOURCES = {
+    "realistic_synthetic_dysgraphia.csv": (
+        ["test1_q1", "test1_q2", "test1_q3", "test1_q4", "test1_q5", "test1_q6",
+         "test1_q1_time", "test1_q2_time", "test1_q3_time",
+         "test1_q4_time", "test1_q5_time", "test1_q6_time"], 0),
+    "test5_synthetic.csv": (
+        ["r1", "r2", "r3", "r4", "r5", "q2_time", "q2_score", "q3_time", "q3_score"], 15),
+    "emotion_social_dataset.csv": (
+        ["happy_correct", "sad_correct", "angry_correct", "crying_correct",
+         "happy_rt", "sad_rt", "angry_rt", "crying_rt"], 24),
+    "test6_synthetic.csv": (
+        ["odd", "memory", "mirror", "pattern", "odd_time", "memory_time", "mirror_time", "pattern_time"], 32),
+}
+ROW_LENGTH = 41
+
+
+def load_rows(n):
+    """n session rows in utils.fetch.SESSION_COLUMNS layout."""
+    rows = [[None] * ROW_LENGTH for _ in range(n)]
+    for path, (columns, offset) in SOURCES.items():
+        with open(path, newline="") as f:
+            data = list(csv.DictReader(f))
+        for i, row in enumerate(rows):
+            src = data[i % len(data)]
+            for j, col in enumerate(columns):
+                row[offset + j] = float(src[col])
+    for i, row in enumerate(rows):
+        row[12], row[13] = f"clip-{i}-1", f"clip-{i}-2"
+        row[14] = f"page-{i}"
+    return rows
+
+
+def fake_words(seed):
+    """Whisper-style word timings with a per-clip reading pace (inside the reading model's training range)."""
+    rng = random.Random(seed)
+    pause = rng.uniform(0.05, 0.5)
+    t, words = 0.0, []
+    for _ in range(rng.randint(4, 35)):
+        start = t + rng.expovariate(1 / pause)
+        t = start + rng.uniform(0.2, 0.5)
+        words.append({"word": "w", "start": start, "end": t})
+    return words
+
+
+@contextlib.contextmanager
+def synthetic_media():
+    """Points the analyzers' reading / handwriting inputs at synthetic data."""
+    pages = [make_page(1000, style, seed) for style in STYLES for seed in range(2)]
+    scores = {}
+
+    def download_image(url):
+        return pages[int(url.split("-")[1]) % len(pages)]
+
+    def score(image_bytes):
+        # fixture pages repeat; score each once
+        key = id(image_bytes)
+        if key not in scores:
+            scores[key] = score_image(image_bytes)
+        return scores[key]
+
+    saved = (analyzers.download_audio, analyzers.transcribe_many, analyzers.download_image, analyzers.score_image)
+    analyzers.download_audio = lambda url: url
+    analyzers.transcribe_many = lambda clips: [fake_words(clip) for clip in clips]
+    analyzers.download_image = download_image
+    analyzers.score_image = score
+    try:
+        yield
+    finally:
+        analyzers.download_audio, analyzers.transcribe_many, analyzers.download_image, analyzers.score_image = saved
+
+
+def full_json_for(i, row):
+    """Same layout and JSON round-trip as orchestrator.run_all_modules."""
+    full_json = {"session_id": f"session-{i}"}
+    for name, analyzer in MODULES.items():
+        payload, _ = analyzer(f"session-{i}", row)
+        full_json[name] = json.loads(json.dumps(payload, sort_keys=True, default=_json_default))
+    return full_json
+
+
+def pct(values, q):
+    return float(np.percentile(values, q))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--children", type=int, default=200)
+    parser.add_argument("--budget", type=int, default=prompt_payload.PROMPT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    rows = load_rows(args.children)
+    with synthetic_media():
+        reports = [full_json_for(i, row) for i, row in enumerate(rows)]
+
+    template_tokens = prompt_payload.estimate_tokens(PROMPT_TEMPLATE.format(report_json=""))
+    before = {"data": [], "chars": [], "prompt": []}
+    after = {"data": [], "chars": [], "prompt": []}
+    modules = {name: ([], []) for name in MODULES}
+    trimmed = 0
+    build_s = 0.0
+
+    for full_json in reports:
+        text = str(full_json)   # what send_to_groq used to put in the prompt
+        before["data"].append(prompt_payload.estimate_tokens(text))
+        before["chars"].append(len(text))
+        before["prompt"].append(prompt_payload.estimate_tokens(PROMPT_TEMPLATE.format(report_json=text)))
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            data, text = prompt_payload.build(full_json, args.budget)
+        build_s += time.perf_counter() - start
+        trimmed += bool(log.getvalue())
+        after["data"].append(prompt_payload.estimate_tokens(text))
+        after["chars"].append(len(text))
+        after["prompt"].append(prompt_payload.estimate_tokens(PROMPT_TEMPLATE.format(report_json=text)))
+
+        compact = prompt_payload.compact(full_json)
+        for name in MODULES:
+            modules[name][0].append(prompt_payload.estimate_tokens(str(full_json[name])))
+            modules[name][1].append(prompt_payload.estimate_tokens(prompt_payload.dumps(compact[name])))
+
+    n = len(reports)
+    print(f"{n} children, template ~{template_tokens} tokens, budget {args.budget or 'none'}")
+    print(f"{'':<16} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+    for label, values in [
+        ("data tokens old", before["data"]), ("data tokens new", after["data"]),
+        ("data chars old", before["chars"]), ("data chars new", after["chars"]),
+        ("prompt tok old", before["prompt"]), ("prompt tok new", after["prompt"]),
+    ]:
+        print(f"{label:<16} {np.mean(values):>8.0f} {pct(values, 50):>8.0f} {pct(values, 95):>8.0f} {max(values):>8.0f}")
+
+    saved = 1 - np.mean(after["prompt"]) / np.mean(before["prompt"])
+    print(f"\nprompt tokens saved: {saved:.0%}, data block: {1 - np.mean(after['data']) / np.mean(before['data']):.0%}")
+    print(f"trimmed to fit the budget: {trimmed}/{n}, build {build_s / n * 1000:.3f} ms per report")
+
+    print(f"\n{'module':<12} {'old tok':>8} {'new tok':>8}")
+    for name, (old, new) in modules.items():
+        print(f"{name:<12} {np.mean(old):>8.0f} {np.mean(new):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
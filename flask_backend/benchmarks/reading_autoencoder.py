@@ -0,0 +1,119 @@
+"""
+Reading autoencoder: the original per-row torch path vs the batch scorer.
+
+Times scoring n rows (median of --repeats) three ways:
+  - rows:  the original predict() code, one scaler.transform + torch
+           forward per row
+  - torch: utils.model2.reconstruction_errors with READING_BACKEND=torch
+  - numpy: the same on the exported weights (no torch)
+and reports the largest error difference against the original and
+whether every NORMAL/ABNORMAL status matches. Then starts a fresh
+interpreter per backend and reports its RSS after importing utils.model2
+and scoring one row.
+
+Run from flask_backend/:
+    python -m benchmarks.reading_autoencoder
+    python -m benchmarks.reading_autoencoder --sizes 1 64 100000 --rows-max 1000
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import subprocess
+
+import numpy as np
+
+import utils.model2 as model2
+from utils import registry
+from utils.features2 import READING_COLUMNS
+
+RSS_SNIPPET = """
+import os
+from utils.model2 import predict
+predict({"avg_pause": 0.4, "max_pause": 1.2, "pause_count": 1, "wpm": 110, "total_words": 40})
+with open("/proc/self/statm") as f:
+    print(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024)
+"""
+
+
+def reference_errors(X):
+    """The original utils.model2.predict body, one row at a time."""
+    import torch
+    model = registry.get("reading_torch")
+    scaler = registry.get("reading_scaler")
+    out = []
+    for row in X:
+        x = scaler.transform(np.array([row]))
+        x = torch.tensor(x, dtype=torch.float32)
+        with torch.no_grad():
+            recon = model(x)
+            out.append(torch.mean((x - recon)**2).item())
+    return np.array(out)
+
+
+def make_rows(rng, n):
+    """Features spread over (and a bit past) the scaler's training range."""
+    scaler = registry.get("reading_scaler")
+    lo, hi = scaler.data_min_, scaler.data_max_
+    X = rng.uniform(lo - 0.1 * (hi - lo), hi + 0.1 * (hi - lo), (n, len(READING_COLUMNS)))
+    X[:, 2] = rng.integers(0, 4, n)       # pause_count
+    X[:, 4] = np.round(X[:, 4])           # total_words
+    return X
+
+
+def timed(fn, X, repeats):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(X)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000, result
+
+
+def backend_errors(backend):
+    def run(X):
+        model2.READING_BACKEND = backend
+        return model2.reconstruction_errors(X)
+    return run
+
+
+def rss_mb(backend):
+    env = dict(os.environ, READING_BACKEND=backend)
+    out = subprocess.run([sys.executable, "-W", "ignore", "-c", RSS_SNIPPET],
+                         env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 64, 4096])
+    parser.add_argument("--rows-max", type=int, default=4096, help="skip the per-row path above this")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    warnings.filterwarnings("ignore")   # sklearn feature-name / version warnings
+    rng = np.random.default_rng(0)
+    registry.warmup(["reading_scaler", "reading", "reading_torch"])   # load time is not scoring time
+
+    print(f"threads: {model2.READING_THREADS}")
+    print(f"{'rows':>7} {'rows ms':>9} {'torch ms':>9} {'numpy ms':>9} {'max |diff|':>11} {'status':>7}")
+    for n in args.sizes:
+        X = make_rows(rng, n)
+        t_torch, e_torch = timed(backend_errors("torch"), X, args.repeats)
+        t_numpy, e_numpy = timed(backend_errors("numpy"), X, args.repeats)
+
+        if n <= args.rows_max:
+            t_rows, ref = timed(reference_errors, X, 1 if n > 64 else args.repeats)
+            rows_col = f"{t_rows:>9.2f}"
+        else:
+            ref, rows_col = e_torch, f"{'-':>9}"
+        diff = max(np.abs(e_torch - ref).max(), np.abs(e_numpy - ref).max())
+        same = all(np.array_equal(e > model2.THRESHOLD, ref > model2.THRESHOLD) for e in (e_torch, e_numpy))
+        print(f"{n:>7} {rows_col} {t_torch:>9.2f} {t_numpy:>9.2f} {diff:>11.2e} {'ok' if same else 'DIFF':>7}")
+
+    print(f"\nRSS after import + one prediction: "
+          f"torch {rss_mb('torch'):.0f} MB, numpy {rss_mb('numpy'):.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
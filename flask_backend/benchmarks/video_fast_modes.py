@@ -0,0 +1,103 @@
+"""
+Regression harness for the fast video sampling/detection/tracking modes.
+
+Runs the vision pass on synthetic webcam clips in the exact mode (decode
+every frame, every 3rd frame, full-resolution face scan on every sample)
+and in each fast mode, then compares session-level gaze_deviation,
+yaw_velocity and blink counts plus the speed-up. Modes that keep the
+same stride also report per-frame agreement (yaw within 2, gaze within
+0.05 of the exact frame).
+
+Run from flask_backend/:
+    python -m benchmarks.video_fast_modes
+    python -m benchmarks.video_fast_modes --videos a.mp4 b.mp4
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+import main as engine
+from benchmarks.video_fixtures import make_video
+
+EXACT = {"sample_fps": 0, "decode": "read", "detect_height": 0, "track_every": 0}
+MODES = {
+    "grab":             {"sample_fps": 0,  "decode": "grab", "detect_height": 0,   "track_every": 0},
+    "grab+det360":      {"sample_fps": 0,  "decode": "grab", "detect_height": 360, "track_every": 0},
+    "grab+det240":      {"sample_fps": 0,  "decode": "grab", "detect_height": 240, "track_every": 0},
+    "fps5":             {"sample_fps": 5,  "decode": "grab", "detect_height": 0,   "track_every": 0},
+    "fps5+det240":      {"sample_fps": 5,  "decode": "grab", "detect_height": 240, "track_every": 0},
+    "track5":           {"sample_fps": 0,  "decode": "grab", "detect_height": 0,   "track_every": 5},
+    "track10":          {"sample_fps": 0,  "decode": "grab", "detect_height": 0,   "track_every": 10},
+    "track10+det240":   {"sample_fps": 0,  "decode": "grab", "detect_height": 240, "track_every": 10},
+}
+
+
+def frame_agreement(frames, ref_frames):
+    if len(frames) != len(ref_frames) or not frames:
+        return None
+    same = sum(
+        abs(f["yaw_velocity"] - r["yaw_velocity"]) <= 2 and abs(f["gaze_deviation"] - r["gaze_deviation"]) <= 0.05
+        for f, r in zip(frames, ref_frames)
+    )
+    return 100.0 * same / len(frames)
+
+
+def summarize(video, sample_fps, decode, detect_height, track_every):
+    stride = engine.sample_stride(video, sample_fps)
+    start = time.perf_counter()
+    records = engine.detect_frames(video, stride=stride, decode=decode,
+                                   detect_height=detect_height, track_every=track_every)
+    secs = time.perf_counter() - start
+
+    blinks = engine.BlinkTracker()
+    frames = list(engine.replay_vision(records, blinks))
+    return {
+        "secs": secs,
+        "gaze_deviation": float(np.mean([f["gaze_deviation"] for f in frames])) if frames else 0.0,
+        "yaw_velocity": float(np.mean([f["yaw_velocity"] for f in frames])) if frames else 0.0,
+        "blinks": blinks.blink_counter,
+        "frames": frames,
+    }
+
+
+def compare(videos, modes):
+    print(f"{'video':<16} {'mode':<14} {'speed-up':>8} {'gaze':>7} {'d gaze':>7} "
+          f"{'yaw':>7} {'d yaw':>7} {'blinks':>7} {'exact':>6} {'agree%':>7}")
+    for video in videos:
+        ref = summarize(video, **EXACT)
+        name = os.path.basename(video)[:16]
+        print(f"{name:<16} {'exact':<14} {1.0:>8.2f} {ref['gaze_deviation']:>7.3f} {'':>7} "
+              f"{ref['yaw_velocity']:>7.2f} {'':>7} {ref['blinks']:>7} {ref['blinks']:>6}")
+
+        for mode, options in modes.items():
+            res = summarize(video, **options)
+            agree = frame_agreement(res["frames"], ref["frames"])
+            print(f"{name:<16} {mode:<14} {ref['secs'] / res['secs']:>8.2f} "
+                  f"{res['gaze_deviation']:>7.3f} {res['gaze_deviation'] - ref['gaze_deviation']:>+7.3f} "
+                  f"{res['yaw_velocity']:>7.2f} {res['yaw_velocity'] - ref['yaw_velocity']:>+7.2f} "
+                  f"{res['blinks']:>7} {ref['blinks']:>6} "
+                  f"{'-' if agree is None else format(agree, '.1f'):>7}")
+        print()
+
+
+def synthetic_videos(tmp):
+    return [
+        make_video(os.path.join(tmp, "synthetic_480p.mp4"), seconds=30, size=(640, 480), seed=1),
+        make_video(os.path.join(tmp, "synthetic_720p.mp4"), seconds=30, size=(1280, 720), seed=2),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", nargs="*")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        compare(args.videos or synthetic_videos(tmp), MODES)
+
+
+if __name__ == "__main__":
+    main()
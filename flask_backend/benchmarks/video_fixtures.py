@@ -0,0 +1,56 @@
+"""
+Synthetic webcam-style test videos for the video pipeline benchmarks.
+
+A still face photo drifts slowly around the frame (like a child sitting
+in front of a laptop) and the eye band is blurred for a few frames every
+couple of seconds to produce blinks. Without a photo (--image or
+scikit-image's astronaut sample) a plain drawn face is used; Haar will
+rarely detect it, which still exercises decoding and scanning.
+"""
+import cv2
+import numpy as np
+
+
+def default_face():
+    try:
+        from skimage import data
+        return cv2.cvtColor(data.astronaut(), cv2.COLOR_RGB2BGR)[:300, 120:420]
+    except ImportError:
+        face = np.full((300, 240, 3), 190, np.uint8)
+        cv2.ellipse(face, (120, 150), (100, 140), 0, 0, 360, (150, 170, 210), -1)
+        for cx in (80, 160):
+            cv2.circle(face, (cx, 120), 14, (40, 40, 40), -1)
+        cv2.ellipse(face, (120, 220), (40, 15), 0, 0, 180, (60, 60, 120), 3)
+        return face
+
+
+def make_video(path, seconds=20, fps=30, size=(640, 480), image=None, seed=0):
+    """Writes an mp4 and returns its path."""
+    rng = np.random.default_rng(seed)
+    face = image if image is not None else default_face()
+
+    w, h = size
+    scale = 0.6 * h / face.shape[0]
+    face = cv2.resize(face, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    fh, fw = face.shape[:2]
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (w, h))
+    x, y = (w - fw) // 2, (h - fh) // 2
+    blink_every = int(fps * 2.5)
+
+    for i in range(int(seconds * fps)):
+        # Slow random walk, kept inside the frame
+        x = int(np.clip(x + rng.integers(-3, 4), 0, w - fw))
+        y = int(np.clip(y + rng.integers(-2, 3), 0, h - fh))
+
+        frame = np.full((h, w, 3), 235, np.uint8)
+        frame[y:y+fh, x:x+fw] = face
+
+        if i % blink_every < 12:
+            band = frame[y + fh // 4:y + fh // 2, x:x + fw]
+            frame[y + fh // 4:y + fh // 2, x:x + fw] = cv2.GaussianBlur(band, (31, 31), 0)
+
+        writer.write(frame)
+
+    writer.release()
+    return path
@@ -0,0 +1,61 @@
+"""
+Serial vs multi-process video analysis.
+
+Checks that process_video_logic returns the same dict in serial and
+parallel mode (EEG simulation seeded identically) and reports sampled
+frames per second for each worker count up to the core count.
+
+Run from flask_backend/:
+    python -m benchmarks.video_parallel                 # synthetic 60 s clip
+    python -m benchmarks.video_parallel --video clip.mp4
+"""
+import os
+import time
+import random
+import argparse
+import tempfile
+
+import cv2
+
+import main as engine
+from benchmarks.video_fixtures import make_video
+
+
+def run(video, workers):
+    random.seed(0)
+    start = time.perf_counter()
+    result = engine.process_video_logic(video, workers=workers)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video")
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video = args.video or make_video(os.path.join(tmp, "synthetic.mp4"), seconds=args.seconds)
+
+        cap = cv2.VideoCapture(video)
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        sampled = total // engine.FRAME_STRIDE
+        print(f"{video}: {total} frames, {sampled} analysed, {os.cpu_count()} cores\n")
+
+        serial, serial_secs = run(video, 0)
+        print(f"{'workers':>8} {'secs':>8} {'frames/s':>10} {'speed-up':>9} {'match':>6}")
+        print(f"{'serial':>8} {serial_secs:>8.2f} {sampled / serial_secs:>10.1f} {1.0:>9.2f} {'-':>6}")
+
+        for workers in range(2, max(2, args.max_workers) + 1):
+            engine.process_video_logic(video, workers=workers)   # warm the pool
+            result, secs = run(video, workers)
+            print(f"{workers:>8} {secs:>8.2f} {sampled / secs:>10.1f} "
+                  f"{serial_secs / secs:>9.2f} {str(result == serial):>6}")
+
+        print("\nserial result:", serial)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Whisper speed profile benchmark.
+
+For every profile in utils.speech.PROFILES, transcribes each local audio
+fixture (cache disabled) and reports:
+  - real-time factor (processing time / audio duration)
+  - drift of the reading features vs the "accurate" profile
+  - whether predict_reading gives the same status as "accurate"
+
+Run from flask_backend/:
+    python -m benchmarks.whisper_profiles fixtures/audio
+    python -m benchmarks.whisper_profiles fixtures/audio --profiles accurate fast
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import numpy as np
+from faster_whisper import decode_audio
+
+from utils.speech import PROFILES, Transcriber, get_profile
+from utils.features2 import extract_features, combine_features
+from utils.model2 import predict as predict_reading
+
+AUDIO_EXT = (".wav", ".webm", ".mp3", ".m4a", ".ogg", ".flac")
+DRIFT_KEYS = ["avg_pause", "max_pause", "pause_count", "wpm", "total_words"]
+
+
+def run_profile(name, paths, cache_dir):
+    transcriber = Transcriber(get_profile(name), pool_size=1, cache_dir=cache_dir)
+
+    # Warm-up so model load time is not counted
+    transcriber.run_whisper(paths[0])
+
+    feats, secs = [], 0.0
+    for path in paths:
+        start = time.perf_counter()
+        words = transcriber.run_whisper(path)
+        secs += time.perf_counter() - start
+        feats.append(extract_features(words))
+    return feats, secs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fixtures", help="directory of reading clips")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES))
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.fixtures, f) for f in os.listdir(args.fixtures)
+        if f.lower().endswith(AUDIO_EXT)
+    )
+    if not paths:
+        sys.exit(f"No audio fixtures in {args.fixtures}")
+
+    audio_secs = sum(len(decode_audio(p)) / 16000 for p in paths)
+    print(f"{len(paths)} clips, {audio_secs:.1f}s of audio\n")
+
+    profiles = args.profiles
+    if "accurate" not in profiles:
+        profiles = ["accurate"] + profiles
+
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for name in profiles:
+            results[name] = run_profile(name, paths, cache_dir)
+
+    ref_feats, _ = results["accurate"]
+    ref_status = [predict_reading(combine_features(f, f))["status"] for f in ref_feats]
+
+    header = f"{'profile':<10} {'RTF':>6} " + " ".join(f"{k:>12}" for k in DRIFT_KEYS) + f" {'same status':>12}"
+    print(header)
+    print("-" * len(header))
+
+    for name in profiles:
+        feats, secs = results[name]
+
+        # Mean absolute drift per feature vs the accurate profile
+        drift = {
+            k: np.mean([abs(f[k] - r[k]) for f, r in zip(feats, ref_feats)])
+            for k in DRIFT_KEYS
+        }
+        # Each clip is scored as both readings, so status only depends on that clip
+        status = [predict_reading(combine_features(f, f))["status"] for f in feats]
+        same = sum(a == b for a, b in zip(status, ref_status))
+
+        print(f"{name:<10} {secs / audio_secs:>6.3f} "
+              + " ".join(f"{drift[k]:>12.3f}" for k in DRIFT_KEYS)
+              + f" {same:>5}/{len(paths):<6}")
+
+
+if __name__ == "__main__":
+    main()
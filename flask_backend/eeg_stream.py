@@ -0,0 +1,155 @@
+"""
+eeg_stream.py
+Raw-sample EEG path: 256 Hz sample streams -> ring buffer -> sliding
+Welch band powers -> MetricsEngine. Works on simulated samples
+(RawEEGSimulator) or on samples from a real headset (e.g. MindWave raw).
+"""
+import numpy as np
+from scipy.signal import firwin2, welch
+
+from config import BANDS, BASE_POWERS, SAMPLING_RATE
+from signal_generator import BAND_NAMES, STATE_GAINS
+from metrics_engine import MetricsEngine
+
+WINDOW_SEC = 2.0     # band powers per 2 s window
+HOP_SEC = 1.0        # new window every second (50% overlap)
+SEGMENT_SEC = 1.0    # Welch segment length inside a window (1 Hz bins)
+BUFFER_SEC = 30.0
+SHAPING_TAPS = 513   # FIR length of the simulator's spectral shaping filter
+
+
+class RawEEGSimulator:
+    """
+    Coloured noise whose PSD is piecewise constant over config.BANDS: the
+    average PSD inside each band equals BASE_POWERS (uV^2/Hz) times the
+    state gain. One FIR shaping filter per state; the filter state carries
+    over between calls, so the stream is continuous.
+    """
+
+    def __init__(self, fs=SAMPLING_RATE, seed=None, numtaps=SHAPING_TAPS):
+        self.fs = fs
+        self.numtaps = numtaps
+        self.rng = np.random.default_rng(seed)
+        self._taps = {}
+        self._history = np.zeros(numtaps - 1)   # last white samples, for continuity
+
+    def _shaping(self, state):
+        if state not in self._taps:
+            gains = STATE_GAINS.get(state, {})
+            freq, amp = [0.0, BANDS[BAND_NAMES[0]][0]], [0.0, 0.0]
+            for band in BAND_NAMES:
+                lo, hi = BANDS[band]
+                # Unit white noise has one-sided PSD 2/fs; scale to the target density
+                a = np.sqrt(BASE_POWERS[band] * gains.get(band, 1.0) * self.fs / 2)
+                freq += [lo, hi]
+                amp += [a, a]
+            freq += [hi, self.fs / 2]
+            amp += [0.0, 0.0]
+            self._taps[state] = firwin2(self.numtaps, freq, amp, fs=self.fs)
+        return self._taps[state]
+
+    def generate(self, n_samples, state="NEUTRAL"):
+        """n_samples of raw signal (uV) as float32."""
+        white = np.concatenate([self._history, self.rng.standard_normal(n_samples)])
+        self._history = white[-(self.numtaps - 1):]
+        out = np.convolve(white, self._shaping(state), mode="valid")
+        return out.astype(np.float32)
+
+
+class RingBuffer:
+    """Fixed-size float32 sample buffer; `total` counts every sample ever pushed."""
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        self.total = 0
+
+    def extend(self, samples):
+        samples = np.asarray(samples, dtype=np.float32)
+        pushed = len(samples)
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        pos = (self.total + pushed - n) % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = samples[:first]
+        self.data[:n - first] = samples[first:]
+        self.total += pushed
+
+    def since(self, start):
+        """Contiguous copy of samples [start, total); start must still be buffered."""
+        if start < self.total - self.capacity:
+            raise ValueError("Requested samples were overwritten, increase buffer_sec")
+        idx = np.arange(start, self.total) % self.capacity
+        return self.data[idx]
+
+
+def band_matrix(freqs):
+    """(n_freqs, 8) averaging matrix: PSD rows @ matrix -> mean PSD per band."""
+    M = np.zeros((len(freqs), len(BAND_NAMES)))
+    for i, band in enumerate(BAND_NAMES):
+        lo, hi = BANDS[band]
+        mask = (freqs >= lo) & (freqs < hi)
+        M[mask, i] = 1.0 / max(1, mask.sum())
+    return M
+
+
+def band_powers(windows, fs=SAMPLING_RATE, segment_sec=SEGMENT_SEC):
+    """
+    Welch band powers for a batch of windows, shape (n_windows, n_samples)
+    -> (n_windows, 8) mean PSD per band (uV^2/Hz), columns in BAND_NAMES.
+    Hann segments with 50% overlap, all windows in one vectorized call.
+    """
+    windows = np.atleast_2d(windows)
+    nperseg = min(windows.shape[-1], int(segment_sec * fs))
+    freqs, psd = welch(windows, fs=fs, nperseg=nperseg, noverlap=nperseg // 2, axis=-1)
+    return psd @ band_matrix(freqs)
+
+
+def sliding_windows(samples, window, hop):
+    """(n_windows, window) strided view of complete windows every `hop` samples."""
+    if len(samples) < window:
+        return np.empty((0, window), dtype=samples.dtype)
+    return np.lib.stride_tricks.sliding_window_view(samples, window)[::hop]
+
+
+class EEGStream:
+    """
+    Push raw samples as they arrive; every window that completes is turned
+    into band powers immediately, so latency per window is one push worth
+    of Welch work (bounded by the hop, not the session length).
+    """
+
+    def __init__(self, fs=SAMPLING_RATE, window_sec=WINDOW_SEC, hop_sec=HOP_SEC, buffer_sec=BUFFER_SEC):
+        self.fs = fs
+        self.window = int(window_sec * fs)
+        self.hop = int(hop_sec * fs)
+        self.buffer = RingBuffer(max(int(buffer_sec * fs), self.window + self.hop))
+        self.next_end = self.window   # sample index where the next window ends
+
+    def push(self, samples):
+        """Adds samples; returns (n_new_windows, 8) band powers (possibly empty)."""
+        samples = np.asarray(samples, dtype=np.float32)
+        # Feed at most capacity - window at a time so no pending window gets overwritten
+        step = self.buffer.capacity - self.window
+        if len(samples) <= step:
+            return self._emit(samples)
+        return np.concatenate([self._emit(samples[i:i + step]) for i in range(0, len(samples), step)])
+
+    def _emit(self, samples):
+        self.buffer.extend(samples)
+        if self.buffer.total < self.next_end:
+            return np.empty((0, len(BAND_NAMES)))
+
+        n = (self.buffer.total - self.next_end) // self.hop + 1
+        start = self.next_end - self.window
+        span = self.buffer.since(start)[:self.window + (n - 1) * self.hop]
+        self.next_end += n * self.hop
+        return band_powers(sliding_windows(span, self.window, self.hop), self.fs)
+
+    def push_metrics(self, samples, behavior_metrics, vision_metrics):
+        """push() + MetricsEngine.compute_arrays on the new windows (None if none)."""
+        powers = self.push(samples)
+        if not len(powers):
+            return None
+        eeg = {band: powers[:, i] for i, band in enumerate(BAND_NAMES)}
+        return MetricsEngine.compute_arrays(eeg, behavior_metrics, vision_metrics)
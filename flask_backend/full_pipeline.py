@@ -2,17 +2,14 @@ import requests
 from groq_client import ask_groq
 from pdf_generator import make_pdf
 from cloudinary_uploader import upload_pdf
-from utils.db import get_connection
+from utils.db import connection
 
 def save_report_url(session_id, url):
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        "UPDATE child_assessment_features SET report_url=%s WHERE id=%s",
-        (url, session_id)
-    )
-    conn.commit()
-    conn.close()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(
+            "UPDATE child_assessment_features SET report_url=%s WHERE id=%s",
+            (url, session_id)
+        )
 
 def run_pipeline(session_id):
     base = "http://localhost:5000/predict"
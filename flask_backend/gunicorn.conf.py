@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))   # full reports can take minutes
+
+# Import the app (and PRELOAD_MODELS) once in the master; forked workers
+# share those pages copy-on-write instead of each loading its own copy.
+# Whisper is left out by default: its CTranslate2 thread pools are not fork-safe.
+preload_app = True
+os.environ.setdefault("PRELOAD_MODELS", "math,emotion,emotion_encoder,hearing,cognition,reading_scaler,reading")
+
+
+def pre_fork(server, worker):
+    # Move preloaded objects out of the GC's reach, so collections in the
+    # workers don't write to (and un-share) those pages
+    gc.freeze()
@@ -1,34 +1,19 @@
-import psycopg2, select, requests
-from utils.db import get_connection
-from dotenv import load_dotenv
+from utils.job_queue import listen, enqueue, ensure_schema
 
-load_dotenv()
+# Standalone enqueuer: records a durable report job for every new child.
+# worker.py listens on the same channel itself, so this is only needed
+# when jobs should be captured while no worker is running.
 
-conn = get_connection()
-conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-cur = conn.cursor()
+def on_new_session(session_id):
+    print("📩 New child inserted:", session_id)
 
-cur.execute("LISTEN neurobloom;")
+    try:
+        enqueue(session_id)
+    except Exception as e:
+        print("Queue error:", e)
 
-print("🧠 NeuroBloom listening for new children...")
 
-while True:
-    if select.select([conn],[],[],5)==([],[],[]):
-        continue
-
-    conn.poll()
-
-    while conn.notifies:
-        notify = conn.notifies.pop(0)
-        session_id = notify.payload
-
-        print("📩 New child inserted:", session_id)
-
-        try:
-            requests.post(
-                "http://localhost:5000/predict/full_report_final",
-                json={"session_id": session_id},
-                timeout=20
-            )
-        except Exception as e:
-            print("Pipeline error:", e)
+if __name__ == "__main__":
+    ensure_schema()
+    print("🧠 NeuroBloom listening for new children...")
+    listen(on_new_session)
@@ -1,105 +1,391 @@
 import json
 import time
+import random
 import numpy as np
 import cv2
 import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from signal_generator import EEGSimulator, as_band_dict
+from behavioral_processor import BehavioralProcessor, stream_windows, features_for_times
+from metrics_engine import MetricsEngine, METRIC_DECIMALS
+from session_stats import SessionAccumulator
+
+FRAME_STRIDE = 3   # har teesra frame analyse hota hai
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", "0"))   # 0/1 = serial
+# "grab" skips unsampled frames without decoding them (same frames as "read")
+VIDEO_DECODE = os.getenv("VIDEO_DECODE", "grab")
+# Optional: sample at this rate instead of every FRAME_STRIDE-th frame
+VIDEO_SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", "0"))
+# Optional: run the face cascade on a frame downscaled to this height
+VIDEO_DETECT_HEIGHT = int(os.getenv("VIDEO_DETECT_HEIGHT", "0"))
+# Optional: full face scan every K sampled frames, windowed search in between
+VIDEO_TRACK_EVERY = int(os.getenv("VIDEO_TRACK_EVERY", "0"))
+TRACK_PADDING = 0.5   # window = last box grown by half its size on each side
+MIN_FRAMES_PER_CHUNK = 300
+AGGREGATE_BLOCK = 1024   # frames scored per compute_arrays call
+# HID feature windows joined to the frames (ms); hop < window gives sliding windows
+BEHAVIOR_WINDOW_MS = int(os.getenv("BEHAVIOR_WINDOW_MS", "5000"))
+BEHAVIOR_HOP_MS = int(os.getenv("BEHAVIOR_HOP_MS", "1000"))
+
+_pool = None
+_pool_workers = 0
 
-from signal_generator import EEGSimulator
-from behavioral_processor import BehavioralProcessor
-from metrics_engine import MetricsEngine
 
 def get_gaze_ratio(eye_roi):
     try:
         gray_eye = cv2.cvtColor(eye_roi, cv2.COLOR_BGR2GRAY)
         h, w = gray_eye.shape
-        gray_eye = gray_eye[int(h*0.3):, :] 
-        gray_eye = cv2.equalizeHist(gray_eye) 
+        gray_eye = gray_eye[int(h*0.3):, :]
+        gray_eye = cv2.equalizeHist(gray_eye)
         min_loc = cv2.minMaxLoc(gray_eye)[2]
         return min_loc[0] / w
     except:
         return 0.5
 
-def process_video_logic(video_path):
-    print(f"[ENGINE] Starting Deep Feature Analysis: {video_path}")
-    
+
+def _load_cascades():
+    return (
+        cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'),
+        cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml'),
+    )
+
+
+_cascades = threading.local()
+
+
+def _get_cascades():
+    # detectMultiScale is not safe on one classifier from several threads,
+    # so each thread (request threads, analyzer pool, pool workers) gets its own pair
+    pair = getattr(_cascades, "pair", None)
+    if pair is None:
+        pair = _cascades.pair = _load_cascades()
+    return pair
+
+
+def video_fps(video_path):
+    """Container fps, or 0 when it is not reported."""
     cap = cv2.VideoCapture(video_path)
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-    
-    eeg_sim = EEGSimulator()
-    behavior_proc = BehavioralProcessor()
-    
-    # State Tracking
-    blink_counter = 0
-    eyes_closed_frames = 0
-    session_logs = [] # Yahan har frame ka detailed metrics store hoga
-    frame_count = 0
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    cap.release()
+    return fps if fps > 0 else 0
+
+
+def sample_stride(video_path, sample_fps=0):
+    """Frame stride: FRAME_STRIDE, or derived from the video fps when sample_fps is set."""
+    if not sample_fps:
+        return FRAME_STRIDE
+    fps = video_fps(video_path)
+    if not fps:
+        return FRAME_STRIDE
+    return max(1, int(round(fps / sample_fps)))
+
+
+def detect_faces(face_cascade, gray, detect_height=0):
+    """
+    Face boxes in full-resolution coordinates. With detect_height the
+    cascade runs on a downscaled copy and boxes are scaled back up.
+    """
+    h = gray.shape[0]
+    if not detect_height or h <= detect_height:
+        return face_cascade.detectMultiScale(gray, 1.1, 4)
+
+    scale = detect_height / h
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    faces = face_cascade.detectMultiScale(small, 1.1, 4)
+    if len(faces) == 0:
+        return faces
+
+    boxes = np.round(np.asarray(faces, dtype=float) / scale).astype(int)
+    # Keep mapped boxes inside the frame
+    boxes[:, 2] = np.minimum(boxes[:, 2], gray.shape[1] - boxes[:, 0])
+    boxes[:, 3] = np.minimum(boxes[:, 3], h - boxes[:, 1])
+    return boxes
+
+
+def track_faces(face_cascade, gray, last_faces):
+    """
+    Re-finds each previous face inside a padded window around its last box,
+    only scanning scales close to the previous size. Returns None when any
+    face is lost so the caller can fall back to a full scan.
+    """
+    H, W = gray.shape
+    found = []
+
+    for (x, y, w, h) in last_faces:
+        px, py = int(w * TRACK_PADDING), int(h * TRACK_PADDING)
+        x0, y0 = max(0, x - px), max(0, y - py)
+        x1, y1 = min(W, x + w + px), min(H, y + h + py)
+
+        hits = face_cascade.detectMultiScale(
+            gray[y0:y1, x0:x1], 1.1, 4,
+            minSize=(int(w * 0.7), int(h * 0.7)), maxSize=(int(w * 1.4), int(h * 1.4))
+        )
+        if len(hits) == 0:
+            return None
+
+        # Closest hit to the previous centre
+        cx, cy = x + w / 2 - x0, y + h / 2 - y0
+        hx, hy, hw, hh = min(hits, key=lambda b: (b[0] + b[2] / 2 - cx) ** 2 + (b[1] + b[3] / 2 - cy) ** 2)
+        found.append((x0 + hx, y0 + hy, hw, hh))
+
+    return found
+
+
+def detect_frames(video_path, start=0, stop=None, stride=FRAME_STRIDE,
+                  decode=VIDEO_DECODE, detect_height=VIDEO_DETECT_HEIGHT,
+                  track_every=VIDEO_TRACK_EVERY):
+    """
+    Vision pass over frame indices [start, stop) (stop=None -> till the end).
+    Returns one record per sampled frame: a list of per-face tuples
+    (yaw_velocity, eyes_found, gaze_deviation or None) in detection order.
+    Stateless, so ranges can be processed independently and concatenated.
+
+    decode="grab" only decodes the sampled frames; "read" decodes every frame.
+    track_every=K runs a full face scan on the first of every K sampled
+    frames (counted from frame 0, not from start) and only tracks the
+    previous boxes in between.
+    """
+    face_cascade, eye_cascade = _get_cascades()
+    cap = cv2.VideoCapture(video_path)
+    records = []
+    last_faces = []
 
     try:
         if not cap.isOpened():
-            return {"error": "Could not open video file"}
+            raise IOError("Could not open video file")
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
 
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            
-            frame_count += 1
-            if frame_count % 3 != 0: continue # Speed Optimization
+        frame_count = start
+        while stop is None or frame_count < stop:
+            if decode == "read":
+                ret, frame = cap.read()
+                if not ret: break
+                frame_count += 1
+                if frame_count % stride != 0: continue # Speed Optimization
+            else:
+                if not cap.grab(): break
+                frame_count += 1
+                if frame_count % stride != 0: continue # skipped frames are never decoded
+                ret, frame = cap.retrieve()
+                if not ret: break
 
             frame = cv2.flip(frame, 1)
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # --- 1. VISION METRICS ---
-            vision_metrics = {"yaw_velocity": 0, "gaze_deviation": 0, "blink_count": blink_counter}
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
-            
+
+            faces_info = []
+            faces = None
+            if track_every > 1 and len(last_faces) > 0 and (frame_count // stride - 1) % track_every != 0:
+                faces = track_faces(face_cascade, gray, last_faces)
+            if faces is None:
+                faces = detect_faces(face_cascade, gray, detect_height)
+            last_faces = [tuple(int(v) for v in box) for box in faces]
+
             for (x, y, w, h) in faces:
                 face_center = x + (w / 2)
                 yaw_raw = (face_center - (frame.shape[1]/2)) / (frame.shape[1]/2)
-                vision_metrics['yaw_velocity'] = abs(yaw_raw) * 100 
 
                 roi_gray = gray[y:y+h, x:x+w]
                 eyes = eye_cascade.detectMultiScale(roi_gray, 1.1, 5)
-                
-                if len(eyes) == 0:
-                    eyes_closed_frames += 1
-                else:
-                    if eyes_closed_frames > 2: blink_counter += 1
-                    eyes_closed_frames = 0
-                    gaze_offsets = [abs(get_gaze_ratio(frame[y+ey:y+ey+eh, x+ex:x+ex+ew]) - 0.5) 
+
+                gaze = None
+                if len(eyes) > 0:
+                    gaze_offsets = [abs(get_gaze_ratio(frame[y+ey:y+ey+eh, x+ex:x+ex+ew]) - 0.5)
                                     for (ex, ey, ew, eh) in eyes if ey < h/2]
                     if gaze_offsets:
-                        vision_metrics['gaze_deviation'] = np.mean(gaze_offsets) * 2
-
-            # --- 2. BEHAVIORAL MOCKING (Required for MetricsEngine) ---
-            # Hum default behavioral features bhej rahe hain taaki engine crash na ho
-            mock_mouse = {'velocity_avg': 0.8, 'jerk_avg': 0.2, 'idle_ratio': 0.1}
-            mock_keys = {'flight_time_var': 150, 'error_rate': 0.02, 'dwell_time_avg': 0.1}
-            behavior_feats = {**mock_mouse, **mock_keys}
-            
-            # --- 3. EEG & METRICS CALCULATION ---
-            sim_state = "DISTRACTED" if vision_metrics['gaze_deviation'] > 0.5 else "FOCUSED"
-            eeg_epoch = eeg_sim.generate_epoch(state=sim_state)
-            
-            # MetricsEngine se 12 features calculate karna
-            frame_report = MetricsEngine.compute_all(eeg_epoch, behavior_feats, vision_metrics)
-            session_logs.append(frame_report)
-
-        # --- 4. FINAL AGGREGATION (Returns all 12 features) ---
-        if not session_logs:
-            return {"error": "No data analyzed"}
-
-        # Sabhi features ka average nikalna
-        keys_to_average = session_logs[0].keys()
-        final_analysis = {}
-        
-        for key in keys_to_average:
-            avg_val = np.mean([log[key] for log in session_logs])
-            final_analysis[key] = round(float(avg_val), 2)
-
-        return final_analysis # Yeh exactly aapka required format return karega
+                        gaze = np.mean(gaze_offsets) * 2
+
+                faces_info.append((abs(yaw_raw) * 100, len(eyes) > 0, gaze))
+
+            records.append(faces_info)
+    finally:
+        cap.release()
+
+    return records
+
+
+def _detect_chunk(args):
+    video_path, start, stop, options = args
+    return detect_frames(video_path, start, stop, **options)
+
+
+def _get_pool(workers):
+    # Spawned (not forked) workers: the Flask process is multi-threaded
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _pool_workers = workers
+    return _pool
+
+
+def detect_frames_parallel(video_path, workers, **options):
+    """
+    Splits the video into frame-index ranges (aligned to the stride) and
+    runs detect_frames on each range in a process pool. Falls back to a
+    single pass when the container does not report a usable frame count.
+    """
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+
+    chunks = min(workers, total // MIN_FRAMES_PER_CHUNK)
+    if chunks < 2:
+        return detect_frames(video_path, **options)
+
+    # Chunks start on a full-scan frame so tracking sees the same state as serial
+    align = options.get("stride", FRAME_STRIDE) * max(1, options.get("track_every", 0))
+    size = -(-total // chunks)
+    size += (-size) % align
+    bounds = [i * size for i in range(chunks)] + [None]   # last chunk reads to EOF
+    ranges = [(video_path, bounds[i], bounds[i + 1], options) for i in range(chunks)]
+
+    records = []
+    for part in _get_pool(workers).map(_detect_chunk, ranges):
+        records.extend(part)
+    return records
+
+
+class BlinkTracker:
+    """Counts a blink when eyes reappear after more than 2 closed samples."""
+
+    def __init__(self):
+        self.blink_counter = 0
+        self.eyes_closed_frames = 0
+
+    def update(self, eyes_found):
+        if not eyes_found:
+            self.eyes_closed_frames += 1
+        else:
+            if self.eyes_closed_frames > 2: self.blink_counter += 1
+            self.eyes_closed_frames = 0
+
+
+def replay_vision(records, blinks=None):
+    """Yields the per-frame vision_metrics dict for each record, in order."""
+    blinks = blinks or BlinkTracker()
+
+    for faces_info in records:
+        vision_metrics = {"yaw_velocity": 0, "gaze_deviation": 0, "blink_count": blinks.blink_counter}
+
+        for yaw_velocity, eyes_found, gaze in faces_info:
+            vision_metrics['yaw_velocity'] = yaw_velocity
+            blinks.update(eyes_found)
+            if eyes_found and gaze is not None:
+                vision_metrics['gaze_deviation'] = gaze
+
+        yield vision_metrics
+
+
+def aggregate_session(records, samples_per_minute=60 * 30 / FRAME_STRIDE,
+                      behavior_windows=None, behavior_start=0):
+    """
+    Replays the per-frame records in order: blink state machine, behaviour
+    features, simulated EEG and MetricsEngine. Frames are simulated and
+    scored in blocks of AGGREGATE_BLOCK (generate_epochs + compute_arrays)
+    and streamed into a SessionAccumulator, so memory stays flat for long
+    sessions.
+    Returns the 12 session averages plus a per-minute "timeline".
+
+    behavior_windows: (window_end, features) list from
+    behavioral_processor.stream_windows (ms). Each sampled frame is joined
+    to the window containing its timestamp (behavior_start + frame time);
+    without windows the fixed mock features are used.
+    """
+    # Seeded from the random module so random.seed() still makes runs reproducible
+    eeg_sim = EEGSimulator(seed=random.getrandbits(64))
+    behavior_proc = BehavioralProcessor()
+    blinks = BlinkTracker()
+
+    # --- 2. BEHAVIORAL MOCKING (Required for MetricsEngine) ---
+    # Hum default behavioral features bhej rahe hain taaki engine crash na ho
+    mock_mouse = {'velocity_avg': 0.8, 'jerk_avg': 0.2, 'idle_ratio': 0.1}
+    mock_keys = {'flight_time_var': 150, 'error_rate': 0.02, 'dwell_time_avg': 0.1}
+    behavior_feats = {**mock_mouse, **mock_keys}
+
+    stats = SessionAccumulator(METRIC_DECIMALS, samples_per_minute) # list nahi banti, sirf running stats
+    sample_ms = 60000.0 / samples_per_minute
+    block = []
+
+    def flush():
+        # MetricsEngine se 12 features calculate karna, poore block par ek saath
+        vision = {k: np.array([vm[k] for vm in block]) for k in ("yaw_velocity", "gaze_deviation")}
+
+        behavior = behavior_feats
+        if behavior_windows:
+            # Real HID data: frame k is sampled at (k + 1) * sample_ms into the video
+            first = stats.count + 1
+            times = behavior_start + np.arange(first, first + len(block)) * sample_ms
+            behavior = features_for_times(behavior_windows, times)
+
+        # --- 3. EEG & METRICS CALCULATION ---
+        sim_states = np.where(vision['gaze_deviation'] > 0.5, "DISTRACTED", "FOCUSED")
+        eeg = as_band_dict(eeg_sim.generate_epochs(len(block), sim_states))
+
+        reports = MetricsEngine.compute_arrays(eeg, behavior, vision)
+        stats.add_many(reports, [vm['blink_count'] for vm in block])
+        block.clear()
+
+    # --- 1. VISION METRICS ---
+    for vision_metrics in replay_vision(records, blinks):
+        block.append(vision_metrics)
+        if len(block) == AGGREGATE_BLOCK:
+            flush()
+
+    if block:
+        flush()
+
+    # --- 4. FINAL AGGREGATION (Returns all 12 features) ---
+    if not stats.count:
+        return {"error": "No data analyzed"}
+
+    final_analysis, timeline = stats.finalize(blinks.blink_counter)
+    final_analysis["timeline"] = timeline
+    return final_analysis # 12 features + per-minute timeline
+
+
+def process_video_logic(video_path, workers=None, sample_fps=None,
+                        decode=None, detect_height=None, track_every=None,
+                        behavior_logs=None):
+    """
+    workers: process count for the vision pass (default VIDEO_WORKERS);
+    0 or 1 runs serially. Both modes produce the same per-frame records,
+    so the result only differs by the random EEG simulation.
+    sample_fps / decode / detect_height / track_every default to the VIDEO_*
+    settings; sample_fps=0, decode="read", detect_height=0, track_every=0 is
+    the exact original path.
+    behavior_logs: optional {"mouse": [(t, x, y)], "keys": [(t, key, event)],
+    "start": log time at the first video frame}, timestamps in ms. When
+    given, per-window HID features replace the mock behaviour values.
+    """
+    print(f"[ENGINE] Starting Deep Feature Analysis: {video_path}")
+    workers = VIDEO_WORKERS if workers is None else workers
+    options = {
+        "stride": sample_stride(video_path, VIDEO_SAMPLE_FPS if sample_fps is None else sample_fps),
+        "decode": VIDEO_DECODE if decode is None else decode,
+        "detect_height": VIDEO_DETECT_HEIGHT if detect_height is None else detect_height,
+        "track_every": VIDEO_TRACK_EVERY if track_every is None else track_every,
+    }
+
+    try:
+        if workers > 1:
+            records = detect_frames_parallel(video_path, workers, **options)
+        else:
+            records = detect_frames(video_path, **options)
+
+        windows, start = None, 0
+        if behavior_logs:
+            start = behavior_logs.get("start", 0)
+            windows = stream_windows(behavior_logs.get("mouse", ()), behavior_logs.get("keys", ()),
+                                     window=BEHAVIOR_WINDOW_MS, hop=BEHAVIOR_HOP_MS, start=start)
+
+        fps = video_fps(video_path) or 30
+        return aggregate_session(records, samples_per_minute=60 * fps / options["stride"],
+                                 behavior_windows=windows, behavior_start=start)
 
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        cap.release()
\ No newline at end of file
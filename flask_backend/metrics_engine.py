@@ -4,75 +4,118 @@ Computes high-level cognitive metrics from fused sensor data.
 """
 import numpy as np
 
+# Output keys and their rounding (decimals), in report order
+METRIC_DECIMALS = {
+    "engagement_score": 2,
+    "motor_fatigue_rate": 2,
+    "focus_ratio": 2,
+    "hyperactivity_index": 2,
+    "theta_beta_ratio": 2,
+    "lookaway_frequency": 1,
+    "cognitive_load_index": 2,
+    "stress_index": 2,
+    "head_stability": 1,
+    "writing_consistency_score": 2,
+    "blink_variability": 2,
+    "distraction_time_sec": 1,
+}
+
+
+def _ratio(num, den):
+    """num / den where den > 0, else 0 (same guard as the scalar formulas)."""
+    ok = den > 0
+    return np.where(ok, num / np.where(ok, den, 1.0), 0.0)
+
+
 class MetricsEngine:
     @staticmethod
-    def compute_all(eeg_power, behavior_metrics, vision_metrics):
+    def compute_arrays(eeg_power, behavior_metrics, vision_metrics, rounded=True):
         """
-        eeg_power: dict of 8 bands
-        behavior_metrics: dict from BehavioralProcessor
-        vision_metrics: dict (yaw, gaze, blink_count)
+        Vectorized compute_all over n epochs in one pass.
+        eeg_power: structured array or dict of band arrays, shape (n,)
+        behavior_metrics / vision_metrics: dicts of arrays or scalars
+        (scalars broadcast). Missing vision keys count as 0.
+        Returns a dict of 12 float64 arrays, rounded like compute_all
+        unless rounded=False.
         """
-        
+        f = lambda src, key: np.asarray(src[key], dtype=np.float64)
+
         # --- 1. EEG DERIVATIVES ---
-        theta = eeg_power['theta']
-        beta = eeg_power['low_beta']
-        alpha = eeg_power['low_alpha'] + eeg_power['high_alpha']
-        gamma = eeg_power['low_gamma'] + eeg_power['mid_gamma']
-        
+        theta = f(eeg_power, 'theta')
+        beta = f(eeg_power, 'low_beta')
+        alpha = f(eeg_power, 'low_alpha') + f(eeg_power, 'high_alpha')
+        gamma = f(eeg_power, 'low_gamma') + f(eeg_power, 'mid_gamma')
+        n = theta.shape
+
         # Theta/Beta Ratio (ADHD Marker)
         # Range: 1.0 - 5.0 (Higher is worse)
-        tbr = theta / beta if beta > 0 else 0
+        tbr = _ratio(theta, beta)
 
         # Cognitive Load Index (Dyscalculia Marker)
         # Gamma (Processing) vs Theta (Drift)
-        cli = gamma / theta if theta > 0 else 0
-        
+        cli = _ratio(gamma, theta)
+
         # Stress Index (Dyscalculia/Anxiety Marker)
         # High Beta (Anxiety) vs Alpha (Relaxation)
-        stress_index = eeg_power['high_beta'] / alpha if alpha > 0 else 0
+        stress_index = _ratio(f(eeg_power, 'high_beta'), alpha)
 
         # Engagement Score (General)
         # Beta / (Theta + Alpha) -> Ratio of Engagement vs Idleness
-        engagement = beta / (theta + alpha) if (theta + alpha) > 0 else 0
+        engagement = _ratio(beta, theta + alpha)
 
         # Motor Fatigue (Dysgraphia Marker)
-        # Simplistic: High Alpha during active task
-        motor_fatigue = 0.0
-        if behavior_metrics['velocity_avg'] > 1.0: # Active movement
-            # If moving fast but Alpha is high, brain is fatiguing
-            motor_fatigue = (alpha / 20000.0) 
+        # If moving fast (active movement) but Alpha is high, brain is fatiguing
+        motor_fatigue = np.where(f(behavior_metrics, 'velocity_avg') > 1.0, alpha / 20000.0, 0.0)
 
         # --- 2. BEHAVIORAL DERIVATIVES ---
-        
+        yaw = f(vision_metrics, 'yaw_velocity') if 'yaw_velocity' in vision_metrics else 0.0
+        gaze = f(vision_metrics, 'gaze_deviation') if 'gaze_deviation' in vision_metrics else 0.0
+
         # Hyperactivity Index (ADHD Marker)
         # High mouse jerk + high head velocity (simulated via vision yaw)
-        head_instability = abs(vision_metrics.get('yaw_velocity', 0))
-        hyperactivity = (behavior_metrics['jerk_avg'] * 10) + head_instability
+        head_instability = np.abs(yaw)
+        hyperactivity = (f(behavior_metrics, 'jerk_avg') * 10) + head_instability
 
         # Focus Ratio
         # Inverted Lookaway + Low Idle time
-        lookaway_penalty = vision_metrics.get('gaze_deviation', 0) * 0.5
-        idle_penalty = behavior_metrics['idle_ratio'] * 0.3
-        focus_ratio = 1.0 - (lookaway_penalty + idle_penalty)
-        focus_ratio = max(0.0, min(1.0, focus_ratio))
+        lookaway_penalty = gaze * 0.5
+        idle_penalty = f(behavior_metrics, 'idle_ratio') * 0.3
+        focus_ratio = np.clip(1.0 - (lookaway_penalty + idle_penalty), 0.0, 1.0)
 
         # Writing Consistency (Dysgraphia Proxy)
         # High typing error rate + High flight time variance
-        writing_inconsistency = (behavior_metrics['error_rate'] * 2) + \
-                                (behavior_metrics['flight_time_var'] / 1000.0)
+        writing_inconsistency = (f(behavior_metrics, 'error_rate') * 2) + \
+                                (f(behavior_metrics, 'flight_time_var') / 1000.0)
 
         # --- 3. RETURN STRUCTURE ---
-        return {
-            "engagement_score": round(engagement, 2),
-            "motor_fatigue_rate": round(motor_fatigue, 2),
-            "focus_ratio": round(focus_ratio, 2),
-            "hyperactivity_index": round(hyperactivity, 2),
-            "theta_beta_ratio": round(tbr, 2),
-            "lookaway_frequency": round(vision_metrics.get('gaze_deviation', 0) * 10, 1), # Events/min
-            "cognitive_load_index": round(cli, 2),
-            "stress_index": round(stress_index, 2),
-            "head_stability": round(100 - head_instability, 1),
-            "writing_consistency_score": round(1.0 - min(1.0, writing_inconsistency), 2),
-            "blink_variability": 0.5, # Placeholder for time-series calculation
-            "distraction_time_sec": round((1.0 - focus_ratio) * 60, 1) # Per minute
-        }
\ No newline at end of file
+        out = {
+            "engagement_score": engagement,
+            "motor_fatigue_rate": motor_fatigue,
+            "focus_ratio": focus_ratio,
+            "hyperactivity_index": hyperactivity,
+            "theta_beta_ratio": tbr,
+            "lookaway_frequency": gaze * 10, # Events/min
+            "cognitive_load_index": cli,
+            "stress_index": stress_index,
+            "head_stability": 100 - head_instability,
+            "writing_consistency_score": 1.0 - np.minimum(1.0, writing_inconsistency),
+            "blink_variability": 0.5, # Session-level, see session_stats.SessionAccumulator
+            "distraction_time_sec": (1.0 - focus_ratio) * 60, # Per minute
+        }
+        out = {k: np.broadcast_to(np.asarray(v, dtype=np.float64), n) for k, v in out.items()}
+
+        if rounded:
+            out = {k: np.round(v, METRIC_DECIMALS[k]) for k, v in out.items()}
+        return out
+
+    @staticmethod
+    def compute_all(eeg_power, behavior_metrics, vision_metrics):
+        """
+        eeg_power: dict of 8 bands
+        behavior_metrics: dict from BehavioralProcessor
+        vision_metrics: dict (yaw, gaze, blink_count)
+        Single-epoch wrapper over compute_arrays; rounds with Python round()
+        so results are unchanged from the scalar implementation.
+        """
+        raw = MetricsEngine.compute_arrays(eeg_power, behavior_metrics, vision_metrics, rounded=False)
+        return {k: round(float(v), METRIC_DECIMALS[k]) for k, v in raw.items()}
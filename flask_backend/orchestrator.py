@@ -0,0 +1,95 @@
+"""
+orchestrator.py
+Runs the six per-test analyzers for one session in-process and in parallel.
+The session row is fetched once and shared by every module.
+"""
+import os
+import json
+import time
+import uuid
+import decimal
+import datetime
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.http import http_date
+
+from utils.fetch import fetch_session
+from analyzers import (
+    analyze_dyscalculia,
+    analyze_reading,
+    analyze_emotion,
+    analyze_test5,
+    analyze_test6,
+    analyze_handwriting_session,
+)
+
+# full_json key -> analyzer
+MODULES = {
+    "math": analyze_dyscalculia,
+    "reading": analyze_reading,
+    "emotion": analyze_emotion,
+    "hearing": analyze_test5,
+    "cognition": analyze_test6,
+    "handwriting": analyze_handwriting_session,
+}
+
+MAX_WORKERS = int(os.getenv("ANALYZER_WORKERS", "6"))
+
+# Shared bounded pool: concurrent reports queue up instead of spawning threads
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analyzer")
+
+
+def _json_default(o):
+    """What jsonify did for the old loopback routes, plus numpy values (workers run outside the app context)."""
+    if hasattr(o, "tolist"):   # numpy scalar / array
+        return o.tolist()
+    if isinstance(o, datetime.date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _run_module(name, analyzer, session_id, row):
+    start = time.perf_counter()
+    try:
+        payload, _ = analyzer(session_id, row)
+        # Same plain-JSON shape the old HTTP loopback calls returned
+        payload = json.loads(json.dumps(payload, sort_keys=True, default=_json_default))
+    except Exception as e:
+        print(f"[ORCHESTRATOR] {name} failed: {e}")
+        payload = {"error": str(e)}
+    return payload, round((time.perf_counter() - start) * 1000, 1)
+
+
+def run_all_modules(session_id, row=None):
+    """
+    Returns (full_json, timings_ms) or (None, None) if the session does not exist.
+    full_json matches the layout sent to the LLM; timings_ms has one entry per
+    module plus "total" (wall clock of the whole fan-out).
+    """
+    if row is None:
+        row = fetch_session(session_id)
+    if not row:
+        return None, None
+
+    start = time.perf_counter()
+    futures = {
+        name: _executor.submit(_run_module, name, analyzer, session_id, row)
+        for name, analyzer in MODULES.items()
+    }
+
+    full_json = {"session_id": session_id}
+    timings = {}
+    for name, future in futures.items():
+        full_json[name], timings[name] = future.result()
+
+    timings["total"] = round((time.perf_counter() - start) * 1000, 1)
+    print(f"[ORCHESTRATOR] {session_id} module timings (ms): {timings}")
+
+    return full_json, timings
@@ -7,7 +7,16 @@ import json
 import os
 import time
 
-def create_pdf(full_json, llm_response):
+def create_pdf(full_json, llm_response, engine="llm"):
+    """
+    Renders the report to reports/<session_id>.pdf. engine is who wrote
+    llm_response (utils/report_engine.py); anything but "llm" gets a
+    note that the offline rule engine generated it.
+    """
+    if llm_response is None:
+        print("[PDF ERROR] No LLM report to render")
+        return None
+
     try:
         # Robust JSON parsing
         if isinstance(llm_response, str):
@@ -61,6 +70,14 @@ def create_pdf(full_json, llm_response):
     ]))
     story.append(meta_table)
 
+    # Rule-based fallback reports are marked, so they are not mistaken for the AI analysis
+    if engine != "llm":
+        note_style = ParagraphStyle('EngineNote', parent=normal_style, textColor=WARNING_ORANGE, spaceBefore=8)
+        reason = " because the AI analysis was unavailable" if engine == "local_fallback" else ""
+        story.append(Paragraph(
+            f"<b>Note:</b> This report was generated by the offline rule engine{reason}. Screening levels "
+            "follow fixed rules on the test scores; please have a clinician review it.", note_style))
+
     # 2. Risk Matrix (Matching new prompt structure)
     story.append(Paragraph("I. Clinical Risk Screening Matrix", header_style))
     
@@ -0,0 +1,136 @@
+"""
+session_stats.py
+Constant-memory aggregation of the per-frame MetricsEngine reports.
+"""
+import numpy as np
+
+BLINK_VARIABILITY_DEFAULT = 0.5   # reported when there is too little data
+MIN_WINDOW_FRACTION = 0.5         # partial last minute counts if at least half full
+PERCENTILES = (10, 50, 90)
+
+
+class SessionAccumulator:
+    """
+    Streams frame reports into running Welford mean/variance per metric and
+    one preallocated minute window. Each full window is reduced to a
+    per-minute row (mean, std, percentiles, blinks), so memory does not
+    grow with session length.
+    """
+
+    def __init__(self, keys, samples_per_minute):
+        self.keys = list(keys)
+        self.samples_per_minute = max(1, int(samples_per_minute))
+
+        n = len(self.keys)
+        self.count = 0
+        self.mean = np.zeros(n)
+        self.m2 = np.zeros(n)
+
+        self._window = np.empty((self.samples_per_minute, n))
+        self._filled = 0
+        self._window_blinks = 0   # blink counter at the start of the window
+        self._blinks = 0
+        self.minutes = []
+
+    def add(self, report, blink_count=None):
+        """report: one 12-key MetricsEngine dict; blink_count: running blink total."""
+        x = np.fromiter((report[k] for k in self.keys), dtype=np.float64, count=len(self.keys))
+
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+        self._window[self._filled] = x
+        self._filled += 1
+        if blink_count is not None:
+            self._blinks = blink_count
+
+        if self._filled == self.samples_per_minute:
+            self._close_window()
+
+    def add_many(self, columns, blink_counts=None):
+        """
+        Adds a block of frames at once. columns: dict of (n,) arrays, one
+        per metric (e.g. MetricsEngine.compute_arrays output); blink_counts:
+        running blink total per frame. Merges the block statistics with the
+        running ones (Chan et al.), then fills the minute windows.
+        """
+        X = np.column_stack([np.asarray(columns[k], dtype=np.float64) for k in self.keys])
+        m = len(X)
+        if not m:
+            return
+
+        block_mean = X.mean(axis=0)
+        block_m2 = ((X - block_mean) ** 2).sum(axis=0)
+        total = self.count + m
+        delta = block_mean - self.mean
+        self.mean += delta * (m / total)
+        self.m2 += block_m2 + delta ** 2 * (self.count * m / total)
+        self.count = total
+
+        pos = 0
+        while pos < m:
+            take = min(self.samples_per_minute - self._filled, m - pos)
+            self._window[self._filled:self._filled + take] = X[pos:pos + take]
+            self._filled += take
+            pos += take
+            if blink_counts is not None:
+                self._blinks = blink_counts[pos - 1]
+            if self._filled == self.samples_per_minute:
+                self._close_window()
+
+    def _close_window(self):
+        w = self._window[:self._filled]
+        mean = w.mean(axis=0)
+        std = w.std(axis=0)
+        pct = np.percentile(w, PERCENTILES, axis=0)
+
+        self.minutes.append({
+            "minute": len(self.minutes) + 1,
+            "samples": self._filled,
+            "blinks": self._blinks - self._window_blinks,
+            "metrics": {
+                k: {
+                    "mean": round(float(mean[i]), 3),
+                    "std": round(float(std[i]), 3),
+                    **{f"p{p}": round(float(pct[j, i]), 3) for j, p in enumerate(PERCENTILES)},
+                }
+                for i, k in enumerate(self.keys)
+            },
+        })
+        self._window_blinks = self._blinks
+        self._filled = 0
+
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros(len(self.keys))
+
+    def blink_variability(self):
+        """
+        Coefficient of variation of the per-minute blink rate. Needs at
+        least two minutes (a partial last minute counts if half full).
+        """
+        rates = [
+            m["blinks"] * self.samples_per_minute / m["samples"]
+            for m in self.minutes
+            if m["samples"] >= self.samples_per_minute * MIN_WINDOW_FRACTION
+        ]
+        if len(rates) < 2 or np.mean(rates) <= 0:
+            return BLINK_VARIABILITY_DEFAULT
+        return float(np.std(rates) / np.mean(rates))
+
+    def finalize(self, blink_count=None):
+        """
+        Flushes the partial last minute and returns (summary, timeline):
+        the session means rounded like before, with blink_variability
+        computed from the timeline, and the per-minute rows.
+        """
+        if blink_count is not None:
+            self._blinks = blink_count
+        if self._filled:
+            self._close_window()
+
+        summary = {k: round(float(self.mean[i]), 2) for i, k in enumerate(self.keys)}
+        if "blink_variability" in summary:
+            summary["blink_variability"] = round(self.blink_variability(), 2)
+        return summary, self.minutes
@@ -4,13 +4,42 @@ Generates synthetic EEG signals with physiological artifacts.
 """
 import numpy as np
 import random
+from scipy.signal import lfilter
 from config import BASE_POWERS, BLINK_AMPLITUDE, JAW_CLENCH_NOISE
 
+# Column order of generate_epochs output (same as config.BANDS)
+BAND_NAMES = list(BASE_POWERS.keys())
+_COL = {band: i for i, band in enumerate(BAND_NAMES)}
+_BASE = np.array([BASE_POWERS[b] for b in BAND_NAMES], dtype=np.float64)
+
+# Multiplicative band gains per state (same numbers as generate_epoch)
+STATE_GAINS = {
+    "FOCUSED": {'low_beta': 1.5, 'theta': 0.6},
+    "DISTRACTED": {'theta': 1.8, 'delta': 1.2, 'low_beta': 0.7},
+    "STRESSED": {'high_beta': 2.0, 'low_gamma': 1.5, 'low_alpha': 0.4},
+}
+STATE_NAMES = ["NEUTRAL", "DROWSY"] + list(STATE_GAINS)   # NEUTRAL/DROWSY: no modulation
+_GAINS = np.ones((len(STATE_NAMES), len(BAND_NAMES)))
+for _i, _state in enumerate(STATE_NAMES):
+    for _band, _gain in STATE_GAINS.get(_state, {}).items():
+        _GAINS[_i, _COL[_band]] = _gain
+
+BLINK_PROB = 0.05
+EPOCH_CHUNK = 65536
+
+
+def as_band_dict(epochs):
+    """(n, 8) epochs -> {band: (n,) column}, e.g. for MetricsEngine.compute_arrays."""
+    return {band: epochs[:, i] for i, band in enumerate(BAND_NAMES)}
+
+
 class EEGSimulator:
-    def __init__(self):
-        # State for Pink Noise generator (1/f filter state)
+    def __init__(self, seed=None):
+        # State for Pink Noise generator (1/f filter state), shared by both paths
         self.noise_state = {band: 0.0 for band in BASE_POWERS.keys()}
-        
+        # Batch path randomness; generate_epoch keeps using the random module
+        self.rng = np.random.default_rng(seed)
+
     def _pink_noise(self, band_name):
         """Generates 1/f noise to make signals look biological."""
         white = random.uniform(-1, 1)
@@ -63,4 +92,70 @@ class EEGSimulator:
             powers['theta'] += BLINK_AMPLITUDE / 2
 
         # Ensure no negative power
-        return {k: max(0, v) for k, v in powers.items()}
\ No newline at end of file
+        return {k: max(0, v) for k, v in powers.items()}
+
+    def _state_index(self, states, n):
+        if isinstance(states, str):
+            states = [states]
+        names = np.asarray(states)
+        idx = np.zeros(names.shape, dtype=np.intp)
+        for i, name in enumerate(STATE_NAMES):
+            idx[names == name] = i
+        return np.broadcast_to(idx, (n,))
+
+    def generate_epochs(self, n, states="NEUTRAL", mouse_jerk=None):
+        """
+        Vectorized generate_epoch for n consecutive epochs.
+        states: one state name or a sequence of n names.
+        mouse_jerk: optional scalar or (n,) array (behavior_modifiers['mouse_jerk']).
+        Returns an (n, 8) float32 array, columns in BAND_NAMES order.
+
+        Randomness comes from self.rng, drawn as one (n, 17) block per call,
+        so the same seed gives the same epochs however n is split into calls.
+        The pink-noise filter state carries over between calls.
+        """
+        u = self.rng.random((n, 2 * len(BAND_NAMES) + 1))
+        nb = len(BAND_NAMES)
+
+        # 1. Base Generation with Pink Noise (20% natural variance)
+        jitter = (2 * u[:, :nb] - 1) * (_BASE * 0.2)
+        white = 2 * u[:, nb:2 * nb] - 1
+        # y[t] = 0.95 * y[t-1] + 0.05 * white[t], seeded from the carried state
+        zi = 0.95 * np.array([[self.noise_state[b] for b in BAND_NAMES]])
+        pink, _ = lfilter([0.05], [1.0, -0.95], white, axis=0, zi=zi)
+        if n:
+            self.noise_state = {b: float(pink[-1, i]) for i, b in enumerate(BAND_NAMES)}
+        powers = _BASE + jitter + pink * 1000
+
+        # 2. State-Based Modulation
+        powers *= _GAINS[self._state_index(states, n)]
+
+        # 3. Behavioral Injection (EMG bleeds into High Beta/Gamma)
+        if mouse_jerk is not None:
+            jerk = np.broadcast_to(np.asarray(mouse_jerk, dtype=np.float64), (n,))
+            artifact = np.where(jerk > 2.0, JAW_CLENCH_NOISE * (jerk / 5.0), 0.0)
+            powers[:, _COL['high_beta']] += artifact
+            powers[:, _COL['low_gamma']] += artifact
+
+        # 4. Artifact Injection (Random Blinks, mostly Delta/Theta)
+        blink = u[:, -1] < BLINK_PROB
+        powers[blink, _COL['delta']] += BLINK_AMPLITUDE
+        powers[blink, _COL['theta']] += BLINK_AMPLITUDE / 2
+
+        # Ensure no negative power
+        return np.maximum(powers, 0).astype(np.float32)
+
+    def stream_epochs(self, n, states="NEUTRAL", mouse_jerk=None, chunk_size=EPOCH_CHUNK):
+        """
+        Yields generate_epochs output in chunks of at most chunk_size rows,
+        for corpora too large to hold at once. Per-epoch states/mouse_jerk
+        are sliced per chunk; concatenated chunks equal one big call.
+        """
+        per_epoch = lambda v: v is not None and not isinstance(v, str) and np.ndim(v) > 0
+        for start in range(0, n, chunk_size):
+            stop = min(n, start + chunk_size)
+            yield self.generate_epochs(
+                stop - start,
+                states[start:stop] if per_epoch(states) else states,
+                mouse_jerk[start:stop] if per_epoch(mouse_jerk) else mouse_jerk,
+            )
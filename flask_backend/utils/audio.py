@@ -1,21 +1,38 @@
+import io
 import os
-import uuid
 import requests
-import tempfile
+from requests.adapters import HTTPAdapter
 
-def download_audio(audio_url):
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+CHUNK_SIZE = 256 * 1024
+
+# Shared keep-alive session: repeated Cloudinary downloads reuse TLS connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+
+def download_audio(audio_url, max_bytes=MAX_AUDIO_BYTES):
+    """
+    Streams the clip into memory and returns a rewound BytesIO that
+    faster-whisper can read directly. Nothing touches the temp directory,
+    so there is nothing to clean up.
+    """
     if not audio_url:
         raise ValueError("Empty audio URL")
 
-    # Create temp file
-    temp_dir = tempfile.gettempdir()
-    filename = os.path.join(temp_dir, f"{uuid.uuid4()}.webm")
+    with _session.get(audio_url, stream=True, timeout=20) as r:
+        r.raise_for_status()
 
-    # Download file
-    r = requests.get(audio_url, timeout=20)
-    r.raise_for_status()
+        declared = int(r.headers.get("content-length") or 0)
+        if declared > max_bytes:
+            raise ValueError(f"Audio too large: {declared} bytes (limit {max_bytes})")
 
-    with open(filename, "wb") as f:
-        f.write(r.content)
+        buf = io.BytesIO()
+        for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+            buf.write(chunk)
+            if buf.tell() > max_bytes:
+                raise ValueError(f"Audio exceeds {max_bytes} bytes")
 
-    return filename
+    buf.seek(0)
+    return buf
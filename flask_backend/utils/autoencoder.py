@@ -0,0 +1,55 @@
+"""
+The reading-fluency autoencoder as a torch module, and an export of its
+weights to a plain .npz so utils.model2 can run it without importing torch.
+"""
+import os
+
+import numpy as np
+import torch
+
+# Linear layers in forward order (ReLU between them, except after encoder.4 and decoder.4)
+LAYERS = ["encoder.0", "encoder.2", "encoder.4", "decoder.0", "decoder.2", "decoder.4"]
+
+
+class Autoencoder(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.encoder = torch.nn.Sequential(
+            torch.nn.Linear(5,16), torch.nn.ReLU(),
+            torch.nn.Linear(16,8), torch.nn.ReLU(),
+            torch.nn.Linear(8,3)
+        )
+        self.decoder = torch.nn.Sequential(
+            torch.nn.Linear(3,8), torch.nn.ReLU(),
+            torch.nn.Linear(8,16), torch.nn.ReLU(),
+            torch.nn.Linear(16,5)
+        )
+
+    def forward(self,x):
+        return self.decoder(self.encoder(x))
+
+
+def load_autoencoder(path):
+    model = Autoencoder()
+    model.load_state_dict(torch.load(path, map_location="cpu"))
+    model.eval()
+    return model
+
+
+def export_numpy(pt_path, npz_path):
+    """
+    Writes w0..w5 (weights transposed to (in, out), so x @ w + b) and
+    b0..b5 as float32. Written to a temp file and renamed, so workers
+    exporting at the same time never read a half-written file.
+    """
+    state = torch.load(pt_path, map_location="cpu")
+    arrays = {}
+    for i, name in enumerate(LAYERS):
+        arrays[f"w{i}"] = np.ascontiguousarray(state[f"{name}.weight"].numpy().T)
+        arrays[f"b{i}"] = state[f"{name}.bias"].numpy().copy()
+
+    tmp = f"{npz_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, npz_path)
+    print(f"[READING] Exported {pt_path} -> {npz_path}")
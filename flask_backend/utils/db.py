@@ -1,8 +1,200 @@
 import psycopg2
 import os
+import time
+import threading
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))      # sec to wait for a free slot
+POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))  # ping idle conns older than this
+
+
 def get_connection():
+    """
+    Dedicated, unpooled connection. Only for long-lived sessions such as
+    LISTEN; everything else should use `connection()`.
+    """
     return psycopg2.connect(os.getenv("NEON_DB_URL"))
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, size-limited pool. Callers block (up to `timeout`) when all
+    connections are checked out. Idle connections are health-checked before
+    being handed out so a dropped Neon connection never reaches a query.
+    """
+
+    def __init__(self, dsn, max_size=POOL_MAX_SIZE, timeout=POOL_TIMEOUT, ping_after=POOL_PING_AFTER):
+        self.dsn = dsn
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_after = ping_after
+
+        self._cond = threading.Condition()
+        self._idle = []   # (conn, returned_at), LIFO keeps hot connections hot
+        self._size = 0    # open connections, idle + in use
+        self._stats = {
+            "checkouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "timeouts": 0,
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "health_check_failures": 0,
+        }
+
+    def _open(self):
+        conn = psycopg2.connect(self.dsn)
+        with self._cond:
+            self._stats["connections_opened"] += 1
+        return conn
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._stats["connections_closed"] += 1
+
+    def _discard(self, conn):
+        # Close and give the slot back
+        self._close(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def getconn(self):
+        start = time.monotonic()
+        conn = None
+        returned_at = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"No DB connection available after {self.timeout}s")
+                self._cond.wait(remaining)
+
+            waited = time.monotonic() - start
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+        if conn is not None and not self._healthy(conn, time.monotonic() - returned_at):
+            # Keep the slot, replace the connection
+            with self._cond:
+                self._stats["health_check_failures"] += 1
+            self._close(conn)
+            conn = None
+
+        if conn is None:
+            try:
+                conn = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+
+        return conn
+
+    def putconn(self, conn):
+        if conn.closed:
+            self._discard(conn)
+            return
+        try:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            s["size"] = self._size
+            s["idle"] = len(self._idle)
+            s["in_use"] = self._size - len(self._idle)
+            s["max_size"] = self.max_size
+        s["wait_time_avg"] = s["wait_time_total"] / s["checkouts"] if s["checkouts"] else 0.0
+        return s
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Process-wide pool, rebuilt after fork so workers never share sockets."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(os.getenv("NEON_DB_URL"))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+@contextmanager
+def connection():
+    """
+    with connection() as conn:
+        ...
+    Commits on success, rolls back on error, always returns the
+    connection to the pool.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+def pool_stats():
+    return get_pool().stats()
@@ -33,3 +33,29 @@ def extract_features(row):
         money_error,
         subtract_error
     ]
+
+
+def extract_features_batch(rows):
+    """
+    Vectorized extract_features for many session rows.
+    Returns an (n, 11) float matrix in the same column order.
+    """
+    q = np.array([row[0:6] for row in rows], dtype=float).reshape(-1, 6)
+    t = np.array([row[6:12] for row in rows], dtype=float).reshape(-1, 6)
+
+    accuracy = q.mean(axis=1)
+    mean_time = t.mean(axis=1)
+
+    return np.column_stack([
+        accuracy,
+        mean_time,
+        t.std(axis=1),
+        t[:, 5] - t[:, 0],
+        t[:, 3:6].mean(axis=1) - t[:, 0:3].mean(axis=1),
+        accuracy / np.maximum(mean_time, 0.1),
+        1 - q[:, 0],
+        1 - q[:, 1],
+        1 - q[:, 3],
+        1 - q[:, 4],
+        1 - q[:, 5]
+    ])
@@ -1,3 +1,5 @@
+import numpy as np
+
 def extract_features(words):
     pauses = []
 
@@ -16,3 +18,25 @@ def extract_features(words):
         "wpm": (total_words/total_time)*60,
         "total_words": total_words
     }
+
+
+def combine_features(ftrs1, ftrs2):
+    """Merges the two reading clips into the model input."""
+    return {
+        "avg_pause": (ftrs1["avg_pause"] + ftrs2["avg_pause"]) / 2,
+        "max_pause": max(ftrs1["max_pause"], ftrs2["max_pause"]),
+        "pause_count": ftrs1["pause_count"] + ftrs2["pause_count"],
+        "wpm": (ftrs1["wpm"] + ftrs2["wpm"]) / 2,
+        "total_words": ftrs1["total_words"] + ftrs2["total_words"]
+    }
+
+
+READING_COLUMNS = ["avg_pause", "max_pause", "pause_count", "wpm", "total_words"]
+
+def extract_features_batch(word_lists):
+    """
+    Reading features for many transcriptions at once.
+    Returns an (n, 5) matrix in READING_COLUMNS order (the model2 input order).
+    """
+    feats = [extract_features(words) for words in word_lists]
+    return np.array([[f[c] for c in READING_COLUMNS] for f in feats], dtype=float).reshape(-1, 5)
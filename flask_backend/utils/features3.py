@@ -1,3 +1,5 @@
+import numpy as np
+
 def extract_features(row):
     """
     Extract Test-4 (Emotion) data from DB row
@@ -30,3 +32,19 @@ def extract_features(row):
     t4 = float(t4 or 0) / 1000
 
     return [q1, q2, q3, q4, t1, t2, t3, t4]
+
+
+def extract_features_batch(rows):
+    """
+    Vectorized extract_features for many session rows.
+    Returns an (n, 8) matrix: 4 binary answers then 4 times in seconds.
+    """
+    raw = np.array(
+        [[0 if x is None else x for x in row[24:32]] for row in rows],
+        dtype=float
+    ).reshape(-1, 8)
+
+    answers = (raw[:, :4] >= 0.5).astype(float)
+    times = raw[:, 4:] / 1000
+
+    return np.hstack([answers, times])
@@ -26,3 +26,29 @@ def extract_features(row):
         q3_time,
         q3_score
     ]
+
+
+def extract_features_batch(rows):
+    """
+    Vectorized extract_features for many session rows.
+    Returns an (n, 9) matrix in the same column order.
+    """
+    rts = np.array(
+        [[800 if x is None else x for x in row[15:20]] for row in rows],
+        dtype=float
+    ).reshape(-1, 5)
+    q = np.array(
+        [[8 if row[20] is None else row[20], 0 if row[21] is None else row[21],
+          8 if row[22] is None else row[22], 0 if row[23] is None else row[23]]
+         for row in rows],
+        dtype=float
+    ).reshape(-1, 4)
+
+    return np.column_stack([
+        rts.mean(axis=1),
+        rts.std(axis=1),
+        (rts >= 800).sum(axis=1),
+        (rts < 150).sum(axis=1),
+        (rts > 600).sum(axis=1),
+        q
+    ])
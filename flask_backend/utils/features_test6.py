@@ -24,3 +24,26 @@ def extract_features(row):
         t[0], t[1], t[2], t[3],
         avg, var, impulsivity, visual, logic, memory
     ]
+
+
+def extract_features_batch(rows):
+    """
+    Vectorized extract_features for many session rows.
+    Returns an (n, 14) matrix in the same column order.
+    """
+    s = np.array(
+        [[0 if x is None else int(x) for x in row[22:26]] for row in rows],
+        dtype=float
+    ).reshape(-1, 4)
+    t = np.array(
+        [[8 if x is None else x for x in row[26:30]] for row in rows],
+        dtype=float
+    ).reshape(-1, 4)
+
+    avg = t.mean(axis=1)
+
+    return np.column_stack([
+        s, t,
+        avg, t.std(axis=1), 1 / avg,
+        (s[:, 0] + s[:, 2]) / 2, s[:, 3], s[:, 1]
+    ])
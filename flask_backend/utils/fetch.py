@@ -1,29 +1,88 @@
-from utils.db import get_connection
+import uuid
+
+from utils.db import connection
+
+# Column order is the row layout every feature extractor indexes into
+SESSION_COLUMNS = """
+    test1_q1, test1_q2, test1_q3, test1_q4, test1_q5, test1_q6,
+    test1_q1_time, test1_q2_time, test1_q3_time,
+    test1_q4_time, test1_q5_time, test1_q6_time,
+    test2_audio1,
+    test2_audio2,
+    test3_image,
+    test5_q1_r1, test5_q1_r2, test5_q1_r3, test5_q1_r4,test5_q1_r5,
+    test5_q2_time,test5_q2_score, test5_q3_time, test5_q3_score,
+    test4_q1, test4_q2, test4_q3, test4_q4,
+    test4_q1_time, test4_q2_time, test4_q3_time, test4_q4_time,
+    test6_q1_score, test6_q2_score, test6_q3_score, test6_q4_score,
+    test6_q1_time, test6_q2_time, test6_q3_time, test6_q4_time,
+    video_link
+"""
 
 def fetch_session(session_id):
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        SELECT
-            test1_q1, test1_q2, test1_q3, test1_q4, test1_q5, test1_q6,
-            test1_q1_time, test1_q2_time, test1_q3_time,
-            test1_q4_time, test1_q5_time, test1_q6_time,
-            test2_audio1,
-            test2_audio2,
-            test3_image,
-            test5_q1_r1, test5_q1_r2, test5_q1_r3, test5_q1_r4,test5_q1_r5,
-            test5_q2_time,test5_q2_score, test5_q3_time, test5_q3_score,
-            test4_q1, test4_q2, test4_q3, test4_q4,
-            test4_q1_time, test4_q2_time, test4_q3_time, test4_q4_time,
-            test6_q1_score, test6_q2_score, test6_q3_score, test6_q4_score,
-            test6_q1_time, test6_q2_time, test6_q3_time, test6_q4_time,
-            video_link
-        FROM child_assessment_features
-        WHERE id = %s
-    """, (session_id,))
-
-    row = cur.fetchone()
-    conn.close()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT {SESSION_COLUMNS}
+            FROM child_assessment_features
+            WHERE id = %s
+        """, (session_id,))
+
+        row = cur.fetchone()
 
     return row
+
+
+_id_type = None
+
+
+def _session_id_type(cur):
+    """SQL type of child_assessment_features.id (e.g. uuid, integer), looked up once."""
+    global _id_type
+    if _id_type is None:
+        cur.execute("""
+            SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+            WHERE attrelid = 'child_assessment_features'::regclass AND attname = 'id'
+        """)
+        _id_type = cur.fetchone()[0]
+    return _id_type
+
+
+def _valid_id(sid, id_type):
+    """False for ids the cast to id_type would reject (they can't match anyway)."""
+    try:
+        if id_type == "uuid":
+            uuid.UUID(sid)
+        elif id_type in ("smallint", "integer", "bigint"):
+            int(sid)
+    except ValueError:
+        return False
+    return True
+
+
+def fetch_sessions(session_ids):
+    """
+    Loads many sessions in one round trip.
+    Returns {session_id: row}, rows in the same layout as fetch_session.
+    Unknown ids are simply absent from the result.
+    """
+    session_ids = [str(sid) for sid in session_ids]
+    if not session_ids:
+        return {}
+
+    with connection() as conn, conn.cursor() as cur:
+        # Bare id column against an array of its own type, so the primary
+        # key index is used; id::text only in the select list
+        id_type = _session_id_type(cur)
+        session_ids = [sid for sid in session_ids if _valid_id(sid, id_type)]
+        if not session_ids:
+            return {}
+
+        cur.execute(f"""
+            SELECT id::text, {SESSION_COLUMNS}
+            FROM child_assessment_features
+            WHERE id = ANY(%s::{id_type}[])
+        """, (session_ids,))
+
+        rows = cur.fetchall()
+
+    return {row[0]: row[1:] for row in rows}
@@ -0,0 +1,220 @@
+import os
+import json
+import shutil
+import joblib
+import numpy as np
+
+# "flat" = fused NumPy traversal below, "sklearn" = the fitted estimator as-is
+FOREST_BACKEND = os.getenv("FOREST_BACKEND", "flat")
+CHUNK_ROWS = 1024   # rows per traversal pass, bounds the (trees, rows, classes) buffer
+# Above this many rows sklearn's compiled per-tree loop wins, so hand the batch back to it
+FLAT_MAX_ROWS = int(os.getenv("FOREST_FLAT_MAX_ROWS", "512"))
+# Flat arrays saved as .npy per model file, memory-mapped by every worker
+FOREST_CACHE_DIR = os.getenv("FOREST_CACHE_DIR", os.path.join("cache", "forests"))
+ARRAYS = ("feature", "threshold", "children", "is_leaf", "missing_left", "value", "roots", "classes_")
+CACHE_FORMAT = 2   # bumped when ARRAYS changes, so old cache directories are rebuilt
+
+
+class FlatForest:
+    """
+    A fitted RandomForestClassifier flattened into contiguous node arrays
+    (feature, threshold, children, leaf probabilities) for all trees,
+    evaluated for every tree and row at once, one depth level per step
+    over the (tree, row) pairs that have not reached a leaf yet.
+
+    Bit-identical to sklearn's predict_proba/predict: rows are cast to
+    float32 before the threshold tests (x <= threshold goes left), leaf
+    values are what DecisionTreeClassifier.predict_proba returns, trees
+    are summed in estimator order starting from zero and the sum is
+    divided by the tree count. NaN features follow each node's
+    missing_go_to_left, as in sklearn's tree traversal; infinity raises,
+    as sklearn's input check does.
+    """
+
+    def __init__(self, model):
+        if getattr(model, "n_outputs_", 1) != 1:
+            raise ValueError("FlatForest supports single-output forests only")
+
+        self._model = model
+        self._load_model = None
+        self.classes_ = model.classes_
+        self.n_features_in_ = model.n_features_in_
+        self.n_classes = len(model.classes_)
+        self.n_trees = len(model.estimators_)
+
+        feature, threshold, left, right, leaf, missing_left, value, roots = [], [], [], [], [], [], [], []
+        offset, depth = 0, 0
+        for est in model.estimators_:
+            t = est.tree_
+            n = t.node_count
+            is_leaf = t.children_left == -1
+            own = np.arange(offset, offset + n)
+
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(t.threshold)
+            # Leaves point to themselves, so extra steps are no-ops
+            left.append(np.where(is_leaf, own, t.children_left + offset))
+            right.append(np.where(is_leaf, own, t.children_right + offset))
+            leaf.append(is_leaf)
+            # Trees from sklearn < 1.3 have no missing_go_to_left (that sklearn rejects NaN input)
+            missing_left.append(getattr(t, "missing_go_to_left", np.zeros(n, dtype=np.uint8)).astype(bool))
+
+            proba = t.value[:, 0, :self.n_classes].copy()
+            normalizer = proba.sum(axis=1)
+            # sklearn < 1.4 stores class counts and normalises them in
+            # predict_proba; newer versions store fractions used as-is
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                proba /= normalizer[:, None]
+            value.append(proba)
+
+            offset += n
+            depth = max(depth, t.max_depth)
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold).astype(np.float64)
+        # children[2 * node] = left, children[2 * node + 1] = right
+        self.children = np.column_stack([np.concatenate(left), np.concatenate(right)]).astype(np.intp).ravel()
+        self.is_leaf = np.concatenate(leaf)
+        self.missing_left = np.concatenate(missing_left)
+        self.value = np.concatenate(value)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.max_depth = depth
+
+    @property
+    def model(self):
+        """The sklearn estimator, unpickled on first use when loaded from the cache."""
+        if self._model is None:
+            self._model = self._load_model()
+        return self._model
+
+    def save(self, path):
+        """Writes the flat arrays as .npy files plus meta.json into directory `path`."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        object_classes = self.classes_.dtype == object
+        for name in ARRAYS:
+            array = getattr(self, name)
+            if name == "classes_" and object_classes:
+                array = np.asarray(array.tolist())   # string labels, stored without pickle
+            np.save(os.path.join(tmp, f"{name}.npy"), array, allow_pickle=False)
+        meta = {
+            "n_features_in_": int(self.n_features_in_),
+            "n_trees": self.n_trees,
+            "max_depth": int(self.max_depth),
+            "object_classes": bool(object_classes),
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)   # another worker wrote it first
+
+    @classmethod
+    def load(cls, path, mmap_mode="r", load_model=None):
+        """
+        FlatForest from a save() directory, arrays memory-mapped. The sklearn
+        estimator (needed only above FLAT_MAX_ROWS) comes from load_model().
+        """
+        self = cls.__new__(cls)
+        for name in ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.n_features_in_ = meta["n_features_in_"]
+        self.n_trees = meta["n_trees"]
+        self.max_depth = meta["max_depth"]
+        if meta["object_classes"]:
+            self.classes_ = self.classes_.astype(object)
+        self.n_classes = len(self.classes_)
+        self._model = None
+        self._load_model = load_model
+        return self
+
+    def _validate(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the forest expects {self.n_features_in_}")
+        if np.isinf(X).any():
+            raise ValueError("Input X contains infinity")
+        return X
+
+    def apply(self, X):
+        """Leaf index (into the flat arrays) per tree and row, shape (n_trees, n)."""
+        X = self._validate(X)
+        n = len(X)
+        # float32 -> float64 is exact, so this is the Cython tree's comparison
+        flat_x = X.astype(np.float64).ravel()
+        node = np.repeat(self.roots[:, None], n, axis=1).ravel()
+        base = np.tile(np.arange(n) * self.n_features_in_, self.n_trees)
+
+        has_nan = np.isnan(flat_x).any()
+
+        # Only (tree, row) pairs still on an internal node are stepped
+        active = np.flatnonzero(~self.is_leaf[node])
+        while len(active):
+            cur = node[active]
+            x = flat_x[base[active] + self.feature[cur]]
+            go_right = x > self.threshold[cur]
+            if has_nan:
+                missing = np.isnan(x)
+                go_right[missing] = ~self.missing_left[cur[missing]]
+            nxt = self.children[2 * cur + go_right]
+            node[active] = nxt
+            active = active[~self.is_leaf[nxt]]
+        return node.reshape(self.n_trees, n)
+
+    def predict_proba(self, X):
+        X = self._validate(X)
+        if len(X) > FLAT_MAX_ROWS:
+            return self.model.predict_proba(X)
+        out = np.empty((len(X), self.n_classes))
+
+        for start in range(0, len(X), CHUNK_ROWS):
+            leaves = self.apply(X[start:start + CHUNK_ROWS])
+            # Reducing the leading (tree) axis adds whole tree slabs one after
+            # another in estimator order, the same sequence as sklearn's +=
+            total = np.add.reduce(self.value[leaves], axis=0)
+            total /= self.n_trees
+            out[start:start + CHUNK_ROWS] = total
+        return out
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+def load_forest(path, mmap_mode=None):
+    """
+    Loads a pickled forest for inference. With FOREST_BACKEND=flat the flat
+    arrays are built once, saved under FOREST_CACHE_DIR (keyed by file
+    name, size and mtime) and memory-mapped from there, so all workers
+    share one page-cache copy; the pickle itself is only unpickled when a
+    batch above FLAT_MAX_ROWS needs sklearn.
+    """
+    def load_model():
+        return joblib.load(path, mmap_mode=mmap_mode)
+
+    if FOREST_BACKEND != "flat":
+        return load_model()
+
+    st = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache = os.path.join(FOREST_CACHE_DIR, f"{name}-{st.st_size}-{int(st.st_mtime)}-v{CACHE_FORMAT}")
+    if not os.path.exists(os.path.join(cache, "meta.json")):
+        model = load_model()
+        if type(model).__name__ != "RandomForestClassifier":
+            return model
+        os.makedirs(FOREST_CACHE_DIR, exist_ok=True)
+        FlatForest(model).save(cache)
+    return FlatForest.load(cache, mmap_mode, load_model)
+
+
+def compile_forest(model):
+    """FlatForest for RandomForestClassifier models when FOREST_BACKEND=flat, else the model."""
+    if FOREST_BACKEND == "flat" and type(model).__name__ == "RandomForestClassifier":
+        return FlatForest(model)
+    return model
@@ -1,21 +1,23 @@
 import os
-import requests
+import json
+import hashlib
+import threading
 from dotenv import load_dotenv
 
+from utils import llm_cache, prompt_payload
+from utils.llm_client import ChatClient, SchemaError, validate_report
+
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "").strip()
 
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
-MODEL = "llama-3.1-8b-instant"
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+TEMPERATURE = 0.1 # Kam temperature se consistency bani rehti hai
+SYSTEM_PROMPT = "You are a professional medical screening assistant that only outputs JSON."
 
-def send_to_groq(report_json):
-    """
-    Sends neuro-cognitive JSON to Groq and gets a structured diagnostic response.
-    """
-    
-    prompt = f"""
+PROMPT_TEMPLATE = """
     You are a Senior Child Neuropsychologist and Developmental Specialist.
     
     TASK: Analyze the provided JSON data from 6 cognitive modules (Math, Reading, Emotion, Memory, Hearing, Handwriting) 
@@ -72,24 +74,76 @@ def send_to_groq(report_json):
     Final Note: Return ONLY the JSON object. Use professional yet supportive language.
     """
 
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
+# Cache entries are tied to the exact prompt text, so editing the template
+# (or the system prompt) starts a fresh set of entries
+PROMPT_VERSION = hashlib.sha256((SYSTEM_PROMPT + PROMPT_TEMPLATE).encode("utf-8")).hexdigest()[:16]
+
+def _clean_json(content):
+    """LLM content without markdown fences (same cleanup as pdf_generator)."""
+    return content.replace("```json", "").replace("```", "").strip()
+
+
+def is_valid_report(content):
+    """True when the content is a report in the expected schema; only those are cached."""
+    if not content:
+        return False
+    try:
+        validate_report(json.loads(_clean_json(content)))
+        return True
+    except (ValueError, SchemaError):
+        return False
+
+
+_client = None
+_client_lock = threading.Lock()
 
+
+def get_client():
+    """Process-wide pooled ChatClient for GROQ_URL."""
+    global _client
+    with _client_lock:
+        if _client is None or _client.url != GROQ_URL:
+            _client = ChatClient(GROQ_URL, GROQ_API_KEY)
+        return _client
+
+
+def client_stats():
+    return dict(_client.stats) if _client is not None else {}
+
+
+def call_groq(prompt):
+    """One uncached chat completion; returns the content or None on error."""
     payload = {
         "model": MODEL,
         "messages": [
-            {"role": "system", "content": "You are a professional medical screening assistant that only outputs JSON."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ],
-        "temperature": 0.1 # Kam temperature se consistency bani rehti hai
+        "temperature": TEMPERATURE
     }
 
     try:
-        response = requests.post(GROQ_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
+        return get_client().complete(payload)
     except Exception as e:
         print(f"[GROQ ERROR] {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def send_to_groq(report_json):
+    """
+    Sends neuro-cognitive JSON to Groq and gets a structured diagnostic response.
+    The report is compacted first (utils/prompt_payload.py, PROMPT_COMPACT).
+    Responses are cached (utils/llm_cache.py) by model, prompt version and
+    the data actually sent, so retries for unchanged data skip the call.
+    """
+    if prompt_payload.PROMPT_COMPACT:
+        data, text = prompt_payload.build(report_json)
+        key = llm_cache.cache_key(MODEL, PROMPT_VERSION, data, temperature=TEMPERATURE, payload="compact")
+    else:
+        text = report_json
+        key = llm_cache.cache_key(MODEL, PROMPT_VERSION, report_json, temperature=TEMPERATURE)
+    prompt = PROMPT_TEMPLATE.format(report_json=text)
+
+    return llm_cache.cached_call(
+        key, lambda: call_groq(prompt), MODEL, PROMPT_VERSION, cacheable=is_valid_report
+    )
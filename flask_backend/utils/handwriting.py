@@ -1,25 +1,90 @@
+import os
 import cv2
 import numpy as np
 
-def analyze_handwriting(image_bytes):
-    try:
-        nparr = np.frombuffer(image_bytes, np.uint8)
+# Page height (px) the kernel sizes and pixel thresholds below were tuned for
+REFERENCE_HEIGHT = 1000
+# Fast path: work on a copy at most this many pixels tall (0 = original
+# full-resolution pipeline). Kernels/thresholds scale with the working height.
+HANDWRITING_TARGET_HEIGHT = int(os.getenv("HANDWRITING_TARGET_HEIGHT", "0"))
+
+_REDUCED = [(8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2)]
+
+
+def _odd(v, minimum=1):
+    v = max(minimum, int(round(v)))
+    return v if v % 2 else v + 1
+
+
+def load_gray(image_bytes, target_height=0):
+    """
+    Grayscale page plus the factor to scale the tuned kernels by.
+    target_height=0: full-size decode, factor 1.0 (original behaviour).
+    Otherwise JPEGs are decoded at 1/2, 1/4 or 1/8 size in the decoder
+    (IMREAD_REDUCED_GRAYSCALE_*) when that still leaves target_height rows,
+    resized down to target_height, and the factor is
+    working height / REFERENCE_HEIGHT, so every photo is measured at the
+    same page-relative scale whatever camera took it.
+    """
+    nparr = np.frombuffer(image_bytes, np.uint8)
+
+    if not target_height:
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         if img is None:
+            return None, 1.0
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), 1.0
+
+    # 1/8 decode is cheap and tells us the page size
+    probe = cv2.imdecode(nparr, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if probe is None:
+        return None, 1.0
+    full_h = probe.shape[0] * 8
+
+    gray = None
+    for factor, flag in _REDUCED:
+        if full_h / factor >= target_height:
+            gray = probe if factor == 8 else cv2.imdecode(nparr, flag)
+            break
+    if gray is None:
+        gray = cv2.imdecode(nparr, cv2.IMREAD_GRAYSCALE)
+
+    if gray.shape[0] > target_height:
+        s = target_height / gray.shape[0]
+        gray = cv2.resize(gray, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+    return gray, gray.shape[0] / REFERENCE_HEIGHT
+
+
+def analyze_handwriting(image_bytes, target_height=None):
+    """
+    Line-spacing regularity of a handwriting photo -> (score, diagnosis).
+    target_height (default HANDWRITING_TARGET_HEIGHT) enables the reduced
+    resolution fast path; 0 runs the original full-resolution pipeline.
+    """
+    try:
+        target_height = HANDWRITING_TARGET_HEIGHT if target_height is None else target_height
+        gray, scale = load_gray(image_bytes, target_height)
+        if gray is None:
             return 0.5, "ERROR_DECODE"
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Kernel sizes and pixel thresholds, tuned at REFERENCE_HEIGHT
+        k_bg = max(1, int(round(7 * scale)))
+        k_median = _odd(21 * scale, 3)
+        k_line = (max(1, int(round(40 * scale))), max(1, int(round(2 * scale))))
+        min_w, min_h = 30 * scale, 8 * scale
+        row_gap = 25 * scale
 
         # Remove background & shadows
-        dilated_bg = cv2.dilate(gray, np.ones((7,7), np.uint8))
-        bg_blur = cv2.medianBlur(dilated_bg, 21)
+        dilated_bg = cv2.dilate(gray, np.ones((k_bg, k_bg), np.uint8))
+        bg_blur = cv2.medianBlur(dilated_bg, k_median)
         diff_img = 255 - cv2.absdiff(gray, bg_blur)
         norm_img = cv2.normalize(diff_img, None, 0, 255, cv2.NORM_MINMAX)
 
         _, binary = cv2.threshold(norm_img, 0, 255,
                                   cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
 
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (40, 2))
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, k_line)
         dilated = cv2.dilate(binary, kernel, iterations=1)
 
         contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
@@ -27,7 +92,7 @@ def analyze_handwriting(image_bytes):
         boxes = []
         for c in contours:
             x, y, w, h = cv2.boundingRect(c)
-            if w > 30 and h > 8:
+            if w > min_w and h > min_h:
                 boxes.append((y, h))
 
         boxes.sort(key=lambda b: b[0])
@@ -41,7 +106,7 @@ def analyze_handwriting(image_bytes):
 
         for i in range(1, len(boxes)):
             y, _ = boxes[i]
-            if abs(y - cur_y) < 25:
+            if abs(y - cur_y) < row_gap:
                 cur_y = (cur_y * count + y) / (count + 1)
                 count += 1
             else:
@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from utils.image import download_image
+from utils.handwriting import analyze_handwriting, HANDWRITING_TARGET_HEIGHT
+
+HANDWRITING_WORKERS = int(os.getenv("HANDWRITING_WORKERS", str(os.cpu_count() or 1)))
+CACHE_DIR = os.getenv("HANDWRITING_CACHE_DIR", os.path.join("cache", "handwriting"))
+CACHE_MAX_BYTES = int(os.getenv("HANDWRITING_CACHE_MAX_MB", "64")) * 1024 * 1024
+DOWNLOAD_WORKERS = 8
+EVICT_EVERY = 200   # writes between cache size checks
+
+_pools = {}   # workers -> ProcessPoolExecutor
+_pool_lock = threading.Lock()
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def _cache_path(digest, target_height):
+    # Results depend on the analysis resolution, so each mode has its own entries
+    return os.path.join(CACHE_DIR, f"h{target_height}", digest[:2], f"{digest}.json")
+
+
+def _load_cached(path):
+    try:
+        with open(path) as f:
+            result = json.load(f)
+        os.utime(path)   # mtime = last use, for LRU eviction
+        return result["score"], result["diagnosis"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _store_cached(path, score, diagnosis):
+    global _writes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"score": float(score), "diagnosis": diagnosis}, f)
+    os.replace(tmp, path)   # atomic, concurrent writers can't corrupt an entry
+
+    with _writes_lock:
+        _writes += 1
+        due = _writes % EVICT_EVERY == 0
+    if due:
+        evict_cache()
+
+
+def evict_cache(max_bytes=CACHE_MAX_BYTES):
+    """Deletes least recently used entries until the cache fits in max_bytes."""
+    entries, total = [], 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            # Small files still take a whole filesystem block
+            size = max(st.st_size, 4096)
+            entries.append((st.st_mtime, size, path))
+            total += size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+    return total
+
+
+def _cacheable(diagnosis):
+    return not diagnosis.startswith("ERROR")
+
+
+def score_image(image_bytes, target_height=None):
+    """analyze_handwriting with the content-hash cache -> (score, diagnosis)."""
+    target_height = HANDWRITING_TARGET_HEIGHT if target_height is None else target_height
+    path = _cache_path(hashlib.sha256(image_bytes).hexdigest(), target_height)
+
+    cached = _load_cached(path)
+    if cached is not None:
+        return cached
+
+    score, diagnosis = analyze_handwriting(image_bytes, target_height)
+    if _cacheable(diagnosis):
+        _store_cached(path, score, diagnosis)
+    return float(score), diagnosis
+
+
+def _get_pool(workers):
+    # One pool per size, kept for the process lifetime. Spawned (not
+    # forked) workers: the Flask process is multi-threaded
+    with _pool_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers,
+                                                  mp_context=multiprocessing.get_context("spawn"))
+        return _pools[workers]
+
+
+def _fetch(item):
+    """URL -> bytes; bytes pass through; download errors become None."""
+    if isinstance(item, (bytes, bytearray)):
+        return bytes(item)
+    try:
+        return download_image(item)
+    except Exception as e:
+        print(f"[HANDWRITING] Download failed for {item}: {e}")
+        return None
+
+
+def score_images(items, target_height=None, workers=None):
+    """
+    Scores many handwriting images -> [(score, diagnosis)] in input order.
+    items: image URLs or raw bytes. URLs are downloaded concurrently on the
+    shared session, identical images are analysed once, cached results are
+    reused, and the remaining misses run in a pool of `workers` processes
+    (HANDWRITING_WORKERS by default; 0/1 = inline).
+    """
+    target_height = HANDWRITING_TARGET_HEIGHT if target_height is None else target_height
+    workers = HANDWRITING_WORKERS if workers is None else workers
+
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+        blobs = list(ex.map(_fetch, items))
+
+    results = [None] * len(blobs)
+    misses = {}   # digest -> (bytes, [indices])
+    for i, blob in enumerate(blobs):
+        if blob is None:
+            results[i] = (0.5, "ERROR_DOWNLOAD")
+            continue
+        digest = hashlib.sha256(blob).hexdigest()
+        cached = _load_cached(_cache_path(digest, target_height))
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.setdefault(digest, (blob, []))[1].append(i)
+
+    digests = list(misses)
+    blobs = [misses[d][0] for d in digests]
+    if workers > 1 and len(blobs) > 1:
+        heights = [target_height] * len(blobs)
+        scored = list(_get_pool(workers).map(analyze_handwriting, blobs, heights))
+    else:
+        scored = [analyze_handwriting(b, target_height) for b in blobs]
+
+    for digest, (score, diagnosis) in zip(digests, scored):
+        score = float(score)
+        if _cacheable(diagnosis):
+            _store_cached(_cache_path(digest, target_height), score, diagnosis)
+        for i in misses[digest][1]:
+            results[i] = (score, diagnosis)
+
+    return results
+
+
+def predict_handwriting_batch(image_urls):
+    """BATCH_MODULES adapter: image URLs (None = no upload) -> report-style dicts."""
+    present = [i for i, url in enumerate(image_urls) if url]
+    scored = score_images([image_urls[i] for i in present])
+
+    out = [{"error": "No handwriting image found"} for _ in image_urls]
+    for i, (score, diagnosis) in zip(present, scored):
+        out[i] = {"handwriting_risk": diagnosis, "risk_score": round(score, 3)}
+    return out
@@ -1,7 +1,14 @@
 import requests
+from requests.adapters import HTTPAdapter
+
+# Shared keep-alive session: repeated Cloudinary downloads reuse TLS connections
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 
 def download_image(url):
-    resp = requests.get(url, timeout=10)
+    resp = _session.get(url, timeout=10)
     if resp.status_code != 200:
         raise Exception("Failed to download image")
     return resp.content
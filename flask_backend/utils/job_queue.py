@@ -0,0 +1,220 @@
+"""
+Postgres-backed report job queue.
+
+Jobs live in `report_jobs`, one row per session. Workers claim with
+SELECT ... FOR UPDATE SKIP LOCKED and hold a lease; a crashed worker's job
+becomes claimable again once the lease expires. Failures are retried with
+exponential backoff until MAX_ATTEMPTS.
+"""
+import os
+import random
+import select
+import threading
+import psycopg2
+from utils.db import connection, get_connection
+
+LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "30"))   # sec, doubled per attempt
+BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "3600"))
+NOTIFY_CHANNEL = "neurobloom"
+
+SCHEMA = """
+SELECT pg_advisory_xact_lock(hashtext('report_jobs_schema'));
+CREATE TABLE IF NOT EXISTS report_jobs (
+    session_id   text PRIMARY KEY,
+    status       text NOT NULL DEFAULT 'pending',   -- pending | running | done | failed
+    attempts     integer NOT NULL DEFAULT 0,
+    run_after    timestamptz NOT NULL DEFAULT now(),
+    locked_by    text,
+    lease_until  timestamptz,
+    last_error   text,
+    enqueued_at  timestamptz NOT NULL DEFAULT now(),
+    started_at   timestamptz,
+    finished_at  timestamptz
+);
+CREATE INDEX IF NOT EXISTS report_jobs_ready_idx
+    ON report_jobs (run_after) WHERE status IN ('pending', 'running');
+"""
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def ensure_schema():
+    global _schema_ready
+    with _schema_lock:
+        if _schema_ready:
+            return
+        with connection() as conn, conn.cursor() as cur:
+            cur.execute(SCHEMA)
+        _schema_ready = True
+
+
+def enqueue(session_id, requeue=False):
+    """
+    Adds a job for the session. Idempotent: an existing job is left alone
+    unless requeue=True, which resets a finished or failed job.
+    """
+    ensure_schema()
+    with connection() as conn, conn.cursor() as cur:
+        if requeue:
+            cur.execute("""
+                INSERT INTO report_jobs (session_id) VALUES (%s)
+                ON CONFLICT (session_id) DO UPDATE
+                SET status = 'pending', attempts = 0, run_after = now(),
+                    last_error = NULL, enqueued_at = now(),
+                    started_at = NULL, finished_at = NULL
+                WHERE report_jobs.status IN ('done', 'failed')
+            """, (str(session_id),))
+        else:
+            cur.execute("""
+                INSERT INTO report_jobs (session_id) VALUES (%s)
+                ON CONFLICT (session_id) DO NOTHING
+            """, (str(session_id),))
+        return cur.rowcount
+
+
+def enqueue_missing():
+    """Backfill: queue every session that still has no report."""
+    ensure_schema()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO report_jobs (session_id)
+            SELECT id::text FROM child_assessment_features
+            WHERE report_url IS NULL
+            ON CONFLICT (session_id) DO NOTHING
+        """)
+        return cur.rowcount
+
+
+def claim(worker_id):
+    """
+    Claims the next ready job (pending and due, or running with an expired
+    lease). Returns (session_id, attempt) or None.
+    """
+    ensure_schema()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE report_jobs
+            SET status = 'running',
+                attempts = attempts + 1,
+                locked_by = %s,
+                lease_until = now() + %s * interval '1 second',
+                started_at = now()
+            WHERE session_id = (
+                SELECT session_id FROM report_jobs
+                WHERE (status = 'pending' AND run_after <= now())
+                   OR (status = 'running' AND lease_until < now() AND attempts < %s)
+                ORDER BY run_after
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING session_id, attempts
+        """, (worker_id, LEASE_SECONDS, MAX_ATTEMPTS))
+        return cur.fetchone()
+
+
+def complete(session_id, worker_id):
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE report_jobs
+            SET status = 'done', finished_at = now(),
+                lease_until = NULL, last_error = NULL
+            WHERE session_id = %s AND locked_by = %s AND status = 'running'
+        """, (session_id, worker_id))
+        return cur.rowcount == 1
+
+
+def backoff_seconds(attempt):
+    # Full jitter keeps retries of a burst of failures from lining up
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+def fail(session_id, worker_id, attempt, error):
+    """Schedules a retry with backoff, or marks the job failed after MAX_ATTEMPTS."""
+    final = attempt >= MAX_ATTEMPTS
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE report_jobs
+            SET status = %s,
+                run_after = now() + %s * interval '1 second',
+                lease_until = NULL,
+                last_error = %s,
+                finished_at = CASE WHEN %s THEN now() ELSE NULL END
+            WHERE session_id = %s AND locked_by = %s AND status = 'running'
+        """, ("failed" if final else "pending", 0 if final else backoff_seconds(attempt),
+              str(error)[:2000], final, session_id, worker_id))
+    return final
+
+
+def reap_expired():
+    """Fails jobs whose lease expired on their last allowed attempt."""
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("""
+            UPDATE report_jobs
+            SET status = 'failed', finished_at = now(), lease_until = NULL,
+                last_error = 'lease expired'
+            WHERE status = 'running' AND lease_until < now() AND attempts >= %s
+        """, (MAX_ATTEMPTS,))
+        return cur.rowcount
+
+
+def queue_stats():
+    ensure_schema()
+    with connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT status, count(*) FROM report_jobs GROUP BY status")
+        counts = dict(cur.fetchall())
+
+        cur.execute("""
+            SELECT
+                count(*) FILTER (WHERE status = 'pending' AND run_after <= now()),
+                extract(epoch FROM now() - min(enqueued_at) FILTER (WHERE status = 'pending'))
+            FROM report_jobs
+        """)
+        ready, oldest_pending = cur.fetchone()
+
+        cur.execute("""
+            SELECT
+                count(*),
+                avg(extract(epoch FROM finished_at - enqueued_at)),
+                max(extract(epoch FROM finished_at - enqueued_at)),
+                avg(extract(epoch FROM finished_at - started_at))
+            FROM report_jobs
+            WHERE status = 'done' AND finished_at > now() - interval '1 hour'
+        """)
+        done_1h, avg_latency, max_latency, avg_run = cur.fetchone()
+
+    return {
+        "depth": counts.get("pending", 0) + counts.get("running", 0),
+        "ready": ready,
+        "by_status": {s: counts.get(s, 0) for s in ("pending", "running", "done", "failed")},
+        "oldest_pending_sec": round(float(oldest_pending), 1) if oldest_pending is not None else None,
+        "last_hour": {
+            "completed": done_1h,
+            "avg_latency_sec": round(float(avg_latency), 1) if avg_latency is not None else None,
+            "max_latency_sec": round(float(max_latency), 1) if max_latency is not None else None,
+            "avg_run_sec": round(float(avg_run), 1) if avg_run is not None else None,
+        },
+    }
+
+
+def listen(on_session, timeout=5):
+    """
+    Blocks forever on LISTEN neurobloom and calls on_session(payload) for
+    every notification. Uses a dedicated connection, not the pool.
+    """
+    conn = get_connection()
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    cur = conn.cursor()
+    cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+
+    while True:
+        if select.select([conn], [], [], timeout) == ([], [], []):
+            continue
+
+        conn.poll()
+
+        while conn.notifies:
+            notify = conn.notifies.pop(0)
+            on_session(notify.payload)
@@ -0,0 +1,223 @@
+"""
+Persistent cache for LLM report generation (SQLite, shared by every
+process on the host).
+
+Entries are keyed by a SHA-256 of the model, the prompt version, the
+request parameters and the normalized report JSON, so a worker retry or a
+repeated full_report for unchanged data skips the LLM call. Concurrent
+identical requests in one process share a single in-flight call. Hit /
+miss counts and the LLM time saved are kept in the same database.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+LLM_CACHE = os.getenv("LLM_CACHE", "1").lower() in ("1", "true", "yes")
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("cache", "llm_cache.sqlite3"))
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL_HOURS", str(24 * 30))) * 3600   # 0 = never expires
+CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024
+NORMALIZE_DECIMALS = 6   # floats that differ past this are the same report
+EVICT_EVERY = 50         # writes between expiry / size checks
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key            text PRIMARY KEY,
+    model          text NOT NULL,
+    prompt_version text NOT NULL,
+    response       text NOT NULL,
+    latency_ms     real NOT NULL,      -- what the original LLM call took
+    size           integer NOT NULL,
+    created_at     real NOT NULL,
+    last_used      real NOT NULL,
+    hits           integer NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_used_idx ON llm_cache (last_used);
+CREATE TABLE IF NOT EXISTS llm_cache_stats (
+    name  text PRIMARY KEY,
+    value real NOT NULL
+);
+INSERT OR IGNORE INTO llm_cache_stats VALUES
+    ('hits', 0), ('misses', 0), ('coalesced', 0), ('saved_ms', 0), ('llm_ms', 0), ('uncached', 0);
+"""
+
+_local = threading.local()
+_inflight = {}
+_inflight_lock = threading.Lock()
+_writes = 0
+_writes_lock = threading.Lock()
+
+
+def _conn():
+    """One connection per thread; WAL so readers don't block the writer."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != CACHE_PATH:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(CACHE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _local.conn, _local.path = conn, CACHE_PATH
+    return conn
+
+
+def normalize(obj):
+    """
+    JSON-ready copy with a stable form: numpy scalars/arrays as Python
+    values, tuples/sets as lists, floats rounded to NORMALIZE_DECIMALS.
+    Key order is handled by sort_keys in cache_key.
+    """
+    if isinstance(obj, dict):
+        return {str(k): normalize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [normalize(v) for v in obj]
+    if isinstance(obj, set):
+        return sorted(normalize(v) for v in obj)
+    if hasattr(obj, "tolist"):   # numpy scalar / array
+        return normalize(obj.tolist())
+    if isinstance(obj, float):
+        return round(obj, NORMALIZE_DECIMALS) + 0.0   # + 0.0 folds -0.0 into 0.0
+    if obj is None or isinstance(obj, (str, int, bool)):
+        return obj
+    return str(obj)
+
+
+def cache_key(model, prompt_version, report_json, **params):
+    canonical = json.dumps(
+        {"model": model, "prompt_version": prompt_version, "params": params, "report": normalize(report_json)},
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _bump(conn, **deltas):
+    for name, delta in deltas.items():
+        conn.execute("UPDATE llm_cache_stats SET value = value + ? WHERE name = ?", (delta, name))
+
+
+def get(key):
+    """Cached response, or None (missing or past CACHE_TTL). Counts a hit."""
+    conn = _conn()
+    row = conn.execute("SELECT response, latency_ms, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None
+
+    response, latency_ms, created_at = row
+    now = time.time()
+    if CACHE_TTL and now - created_at > CACHE_TTL:
+        conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+        return None
+
+    conn.execute("UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+    _bump(conn, hits=1, saved_ms=latency_ms)
+    return response
+
+
+def put(key, model, prompt_version, response, latency_ms):
+    global _writes
+    now = time.time()
+    _conn().execute(
+        "INSERT OR REPLACE INTO llm_cache (key, model, prompt_version, response, latency_ms, size, created_at, last_used) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        (key, model, prompt_version, response, latency_ms, len(response.encode("utf-8")), now, now),
+    )
+
+    with _writes_lock:
+        _writes += 1
+        due = _writes % EVICT_EVERY == 0
+    if due:
+        evict()
+
+
+def evict(max_bytes=CACHE_MAX_BYTES):
+    """Drops expired entries, then least recently used ones until the responses fit in max_bytes."""
+    conn = _conn()
+    if CACHE_TTL:
+        conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - CACHE_TTL,))
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+    if total <= max_bytes:
+        return total
+
+    removed = 0
+    doomed = []
+    for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used").fetchall():
+        if total - removed <= max_bytes:
+            break
+        doomed.append((key,))
+        removed += size
+    conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+    return total - removed
+
+
+def cached_call(key, call, model, prompt_version, cacheable=lambda response: response is not None):
+    """
+    Returns the cached response for key, or runs call() once: concurrent
+    callers with the same key wait for that call and share its result.
+    Only responses passing cacheable() are stored (errors are retried
+    next time).
+    """
+    if not LLM_CACHE:
+        return call()
+
+    response = get(key)
+    if response is not None:
+        return response
+
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = {"done": threading.Event(), "result": None, "error": None}
+
+    if not leader:
+        flight["done"].wait()
+        _bump(_conn(), coalesced=1)
+        if flight["error"] is not None:
+            raise flight["error"]
+        return flight["result"]
+
+    try:
+        # Another process may have filled it while we were checking
+        response = get(key)
+        if response is None:
+            start = time.perf_counter()
+            response = call()
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            conn = _conn()
+            if cacheable(response):
+                put(key, model, prompt_version, response, latency_ms)
+                _bump(conn, misses=1, llm_ms=latency_ms)
+            else:
+                _bump(conn, misses=1, llm_ms=latency_ms, uncached=1)
+        flight["result"] = response
+        return response
+    except Exception as e:
+        flight["error"] = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight["done"].set()
+
+
+def stats():
+    conn = _conn()
+    counters = dict(conn.execute("SELECT name, value FROM llm_cache_stats"))
+    entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        "enabled": LLM_CACHE,
+        "entries": entries,
+        "size_mb": round(size / 1024 / 1024, 3),
+        "hits": int(counters["hits"]),
+        "misses": int(counters["misses"]),
+        "coalesced": int(counters["coalesced"]),
+        "uncached_responses": int(counters["uncached"]),
+        "hit_rate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "saved_llm_sec": round(counters["saved_ms"] / 1000, 1),
+        "llm_sec": round(counters["llm_ms"] / 1000, 1),
+    }
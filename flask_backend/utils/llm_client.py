@@ -0,0 +1,310 @@
+"""
+Pooled, rate-limited client for OpenAI-style chat completions (Groq).
+
+One keep-alive requests.Session per process, a token bucket shared by all
+threads (GROQ_RATE_PER_MIN, GROQ_BURST) and a cap on calls in flight
+(GROQ_MAX_INFLIGHT). 429 / 5xx / connection errors are retried with
+jittered exponential backoff; a Retry-After header is honoured and pauses
+the whole bucket, so the other threads back off too. Responses are
+streamed and checked against the report schema as they arrive (a reply
+that starts out wrong is abandoned without waiting for the rest).
+
+The bucket is per process: with several gunicorn workers, give each a
+share of the account's limit.
+"""
+import os
+import json
+import time
+import random
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+GROQ_MAX_INFLIGHT = int(os.getenv("GROQ_MAX_INFLIGHT", "4"))
+GROQ_RATE_PER_MIN = float(os.getenv("GROQ_RATE_PER_MIN", "30"))
+GROQ_BURST = int(os.getenv("GROQ_BURST", "4"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "4"))
+GROQ_STREAM = os.getenv("GROQ_STREAM", "1").lower() in ("1", "true", "yes")
+BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "1.0"))   # sec, doubled per attempt
+BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "30"))
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30   # per read, i.e. the longest gap between streamed chunks
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Top-level keys of the report and the character their value must start with
+REPORT_SCHEMA = {
+    "screenings": "[",
+    "child_profile": "{",
+    "intervention_plan": "{",
+    "risk_level_summary": '"',
+}
+
+
+class LLMError(Exception):
+    pass
+
+
+class SchemaError(LLMError):
+    pass
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `capacity` saved up."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Nobody gets a token for `seconds` (server said Retry-After); when
+        the pause ends exactly one token is there, then the normal rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 1.0 - (self.paused_until - now) * self.rate
+
+
+class ReportValidator:
+    """
+    Incremental check of a streamed report. feed() scans the text as it
+    arrives (skipping a ```json fence) and raises SchemaError as soon as
+    the reply is not a JSON object or a known key gets the wrong kind of
+    value. `complete` turns True when the top-level object closes, so the
+    caller can stop reading. finish() parses and checks the whole report.
+    """
+
+    def __init__(self, schema=REPORT_SCHEMA):
+        self.schema = schema
+        self.text = []
+        self.start = None        # offset of the opening brace
+        self.end = None          # offset just past the closing brace
+        self.offset = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.last_string = []
+        self.key = None          # top-level key whose value comes next
+        self.expect_value = False
+
+    @property
+    def complete(self):
+        return self.end is not None
+
+    def feed(self, chunk):
+        self.text.append(chunk)
+        for ch in chunk:
+            pos = self.offset
+            self.offset += 1
+            if self.complete:
+                continue
+
+            if self.in_string:
+                if self.depth == 1:
+                    self.last_string.append(ch)
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+
+            if self.start is None:
+                # Before the object: whitespace or a markdown fence only
+                if ch == "{":
+                    self.start, self.depth = pos, 1
+                elif not (ch.isspace() or ch in "`json"):
+                    raise SchemaError(f"Reply does not start with a JSON object: {''.join(self.text)[:80]!r}")
+                continue
+
+            if ch.isspace():
+                continue
+
+            if self.expect_value:
+                self.expect_value = False
+                wanted = self.schema.get(self.key)
+                if wanted and ch != wanted:
+                    raise SchemaError(f"'{self.key}' should start with {wanted!r}, got {ch!r}")
+
+            if ch == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    self.last_string = []
+            elif ch == ":" and self.depth == 1:
+                self.key = "".join(self.last_string)[:-1]
+                self.expect_value = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = pos + 1
+
+    def finish(self):
+        """The report as a dict; raises SchemaError if incomplete or off-schema."""
+        if not self.complete:
+            raise SchemaError("Reply ended before the JSON object was closed")
+        text = "".join(self.text)[self.start:self.end]
+        try:
+            report = json.loads(text)
+        except ValueError as e:
+            raise SchemaError(f"Invalid JSON: {e}")
+        validate_report(report)
+        return report
+
+
+def validate_report(report):
+    """Raises SchemaError unless report has the keys and shapes the PDF needs."""
+    if not isinstance(report, dict):
+        raise SchemaError("Report is not a JSON object")
+    missing = [k for k in REPORT_SCHEMA if k not in report]
+    if missing:
+        raise SchemaError(f"Report is missing {missing}")
+
+    screenings = report["screenings"]
+    if not isinstance(screenings, list) or not all(isinstance(s, dict) and "disability" in s and "status" in s for s in screenings):
+        raise SchemaError("screenings must be a list of {disability, status, ...}")
+
+    profile = report["child_profile"]
+    if not isinstance(profile, dict) or not all(isinstance(profile.get(k, []), list) for k in ("strengths", "weaknesses", "parental_precautions")):
+        raise SchemaError("child_profile must hold strengths / weaknesses / parental_precautions lists")
+
+    plan = report["intervention_plan"]
+    if not isinstance(plan, dict) or not all(isinstance(plan.get(k, []), list) for k in ("daily_activities", "therapeutic_recommendations")):
+        raise SchemaError("intervention_plan must hold daily_activities / therapeutic_recommendations lists")
+
+    if not isinstance(report["risk_level_summary"], str):
+        raise SchemaError("risk_level_summary must be a string")
+    return report
+
+
+def retry_after(response):
+    """Seconds from a numeric Retry-After header, or None."""
+    try:
+        return max(0.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt):
+    """Full jitter: uniform in [0, min(BACKOFF_MAX, BACKOFF_BASE * 2^attempt)]."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class ChatClient:
+    def __init__(self, url, api_key, max_inflight=GROQ_MAX_INFLIGHT, rate_per_min=GROQ_RATE_PER_MIN,
+                 burst=GROQ_BURST, max_retries=GROQ_MAX_RETRIES, stream=GROQ_STREAM):
+        self.url = url
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.stream = stream
+        self.bucket = TokenBucket(rate_per_min / 60.0, burst)
+        self._inflight = threading.BoundedSemaphore(max_inflight)
+
+        # Keep-alive pool sized to the in-flight cap
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_inflight)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "schema_errors": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _read_stream(self, response):
+        """Assembles SSE deltas into the content, validating as it goes."""
+        validator = ReportValidator()
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                validator.feed(delta)
+                if validator.complete:
+                    break   # trailing chatter after the object is not needed
+        validator.finish()
+        return "".join(validator.text)
+
+    def _post(self, payload):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        self._count("requests")
+        return self.session.post(self.url, headers=headers, json=payload,
+                                 stream=self.stream, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+
+    def complete(self, payload):
+        """
+        Chat completion content for payload (model, messages, ...), already
+        validated against REPORT_SCHEMA. Raises LLMError when every attempt failed.
+        """
+        payload = dict(payload, stream=self.stream)
+        error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count("retries")
+            self.bucket.acquire()
+            delay = None
+            paused = False
+
+            with self._inflight:
+                try:
+                    with self._post(payload) as response:
+                        if response.status_code in RETRY_STATUSES:
+                            delay = retry_after(response)
+                            if response.status_code == 429:
+                                self._count("rate_limited")
+                                if delay is not None:
+                                    self.bucket.pause(delay)   # the next acquire() waits it out
+                                    paused = True
+                            error = LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+                        else:
+                            response.raise_for_status()   # other 4xx: retrying won't help
+                            if self.stream:
+                                return self._read_stream(response)
+                            content = response.json()["choices"][0]["message"]["content"]
+                            validator = ReportValidator()
+                            validator.feed(content)
+                            validator.finish()
+                            return content
+                except SchemaError as e:
+                    self._count("schema_errors")
+                    error = e
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                    error = e
+                except requests.HTTPError as e:
+                    raise LLMError(str(e))
+
+            if attempt < self.max_retries:
+                wait = 0.0 if paused else delay if delay is not None else backoff(attempt)
+                print(f"[GROQ] attempt {attempt + 1} failed ({error}), retrying in {delay if paused else wait:.1f}s")
+                time.sleep(wait)
+
+        raise LLMError(f"Gave up after {self.max_retries + 1} attempts: {error}")
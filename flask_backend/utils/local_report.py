@@ -0,0 +1,326 @@
+"""
+Offline, rule-based report in the same schema the LLM returns
+(screenings / child_profile / intervention_plan / risk_level_summary).
+
+Every screening adds up evidence points from the module outputs: a model
+predicting the condition outright is MODEL_LABEL points, a supporting
+marker (a struggle, a low score) is MARKER points. The total picks the
+status (STATUS_POINTS). The profile is the deduplicated strengths /
+struggles of the modules, and the precautions, activities and therapies
+come from fixed templates for every screening at Medium Risk or above.
+Same input, same report; no network, well under a millisecond.
+"""
+from utils.prompt_payload import compact
+
+MODEL_LABEL = 2
+MARKER = 1
+# minimum points -> status, highest first
+STATUS_POINTS = [(3, "High Risk"), (2, "Medium Risk"), (1, "Low Risk")]
+NOT_DETECTED = "Not Detected"
+NOT_ASSESSED = "Not Assessed"
+STATUS_ORDER = [NOT_ASSESSED, NOT_DETECTED, "Low Risk", "Medium Risk", "High Risk"]
+
+MAX_STRENGTHS = 4
+MAX_WEAKNESSES = 6
+MAX_PRECAUTIONS = 5
+MIN_ACTIVITIES = 3
+MAX_ACTIVITIES = 5
+
+MATH_RISK = {"Slow Learner": 1, "Low Risk": 1, "Medium Risk": 2, "High Risk": 3}
+EMOTION_RISK = {"LessSocial": 1, "Disability": 2}
+
+AREAS = {
+    "math": "Numeracy",
+    "reading": "Reading fluency",
+    "emotion": "Emotion recognition",
+    "hearing": "Auditory processing",
+    "cognition": "Visual memory & reasoning",
+    "handwriting": "Handwriting & fine motor",
+}
+
+BIOLOGICAL_CAUSE = {
+    "Dyslexia": "Weak phonological processing: mapping sounds to letters takes more effort, so decoding stays slow.",
+    "Dysgraphia": "Fine motor planning and visual-motor integration lag behind, so letter size and line spacing drift.",
+    "Dyscalculia": "Weak number sense (quantity representation in the parietal lobe) makes arithmetic effortful.",
+    "Auditory Processing Disorder (APD)": "The brain is slow to tell apart and decode sounds even though hearing itself is normal.",
+    "NVLD": "Visual-spatial and non-verbal reasoning are weaker than verbal skills.",
+    "ADHD": "Executive control (sustained attention, response inhibition) is less developed for the child's age.",
+    "ASD": "Social cues such as facial expressions are processed differently, affecting social communication.",
+}
+
+PRECAUTIONS = {
+    "Dyslexia": ["Avoid asking the child to read aloud in front of others without practice",
+                 "Do not judge effort by reading speed; allow extra time"],
+    "Dysgraphia": ["Avoid long copying tasks; allow typing or oral answers"],
+    "Dyscalculia": ["Avoid timed math drills and punishing counting on fingers"],
+    "Auditory Processing Disorder (APD)": ["Avoid multi-step verbal instructions; give one step at a time",
+                                           "Reduce background noise during homework"],
+    "NVLD": ["Avoid relying only on diagrams or maps; explain visual material in words"],
+    "ADHD": ["Avoid long unbroken work sessions; use short tasks with breaks",
+             "Keep screens and distractions away from the study area"],
+    "ASD": ["Avoid sudden changes to routine without warning",
+            "Do not assume the child reads facial expressions; name emotions explicitly"],
+}
+GENERAL_PRECAUTIONS = ["Keep praise specific and frequent; avoid comparing with siblings or classmates"]
+
+ACTIVITIES = {
+    "Dyslexia": {"name": "Sound Detective", "goal": "Phonological awareness",
+                 "instructions": "Say a word, the child claps once per sound, then finds a toy starting with the same sound. 10 minutes a day."},
+    "Dysgraphia": {"name": "Rainbow Letters", "goal": "Fine motor control and letter formation",
+                   "instructions": "Trace a large letter in three colours, then write it on lined paper between the lines. Five letters a day."},
+    "Dyscalculia": {"name": "Number Line Hop", "goal": "Number sense",
+                    "instructions": "Draw a 0-20 line on the floor. Call out a sum, the child hops it out and says the answer."},
+    "Auditory Processing Disorder (APD)": {"name": "Simon Says Slowly", "goal": "Auditory discrimination and following instructions",
+                                           "instructions": "Give one clear spoken instruction at a time, add a second step only when the first is easy."},
+    "NVLD": {"name": "Build the Picture", "goal": "Visual-spatial reasoning",
+             "instructions": "Copy a simple block or Lego model from a photo, talking through each step out loud."},
+    "ADHD": {"name": "Freeze Dance", "goal": "Response inhibition and sustained attention",
+             "instructions": "Play music, the child dances and freezes the moment it stops. Make the pauses less predictable over time."},
+    "ASD": {"name": "Feelings Faces", "goal": "Emotion recognition",
+            "instructions": "Show a face card or make a face, the child names the feeling and tells when they felt it."},
+}
+GENERAL_ACTIVITIES = [
+    {"name": "Shared Reading", "goal": "Vocabulary and attention",
+     "instructions": "Read a picture book together for 15 minutes and ask the child to retell the story."},
+    {"name": "Memory Tray", "goal": "Visual working memory",
+     "instructions": "Show 5 objects on a tray for 20 seconds, cover them, remove one and ask which is missing."},
+    {"name": "Play-dough Shapes", "goal": "Hand strength and fine motor control",
+     "instructions": "Roll, pinch and cut play-dough into letters or shapes for 10 minutes."},
+]
+
+THERAPIES = {
+    "Dyslexia": ("Special education (structured literacy)", "Systematic phonics instruction for decoding and reading fluency."),
+    "Dysgraphia": ("Occupational Therapy (OT)", "Fine motor and visual-motor training for handwriting."),
+    "Dyscalculia": ("Special education (math remediation)", "Concrete, multi-sensory number sense instruction."),
+    "Auditory Processing Disorder (APD)": ("Audiology and Speech Therapy", "Formal auditory processing assessment and listening training."),
+    "NVLD": ("Neuropsychological assessment", "Confirms the visual-spatial profile and guides school accommodations."),
+    "ADHD": ("Developmental pediatrician / CBT", "Attention assessment; behavioural strategies for focus and impulse control."),
+    "ASD": ("Developmental pediatrician / ABA", "Formal autism assessment; structured social-communication support."),
+}
+MONITORING = {"therapy": "Routine developmental monitoring",
+              "reason": "No screening reached Medium Risk; repeat the assessment in 6 months."}
+
+
+def _module(report, name):
+    """The module's payload, or None if it is missing or failed."""
+    payload = report.get(name)
+    if not isinstance(payload, dict) or "error" in payload:
+        return None
+    return payload
+
+
+def _struggles(payload):
+    return set((payload or {}).get("child_struggles") or (payload or {}).get("weaknesses") or [])
+
+
+def _dyslexia(m):
+    ev = []
+    reading, hearing, cognition = m["reading"], m["hearing"], m["cognition"]
+    if reading and reading.get("reading_risk") == "ABNORMAL":
+        ev.append((MODEL_LABEL, f"Reading fluency outside the normal range (LD score {reading.get('LD_score')})"))
+        threshold = reading.get("threshold")
+        if threshold and (reading.get("LD_score") or 0) >= 2 * threshold:
+            ev.append((MARKER, "LD score is more than twice the threshold"))
+    if "Fluency drops in longer text (working memory issue)" in _struggles(reading):
+        ev.append((MARKER, "Fluency drops on longer text"))
+    if "Poor phoneme discrimination (dyslexia marker)" in _struggles(hearing):
+        ev.append((MARKER, "Poor phoneme discrimination"))
+    if hearing and hearing.get("prediction") == "dyslexia":
+        ev.append((MARKER, "Auditory test pattern resembles dyslexia"))
+    if cognition and cognition.get("cognitive_prediction") == "dyslexia":
+        ev.append((MARKER, "Cognitive test pattern resembles dyslexia"))
+    return ev
+
+
+def _dysgraphia(m):
+    ev = []
+    handwriting = m["handwriting"]
+    risk = str(handwriting.get("handwriting_risk", "")) if handwriting else ""
+    if risk == "MILD IRREGULARITY":
+        ev.append((MARKER, "Mildly irregular line spacing in the handwriting sample"))
+    elif risk.startswith("HIGH RISK"):
+        ev.append((MODEL_LABEL + MARKER, f"Handwriting sample: {risk.lower()}"))
+    elif risk and risk != "NORMAL":
+        ev.append((0, f"Handwriting sample {risk.lower()}"))
+    if handwriting and (handwriting.get("risk_score") or 0) > 0.7:
+        ev.append((MARKER, f"Handwriting risk score {handwriting['risk_score']}"))
+    return ev
+
+
+def _dyscalculia(m):
+    ev = []
+    math, cognition = m["math"], m["cognition"]
+    if math:
+        prediction = math.get("prediction")
+        if MATH_RISK.get(prediction):
+            ev.append((MATH_RISK[prediction], f"Math screening: {prediction} ({math.get('confidence')}% confidence)"))
+        accuracy = (math.get("math_profile") or {}).get("accuracy")
+        if accuracy is not None and accuracy < 0.5:
+            ev.append((MARKER, f"{accuracy:.0%} of math questions correct"))
+    if cognition and cognition.get("cognitive_prediction") == "dyscalculia":
+        ev.append((MARKER, "Cognitive test pattern resembles dyscalculia"))
+    return ev
+
+
+def _apd(m):
+    ev = []
+    hearing = m["hearing"]
+    struggles = _struggles(hearing)
+    if hearing and hearing.get("prediction") == "apd":
+        ev.append((MODEL_LABEL, "Auditory test pattern resembles APD"))
+    if "Very slow auditory responses (auditory processing weakness)" in struggles:
+        ev.append((MARKER, f"{(hearing.get('features') or {}).get('slow_responses')} very slow responses to beeps"))
+    if "Weak auditory word comprehension" in struggles:
+        ev.append((MARKER, "Missed the spoken-word question"))
+    return ev
+
+
+def _nvld(m):
+    ev = []
+    cognition, handwriting, emotion = m["cognition"], m["handwriting"], m["emotion"]
+    if "Mirror image confusion (spatial processing weak)" in _struggles(cognition):
+        ev.append((MARKER, "Mirror image confusion"))
+    if "Weak image memory (forgets visual information)" in _struggles(cognition):
+        ev.append((MARKER, "Weak visual memory"))
+    if handwriting and str(handwriting.get("handwriting_risk", "")).startswith(("MILD", "HIGH")):
+        ev.append((MARKER, "Irregular handwriting layout"))
+    if emotion and EMOTION_RISK.get((emotion.get("emotion_prediction") or {}).get("result")):
+        ev.append((MARKER, "Difficulty reading facial expressions"))
+    return ev
+
+
+def _adhd(m):
+    ev = []
+    hearing, cognition, math = m["hearing"], m["cognition"], m["math"]
+    if hearing and hearing.get("prediction") == "adhd":
+        ev.append((MODEL_LABEL, "Auditory reaction pattern resembles ADHD"))
+    if cognition and cognition.get("cognitive_prediction") == "adhd":
+        ev.append((MODEL_LABEL, "Cognitive test pattern resembles ADHD"))
+    if "High impulsivity (clicked before hearing sound)" in _struggles(hearing):
+        ev.append((MARKER, "Clicked before the sound several times (impulsivity)"))
+    if "Poor sustained attention (missed beeps)" in _struggles(hearing):
+        ev.append((MARKER, "Missed several beeps"))
+    if ({"Inconsistent attention during math", "Inconsistent attention during tasks"}
+            & (_struggles(math) | _struggles(cognition))):
+        ev.append((MARKER, "Response times vary a lot between questions"))
+    return ev
+
+
+def _asd(m):
+    ev = []
+    emotion, hearing, cognition = m["emotion"], m["hearing"], m["cognition"]
+    if emotion:
+        result = (emotion.get("emotion_prediction") or {}).get("result")
+        if EMOTION_RISK.get(result):
+            ev.append((EMOTION_RISK[result], f"Emotion recognition model: {result}"))
+    if "Weak emotional recognition (possible social perception difficulty)" in _struggles(emotion):
+        ev.append((MARKER, "Recognized two or fewer of four emotions"))
+    if hearing and hearing.get("prediction") == "asd":
+        ev.append((MODEL_LABEL, "Auditory test pattern resembles ASD"))
+    if cognition and cognition.get("cognitive_prediction") == "asd":
+        ev.append((MODEL_LABEL, "Cognitive test pattern resembles ASD"))
+    return ev
+
+
+# disability -> (rule, modules it reads), in report order
+SCREENINGS = {
+    "Dyslexia": (_dyslexia, ["reading", "hearing", "cognition"]),
+    "Dysgraphia": (_dysgraphia, ["handwriting"]),
+    "Dyscalculia": (_dyscalculia, ["math", "cognition"]),
+    "Auditory Processing Disorder (APD)": (_apd, ["hearing"]),
+    "NVLD": (_nvld, ["cognition", "handwriting", "emotion"]),
+    "ADHD": (_adhd, ["hearing", "cognition", "math"]),
+    "ASD": (_asd, ["emotion", "hearing", "cognition"]),
+}
+
+
+def status_for(points):
+    for minimum, status in STATUS_POINTS:
+        if points >= minimum:
+            return status
+    return NOT_DETECTED
+
+
+def screen(full_json):
+    """[(disability, status, points, finding)] for every SCREENINGS entry."""
+    modules = {name: _module(full_json, name) for name in AREAS}
+    results = []
+    for disability, (rule, used) in SCREENINGS.items():
+        present = [name for name in used if modules[name]]
+        if not present:
+            results.append((disability, NOT_ASSESSED, 0, f"No {' / '.join(used)} results available"))
+            continue
+        evidence = rule(modules)
+        points = sum(p for p, _ in evidence)
+        finding = "; ".join(text for _, text in evidence) or f"No markers in the {' / '.join(present)} results"
+        results.append((disability, status_for(points), points, finding))
+    return results
+
+
+def _round_robin(per_module, limit):
+    """Takes one item per module in turn, so no single module fills the list."""
+    picked = []
+    queues = [(module, list(items)) for module, items in per_module if items]
+    while queues and len(picked) < limit:
+        for module, items in queues:
+            if items and len(picked) < limit:
+                picked.append({"area": AREAS.get(module, module.title()), "description": items.pop(0)})
+        queues = [(module, items) for module, items in queues if items]
+    return picked
+
+
+def synthesize(full_json):
+    """full_json (orchestrator.run_all_modules layout) -> report dict in the LLM schema."""
+    results = screen(full_json)
+    data = compact(full_json)   # deduplicated strengths / struggles per module
+
+    strengths = _round_robin([(m, p.get("strengths")) for m, p in data.items() if isinstance(p, dict)], MAX_STRENGTHS)
+    weaknesses = _round_robin([(m, p.get("struggles")) for m, p in data.items() if isinstance(p, dict)], MAX_WEAKNESSES)
+    if not strengths:
+        strengths = [{"area": "Engagement", "description": "Completed the screening tasks"}]
+
+    # Most points first; templates only for Medium Risk and above
+    ranked = sorted((r for r in results if r[2] > 0), key=lambda r: -r[2])
+    flagged = [r for r in ranked if r[1] in ("Medium Risk", "High Risk")]
+
+    precautions = []
+    for disability, *_ in flagged:
+        precautions += [p for p in PRECAUTIONS[disability] if p not in precautions]
+    precautions = (precautions or GENERAL_PRECAUTIONS)[:MAX_PRECAUTIONS]
+
+    activities = [ACTIVITIES[disability] for disability, *_ in ranked][:MAX_ACTIVITIES]
+    for activity in GENERAL_ACTIVITIES:
+        if len(activities) >= MIN_ACTIVITIES:
+            break
+        activities.append(activity)
+
+    therapies = []
+    for disability, *_ in flagged:
+        therapy, reason = THERAPIES[disability]
+        if all(t["therapy"] != therapy for t in therapies):
+            therapies.append({"therapy": therapy, "reason": reason})
+
+    overall = max((r[1] for r in results), key=STATUS_ORDER.index)
+    if flagged:
+        summary = f"{overall}: " + ", ".join(f"{d} ({s})" for d, s, _, _ in flagged)
+    elif overall == NOT_ASSESSED:
+        summary = "Not Assessed: no module results available"
+    else:
+        summary = f"{overall}: no screening reached Medium Risk"
+
+    return {
+        "screenings": [
+            {"disability": d, "status": s, "finding": f, "biological_cause": BIOLOGICAL_CAUSE[d]}
+            for d, s, _, f in results
+        ],
+        "child_profile": {
+            "strengths": strengths,
+            "weaknesses": weaknesses,
+            "parental_precautions": precautions,
+        },
+        "intervention_plan": {
+            "daily_activities": activities,
+            "therapeutic_recommendations": therapies or [MONITORING],
+        },
+        "risk_level_summary": summary,
+    }
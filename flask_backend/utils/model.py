@@ -1,18 +1,28 @@
-import joblib
+import numpy as np
 
-model = joblib.load("models/dysgraphia.pkl")
+from utils import registry
+from utils.forest import load_forest
+
+registry.register("math", lambda: load_forest("models/dysgraphia.pkl", registry.MODEL_MMAP))
 
 labels = ["Normal", "Low Risk", "Medium Risk", "High Risk", "Slow Learner"]
 
 def predict(features):
-    probs = model.predict_proba([features])[0]
-    pred = probs.argmax()
+    return predict_batch([features])[0]
+
+def predict_batch(X):
+    """One predict_proba call for an (n, 11) feature matrix."""
+    probs = registry.get("math").predict_proba(np.asarray(X, dtype=float))
+    preds = probs.argmax(axis=1)
 
-    return {
-        "prediction": labels[pred],
-        "confidence": round(float(probs[pred]) * 100, 2),
-        "probabilities": {
-            labels[i]: round(float(probs[i]) * 100, 2)
-            for i in range(len(labels))
+    return [
+        {
+            "prediction": labels[pred],
+            "confidence": round(float(p[pred]) * 100, 2),
+            "probabilities": {
+                labels[i]: round(float(p[i]) * 100, 2)
+                for i in range(len(labels))
+            }
         }
-    }
+        for p, pred in zip(probs, preds)
+    ]
@@ -1,49 +1,117 @@
-import torch
+import os
+import sys
 import joblib
 import numpy as np
+from contextlib import nullcontext
+
+from utils import registry
+from utils.features2 import READING_COLUMNS
+
+MODEL_PATH = os.path.join("models", "autoencoder.pt")
+SCALER_PATH = os.path.join("models", "scaler.pkl")
+EXPORT_PATH = os.path.join("models", "autoencoder.npz")   # weights as plain arrays
+
+# "numpy" = matmuls on the exported weights, web workers never import torch
+# "torch" = the original nn.Module (utils/autoencoder.py)
+READING_BACKEND = os.getenv("READING_BACKEND", "numpy")
+# Intra-op threads for this model (torch threads / BLAS threads); 0 = library default.
+# Keep at 1 when several Flask workers share the cores.
+READING_THREADS = int(os.getenv("READING_THREADS", "1"))
 
-class Autoencoder(torch.nn.Module):
-    def __init__(self):
-        super().__init__()
-        self.encoder = torch.nn.Sequential(
-            torch.nn.Linear(5,16), torch.nn.ReLU(),
-            torch.nn.Linear(16,8), torch.nn.ReLU(),
-            torch.nn.Linear(8,3)
-        )
-        self.decoder = torch.nn.Sequential(
-            torch.nn.Linear(3,8), torch.nn.ReLU(),
-            torch.nn.Linear(8,16), torch.nn.ReLU(),
-            torch.nn.Linear(16,5)
-        )
-
-    def forward(self,x):
-        return self.decoder(self.encoder(x))
-
-model = Autoencoder()
-model.load_state_dict(torch.load("models/autoencoder.pt"))
-model.eval()
-
-scaler = joblib.load("models/scaler.pkl")
 THRESHOLD = 0.0778   # from training
 
+_blas = None
+
+
+def set_threads(n):
+    """Changes the intra-op thread cap at runtime (e.g. from a worker init hook)."""
+    global READING_THREADS
+    READING_THREADS = int(n)
+    if "torch" in sys.modules and READING_THREADS > 0:
+        sys.modules["torch"].set_num_threads(READING_THREADS)
+
+
+def _load_numpy_weights():
+    # Export once (the only time this backend imports torch), or again if the .pt is newer
+    if not os.path.exists(EXPORT_PATH) or os.path.getmtime(EXPORT_PATH) < os.path.getmtime(MODEL_PATH):
+        from utils.autoencoder import export_numpy
+        export_numpy(MODEL_PATH, EXPORT_PATH)
+    with np.load(EXPORT_PATH) as data:
+        return [(data[f"w{i}"], data[f"b{i}"]) for i in range(len(data.files) // 2)]
+
+
+def _load_torch_model():
+    import torch
+    from utils.autoencoder import load_autoencoder
+    if READING_THREADS > 0:
+        torch.set_num_threads(READING_THREADS)
+    return load_autoencoder(MODEL_PATH)
+
+
+registry.register("reading_scaler", lambda: joblib.load(SCALER_PATH))
+registry.register("reading", _load_numpy_weights, default=READING_BACKEND != "torch")
+registry.register("reading_torch", _load_torch_model, default=READING_BACKEND == "torch")
+
+
+def _blas_limit():
+    """Context manager capping BLAS threads to READING_THREADS (no-op when 0)."""
+    global _blas
+    if READING_THREADS <= 0:
+        return nullcontext()
+    if _blas is None:
+        from threadpoolctl import ThreadpoolController
+        _blas = ThreadpoolController()
+    return _blas.limit(limits=READING_THREADS, user_api="blas")
+
+
+def scale(X):
+    """(n, 5) raw features in READING_COLUMNS order -> scaled float32 model input."""
+    # MinMaxScaler.transform is X * scale_ + min_; done inline, without
+    # sklearn's per-call validation
+    scaler = registry.get("reading_scaler")
+    X = np.array(X, dtype=np.float64).reshape(-1, len(READING_COLUMNS))
+    X *= scaler.scale_
+    X += scaler.min_
+    return X.astype(np.float32)
+
+
+def reconstruction_errors(X):
+    """
+    Per-row mean squared reconstruction error for an (n, 5) matrix of raw
+    reading features (READING_COLUMNS order), as an (n,) float32 array.
+    """
+    x = scale(X)
+
+    if READING_BACKEND == "torch":
+        import torch
+        with torch.no_grad():
+            xt = torch.from_numpy(x)
+            return torch.mean((xt - registry.get("reading_torch")(xt)) ** 2, dim=1).numpy()
+
+    weights = registry.get("reading")
+    h = x
+    with _blas_limit():
+        for i, (w, b) in enumerate(weights):
+            h = h @ w
+            h += b
+            # ReLU after every layer except the bottleneck and the output (utils.autoencoder.LAYERS)
+            if i not in (2, len(weights) - 1):
+                np.maximum(h, 0, out=h)
+    return np.mean((x - h) ** 2, axis=1)
+
+
+def predict_batch(X):
+    """One forward pass for an (n, 5) feature matrix (utils.features2.extract_features_batch)."""
+    errors = reconstruction_errors(X)
+    return [
+        {
+            "LD_score": float(error),
+            "threshold": THRESHOLD,
+            "status": "ABNORMAL" if error > THRESHOLD else "NORMAL"
+        }
+        for error in errors
+    ]
+
+
 def predict(features):
-    x = np.array([[ 
-        features["avg_pause"],
-        features["max_pause"],
-        features["pause_count"],
-        features["wpm"],
-        features["total_words"]
-    ]])
-
-    x = scaler.transform(x)
-    x = torch.tensor(x, dtype=torch.float32)
-
-    with torch.no_grad():
-        recon = model(x)
-        error = torch.mean((x - recon)**2).item()
-
-    return {
-        "LD_score": error,
-        "threshold": THRESHOLD,
-        "status": "ABNORMAL" if error > THRESHOLD else "NORMAL"
-    }
+    return predict_batch([[features[c] for c in READING_COLUMNS]])[0]
@@ -2,28 +2,41 @@ import joblib
 import numpy as np
 import os
 
+from utils import registry
+from utils.forest import load_forest
+
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 MODEL_PATH = os.path.join(BASE_DIR, "models", "emotion_model.pkl")
 ENCODER_PATH = os.path.join(BASE_DIR, "models", "label_encoder.pkl")
 
-model = joblib.load(MODEL_PATH)
-encoder = joblib.load(ENCODER_PATH)
+registry.register("emotion", lambda: load_forest(MODEL_PATH, registry.MODEL_MMAP))
+registry.register("emotion_encoder", lambda: joblib.load(ENCODER_PATH))
 
 def predict(features):
     """
     features = [happy, sad, angry, crying, happy_rt, sad_rt, angry_rt, crying_rt]
     """
+    return predict_batch(np.array(features).reshape(1, -1))[0]
 
-    X = np.array(features).reshape(1, -1)
-
-    pred = model.predict(X)[0]
-    probs = model.predict_proba(X)[0]
-
-    label = encoder.inverse_transform([pred])[0]
-    confidence = float(max(probs)) * 100
-
-    return {
-        "result": label,
-        "confidence": round(confidence, 2)
-    }
+def predict_batch(X):
+    """
+    X: (n, 8) matrix of emotion features, one row per session
+    """
+    X = np.asarray(X)
+    model = registry.get("emotion")
+    encoder = registry.get("emotion_encoder")
+
+    preds = model.predict(X)
+    probs = model.predict_proba(X)
+
+    labels = encoder.inverse_transform(preds)
+    confidences = probs.max(axis=1) * 100
+
+    return [
+        {
+            "result": label,
+            "confidence": round(float(confidence), 2)
+        }
+        for label, confidence in zip(labels, confidences)
+    ]
@@ -0,0 +1,166 @@
+"""
+Compact report data for the LLM prompt.
+
+The prompt only needs each module's verdict, a few summary numbers and
+the strengths / struggles lists. Per-question tables, raw audio
+features, class probabilities and thresholds are dropped, floats are
+rounded to FLOAT_DIGITS significant digits, a strength or struggle
+already listed by an earlier module is not repeated, and the result is
+dumped as JSON without whitespace. If the estimate is still over
+PROMPT_TOKEN_BUDGET, detail is trimmed in TRIM_STEPS order.
+"""
+import os
+import re
+import json
+
+PROMPT_COMPACT = os.getenv("PROMPT_COMPACT", "1").lower() in ("1", "true", "yes")
+# Estimated tokens for the data block (the template itself is ~560); 0 = no limit
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "600"))
+FLOAT_DIGITS = 4   # significant; fewer would re-round the 2-decimal values analyzers return
+MAX_LIST_ITEMS = 3    # strengths / struggles per module after the "lists" trim step
+MAX_ERROR_CHARS = 120
+
+# full_json key -> fields the prompt uses, in output order. Modules not
+# listed here are passed through (rounded, lists deduplicated).
+KEEP_FIELDS = {
+    "math": ["prediction", "confidence", "math_profile"],
+    "reading": ["reading_risk", "LD_score"],
+    "emotion": ["emotion_prediction"],
+    "hearing": ["prediction", "features"],
+    "cognition": ["cognitive_prediction", "test6_scores", "test6_times"],
+    "handwriting": ["handwriting_risk", "risk_score"],
+}
+# Analyzers name the lists either way; the payload uses the first name
+STRENGTH_KEYS = ("child_strengths", "strengths")
+STRUGGLE_KEYS = ("child_struggles", "weaknesses")
+LIST_NAMES = {"strengths": STRENGTH_KEYS, "struggles": STRUGGLE_KEYS}
+LIST_KEYS = set(STRENGTH_KEYS + STRUGGLE_KEYS)
+SKIP_KEYS = {"session_id"}
+
+# Applied one after another until the data fits the budget
+TRIM_STEPS = {
+    "details": {"math": ["math_profile"], "hearing": ["features"], "cognition": ["test6_times", "test6_scores"]},
+    "lists": None,      # keep MAX_LIST_ITEMS per list
+    "verdicts": None,   # drop the lists altogether
+}
+
+# Rough BPE count: a word with its leading space, up to 3 digits, or one
+# or two punctuation marks per token. Counts a little high for English
+# with Llama-3 style tokenizers, which is the safe side for a budget.
+TOKEN_RE = re.compile(r" ?[^\W\d_]+| ?\d{1,3}|\s+|[^\w\s]{1,2}")
+
+
+def estimate_tokens(text):
+    return len(TOKEN_RE.findall(text))
+
+
+def round_floats(obj, digits=FLOAT_DIGITS):
+    """Copy with floats at `digits` significant digits (whole ones as ints), numpy values as Python ones."""
+    if isinstance(obj, dict):
+        return {str(k): round_floats(v, digits) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [round_floats(v, digits) for v in obj]
+    if hasattr(obj, "tolist"):   # numpy scalar / array
+        return round_floats(obj.tolist(), digits)
+    if isinstance(obj, float):
+        if obj != obj or obj in (float("inf"), float("-inf")):
+            return None
+        obj = float(f"{obj:.{digits}g}") + 0.0
+        return int(obj) if obj.is_integer() else obj
+    return obj
+
+
+def _seen_key(text):
+    return " ".join(str(text).lower().split())
+
+
+def compact(full_json):
+    """
+    full_json (orchestrator.run_all_modules layout) -> the dict sent to
+    the LLM: kept fields only, rounded, strengths / struggles as sorted
+    lists without repeats across modules.
+    """
+    seen = {name: set() for name in LIST_NAMES}
+    data = {}
+
+    for module, payload in full_json.items():
+        if module in SKIP_KEYS:
+            continue
+        if not isinstance(payload, dict):
+            data[module] = round_floats(payload)
+            continue
+        if "error" in payload:
+            data[module] = {"error": str(payload["error"])[:MAX_ERROR_CHARS]}
+            continue
+
+        fields = KEEP_FIELDS.get(module)
+        if fields is None:
+            fields = [k for k in payload if k not in LIST_KEYS and k not in SKIP_KEYS]
+        out = {k: round_floats(payload[k]) for k in fields if k in payload}
+
+        for name, keys in LIST_NAMES.items():
+            items = []
+            for key in keys:
+                for item in payload.get(key) or []:
+                    norm = _seen_key(item)
+                    if norm and norm not in seen[name]:
+                        seen[name].add(norm)
+                        items.append(str(item).strip())
+            if items:
+                # analyzers build these from sets; sorting keeps the prompt (and cache key) stable
+                out[name] = sorted(items)
+
+        data[module] = out
+    return data
+
+
+def dumps(data):
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _trim(data, step):
+    trimmed = {}
+    for module, payload in data.items():
+        if not isinstance(payload, dict):
+            trimmed[module] = payload
+            continue
+        payload = dict(payload)
+        if step == "details":
+            for field in TRIM_STEPS["details"].get(module, []):
+                payload.pop(field, None)
+        else:
+            for name in LIST_NAMES:
+                if name in payload:
+                    if step == "lists":
+                        payload[name] = payload[name][:MAX_LIST_ITEMS]
+                    else:
+                        del payload[name]
+        trimmed[module] = payload
+    return trimmed
+
+
+def fit_budget(data, budget=None):
+    """
+    Trims data step by step until dumps(data) is estimated at or under
+    budget tokens. Returns (data, text, tokens); the last step's result
+    is returned even if it is still over.
+    """
+    budget = PROMPT_TOKEN_BUDGET if budget is None else budget
+    text = dumps(data)
+    tokens = estimate_tokens(text)
+
+    for step in TRIM_STEPS:
+        if not budget or tokens <= budget:
+            break
+        data = _trim(data, step)
+        text = dumps(data)
+        tokens = estimate_tokens(text)
+        print(f"[PROMPT] Over budget, trimmed {step}: ~{tokens} tokens (budget {budget})")
+
+    return data, text, tokens
+
+
+def build(full_json, budget=None):
+    """full_json -> (data, text) for the prompt: compact() then fit_budget()."""
+    data, text, _ = fit_budget(compact(full_json), budget)
+    return data, text
@@ -0,0 +1,82 @@
+"""
+Process-wide model registry. Model modules register a loader at import
+(cheap); the model is loaded on first use, once per process, and shared by
+all threads. warmup() loads models up front: from the /warmup route, or in
+the gunicorn master before it forks workers (PRELOAD_MODELS, see
+gunicorn.conf.py) so the workers share those pages copy-on-write.
+"""
+import os
+import time
+import threading
+
+# Pickled forests are opened with joblib mmap_mode (numpy arrays in the
+# pickle are mapped from the page cache instead of copied); "" disables
+MODEL_MMAP = os.getenv("MODEL_MMAP", "r") or None
+# Comma-separated names (or "all") loaded when the app is imported
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "")
+
+_loaders = {}
+_defaults = []   # what warmup() / "all" loads
+_models = {}
+_load_ms = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def register(name, loader, default=True):
+    """
+    loader() -> model object; called at most once per process.
+    default=False keeps it out of warmup("all") (e.g. an inactive backend).
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        if default and name not in _defaults:
+            _defaults.append(name)
+
+
+def get(name):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    if name not in _loaders:
+        raise KeyError(f"Unknown model '{name}', registered: {sorted(_loaders)}")
+
+    # Per-model lock: a slow Whisper load doesn't block the forests
+    with _locks[name]:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = _loaders[name]()
+            _load_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+            print(f"[MODELS] Loaded {name} in {_load_ms[name]} ms (pid {os.getpid()})")
+    return _models[name]
+
+
+def warmup(names=None):
+    """
+    Loads the given models (list, comma string, "all" or None = all
+    default models). Returns {name: load ms} (0 if already loaded).
+    Unknown names raise KeyError before anything is loaded.
+    """
+    if names is None or names == "all":
+        names = list(_defaults)
+    elif isinstance(names, str):
+        names = [n.strip() for n in names.split(",") if n.strip()]
+
+    unknown = [n for n in names if n not in _loaders]
+    if unknown:
+        raise KeyError(f"Unknown models {unknown}, registered: {sorted(_loaders)}")
+
+    timings = {}
+    for name in names:
+        loaded = name in _models
+        get(name)
+        timings[name] = 0.0 if loaded else _load_ms[name]
+    return timings
+
+
+def stats():
+    return {
+        "registered": sorted(_loaders),
+        "loaded": {name: _load_ms[name] for name in _models},
+    }
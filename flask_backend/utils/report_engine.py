@@ -0,0 +1,79 @@
+"""
+Picks who writes the report text (REPORT_ENGINE):
+  llm   - Groq only (default); None when it fails (the route answers 502
+          and the worker retries the job later)
+  local - utils/local_report.py only: offline, deterministic, instant
+  auto  - Groq, but if it fails or takes longer than LLM_SLA_SECONDS the
+          local report is used. A slow call keeps running in the
+          background and its reply still lands in the LLM cache.
+          Opt-in: a local_fallback report is final, the session is not
+          sent to the LLM again.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from utils.groq_api import send_to_groq
+from utils.llm_client import GROQ_MAX_INFLIGHT
+from utils.local_report import synthesize
+
+REPORT_ENGINE = os.getenv("REPORT_ENGINE", "llm")
+LLM_SLA_SECONDS = float(os.getenv("LLM_SLA_SECONDS", "30"))
+ENGINES = ("llm", "local", "auto")
+
+# Slow calls that outlive their SLA still hold a thread; bounded so they queue
+_executor = ThreadPoolExecutor(max_workers=GROQ_MAX_INFLIGHT * 2, thread_name_prefix="llm")
+
+_stats = {"llm": 0, "local": 0, "fallback_error": 0, "fallback_sla": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def generate_report(full_json, engine=None):
+    """
+    Returns (report, engine_used). report is the LLM's JSON text or the
+    local report dict (create_pdf takes both), or None if the llm engine
+    failed. engine_used is "llm", "local" or "local_fallback".
+    """
+    engine = engine or REPORT_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown REPORT_ENGINE '{engine}', expected one of {ENGINES}")
+
+    if engine == "local":
+        _count("local")
+        return synthesize(full_json), "local"
+
+    if engine == "llm":
+        report = send_to_groq(full_json)
+        if report is not None:
+            _count("llm")
+        return report, "llm"
+
+    future = _executor.submit(send_to_groq, full_json)
+    try:
+        report = future.result(timeout=LLM_SLA_SECONDS)
+    except TimeoutError:
+        future.cancel()   # only stops it if it was still queued
+        print(f"[REPORT] LLM missed the {LLM_SLA_SECONDS:.0f}s SLA, using the local report")
+        _count("fallback_sla")
+        return synthesize(full_json), "local_fallback"
+    except Exception as e:
+        print(f"[REPORT] LLM error: {e}")
+        report = None
+
+    if report is None:
+        print("[REPORT] LLM failed, using the local report")
+        _count("fallback_error")
+        return synthesize(full_json), "local_fallback"
+
+    _count("llm")
+    return report, "llm"
+
+
+def stats():
+    with _stats_lock:
+        return {"engine": REPORT_ENGINE, "sla_seconds": LLM_SLA_SECONDS, **_stats}
@@ -1,16 +1,184 @@
-from faster_whisper import WhisperModel
+import io
+import os
+import json
+import queue
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-model = WhisperModel("medium", device="cpu", compute_type="int8")
+from utils import registry
 
-def transcribe(audio_path):
-    segments, _ = model.transcribe(audio_path, word_timestamps=True)
-    words = []
+# Speed profiles. The reading features only use word start/end times, so the
+# cheaper profiles drop beam search, temperature fallback and text
+# conditioning, and let VAD skip silence before decoding (timestamps are
+# still reported on the original timeline, so pauses are preserved).
+PROFILES = {
+    "accurate": {"model_size": "medium", "beam_size": 5, "vad_filter": False, "fast_decode": False},
+    "balanced": {"model_size": "small",  "beam_size": 1, "vad_filter": True,  "fast_decode": True},
+    "fast":     {"model_size": "base",   "beam_size": 1, "vad_filter": True,  "fast_decode": True},
+    "fastest":  {"model_size": "tiny",   "beam_size": 1, "vad_filter": True,  "fast_decode": True},
+}
 
-    for seg in segments:
-        for w in seg.words:
-            words.append({
-                "start": w.start,
-                "end": w.end
-            })
+PROFILE = os.getenv("WHISPER_PROFILE", "accurate")
+POOL_SIZE = int(os.getenv("WHISPER_POOL_SIZE", "2"))
+CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("cache", "transcripts"))
 
-    return words
+
+def get_profile(name=PROFILE, **overrides):
+    """
+    Profile settings with env overrides (WHISPER_MODEL, WHISPER_BEAM_SIZE,
+    WHISPER_VAD, WHISPER_CPU_THREADS) and then explicit keyword overrides.
+    cpu_threads=0 means "split the cores evenly across the pool".
+    """
+    if name not in PROFILES:
+        raise ValueError(f"Unknown Whisper profile '{name}', choose from {list(PROFILES)}")
+
+    profile = dict(PROFILES[name], cpu_threads=0)
+    if os.getenv("WHISPER_MODEL"):
+        profile["model_size"] = os.getenv("WHISPER_MODEL")
+    if os.getenv("WHISPER_BEAM_SIZE"):
+        profile["beam_size"] = int(os.getenv("WHISPER_BEAM_SIZE"))
+    if os.getenv("WHISPER_VAD"):
+        profile["vad_filter"] = os.getenv("WHISPER_VAD").lower() in ("1", "true", "yes")
+    if os.getenv("WHISPER_CPU_THREADS"):
+        profile["cpu_threads"] = int(os.getenv("WHISPER_CPU_THREADS"))
+
+    profile.update(overrides)
+    return profile
+
+
+def _load_cached(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _store_cached(path, words):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"   # unique per writer thread
+    with open(tmp, "w") as f:
+        json.dump(words, f)
+    os.replace(tmp, path)   # atomic, concurrent writers can't corrupt an entry
+
+
+class Transcriber:
+    """
+    A warm pool of Whisper instances for one profile plus the on-disk
+    word-timestamp cache (keyed by SHA-256 of the audio and the profile).
+    """
+
+    def __init__(self, profile=None, pool_size=POOL_SIZE, cache_dir=CACHE_DIR):
+        self.profile = profile or get_profile()
+        self.pool_size = pool_size
+        self.cache_dir = cache_dir
+
+        # Split the cores between instances so parallel clips don't oversubscribe
+        threads = self.profile["cpu_threads"] or max(1, (os.cpu_count() or 1) // pool_size)
+
+        # Warm pool: each instance serves one clip at a time
+        # Imported here so importing the app doesn't pull in ctranslate2
+        from faster_whisper import WhisperModel
+        self._models = queue.Queue()
+        for _ in range(pool_size):
+            self._models.put(WhisperModel(
+                self.profile["model_size"], device="cpu", compute_type="int8", cpu_threads=threads
+            ))
+
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="whisper")
+
+        self._cache_key = "{model_size}-b{beam_size}-vad{vad}-{mode}".format(
+            model_size=self.profile["model_size"],
+            beam_size=self.profile["beam_size"],
+            vad=int(self.profile["vad_filter"]),
+            mode="fast" if self.profile["fast_decode"] else "full",
+        )
+
+    def _decode_options(self):
+        options = {
+            "word_timestamps": True,
+            "beam_size": self.profile["beam_size"],
+            "vad_filter": self.profile["vad_filter"],
+        }
+        if self.profile["fast_decode"]:
+            options.update(best_of=1, temperature=0.0, condition_on_previous_text=False)
+        return options
+
+    @staticmethod
+    def _audio_bytes(audio):
+        """Raw bytes of a path, bytes or file-like clip, for hashing."""
+        if isinstance(audio, str):
+            with open(audio, "rb") as f:
+                return f.read()
+        if isinstance(audio, (bytes, bytearray)):
+            return audio
+        if hasattr(audio, "getbuffer"):
+            return audio.getbuffer()   # BytesIO: hash without copying
+        audio.seek(0)
+        data = audio.read()
+        audio.seek(0)
+        return data
+
+    def _cache_path(self, audio_bytes):
+        digest = hashlib.sha256(audio_bytes).hexdigest()
+        return os.path.join(self.cache_dir, self._cache_key, f"{digest}.json")
+
+    def run_whisper(self, audio):
+        """Uncached transcription on a pooled model. audio: path, bytes or file-like."""
+        if isinstance(audio, (bytes, bytearray)):
+            audio = io.BytesIO(audio)
+        elif hasattr(audio, "seek"):
+            audio.seek(0)
+
+        model = self._models.get()
+        try:
+            segments, _ = model.transcribe(audio, **self._decode_options())
+            words = []
+
+            for seg in segments:
+                for w in seg.words:
+                    words.append({
+                        "start": w.start,
+                        "end": w.end
+                    })
+
+            return words
+        finally:
+            self._models.put(model)
+
+    def transcribe(self, audio):
+        """
+        Word timestamps for one clip (path, bytes or in-memory file).
+        Results are cached on disk by the SHA-256 of the audio bytes, so
+        retries and re-scoring skip Whisper.
+        """
+        cache_path = self._cache_path(self._audio_bytes(audio))
+
+        words = _load_cached(cache_path)
+        if words is not None:
+            return words
+
+        words = self.run_whisper(audio)
+        _store_cached(cache_path, words)
+        return words
+
+    def transcribe_many(self, clips):
+        """Transcribes clips concurrently on the model pool, results in input order."""
+        return list(self._executor.map(self.transcribe, clips))
+
+
+registry.register("whisper", Transcriber)
+
+
+def get_transcriber():
+    """Process-wide Transcriber for WHISPER_PROFILE, loaded on first use."""
+    return registry.get("whisper")
+
+
+def transcribe(audio):
+    return get_transcriber().transcribe(audio)
+
+
+def transcribe_many(clips):
+    return get_transcriber().transcribe_many(clips)
@@ -1,16 +1,20 @@
-import joblib
 import os
 
+from utils import registry
+from utils.forest import load_forest
+
 MODEL_PATH = os.path.join("models", "test5_model.pkl")
 
-_model = None
+registry.register("hearing", lambda: load_forest(MODEL_PATH, registry.MODEL_MMAP))
 
 def get_model():
-    global _model
-    if _model is None:
-        _model = joblib.load(MODEL_PATH)
-    return _model
+    return registry.get("hearing")
 
 def predict_test5(features):
     model = get_model()
     return model.predict([features])[0]
+
+def predict_test5_batch(X):
+    """Predicted labels for an (n, 9) feature matrix."""
+    model = get_model()
+    return model.predict(X).tolist()
@@ -1,6 +1,11 @@
-import joblib
+from utils import registry
+from utils.forest import load_forest
 
-model=joblib.load("models/test6_model.pkl")
+registry.register("cognition", lambda: load_forest("models/test6_model.pkl", registry.MODEL_MMAP))
 
 def predict_test6(features):
-    return model.predict([features])[0]
+    return registry.get("cognition").predict([features])[0]
+
+def predict_test6_batch(X):
+    """Predicted labels for an (n, 14) feature matrix."""
+    return registry.get("cognition").predict(X).tolist()
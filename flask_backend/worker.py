@@ -1,46 +1,105 @@
+import os
 import time
+import socket
+import threading
 import requests
-from utils.db import get_connection
+from utils.job_queue import (
+    enqueue, enqueue_missing, claim, complete, fail, reap_expired,
+    queue_stats, listen, ensure_schema
+)
 
-API_URL = "http://127.0.0.1:5000/predict/full_report"
+API_URL = os.getenv("REPORT_API_URL", "http://127.0.0.1:5000/predict/full_report")
+WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REQUEST_TIMEOUT = int(os.getenv("REPORT_TIMEOUT", "300"))   # keep below JOB_LEASE_SECONDS
+POLL_INTERVAL = int(os.getenv("WORKER_POLL_INTERVAL", "10")) # fallback when no NOTIFY arrives
+SWEEP_INTERVAL = int(os.getenv("WORKER_SWEEP_INTERVAL", "300"))
 
-print("🧠 NeuroBloom Worker running...")
+# Set by LISTEN / sweeps so idle workers claim immediately
+wake = threading.Event()
 
-while True:
-    try:
-        conn = get_connection()
-        cur = conn.cursor()
 
-        cur.execute("""
-            SELECT id FROM child_assessment_features
-            WHERE report_url IS NULL
-        """)
+def on_new_session(session_id):
+    print("📩 New child inserted:", session_id)
+    enqueue(session_id)
+    wake.set()
 
-        rows = cur.fetchall()
-        conn.close()
 
-        if rows:
-            print(f"📋 Found {len(rows)} unprocessed children")
+def listen_loop():
+    while True:
+        try:
+            listen(on_new_session)
+        except Exception as e:
+            print("LISTEN error, reconnecting:", e)
+            time.sleep(5)
 
-        for (session_id,) in rows:
-            print("⚙️ Processing:", session_id)
 
-            try:
-                r = requests.post(
-                    API_URL,
-                    json={"session_id": session_id},
-                    timeout=120
-                )
+def sweep_loop():
+    while True:
+        try:
+            added = enqueue_missing()
+            reaped = reap_expired()
+            if added:
+                print(f"📋 Queued {added} unprocessed children")
+                wake.set()
+            if reaped:
+                print(f"⏱️ {reaped} jobs failed after lease expiry")
+            print("📊 Queue:", queue_stats())
+        except Exception as e:
+            print("DB error:", e)
+        time.sleep(SWEEP_INTERVAL)
 
-                if r.status_code == 200:
-                    print("✅ Report generated for", session_id)
-                else:
-                    print("❌ API error", r.text)
 
-            except Exception as e:
-                print("❌ Request failed:", e)
+def work_loop(worker_id):
+    http = requests.Session()
 
-    except Exception as e:
-        print("DB error:", e)
+    while True:
+        try:
+            job = claim(worker_id)
+        except Exception as e:
+            print("DB error:", e)
+            time.sleep(POLL_INTERVAL)
+            continue
 
-    time.sleep(60)   # wait 1 minute
+        if job is None:
+            wake.wait(POLL_INTERVAL)
+            wake.clear()
+            continue
+
+        session_id, attempt = job
+        print(f"⚙️ [{worker_id}] Processing: {session_id} (attempt {attempt})")
+
+        try:
+            r = http.post(API_URL, json={"session_id": session_id}, timeout=REQUEST_TIMEOUT)
+
+            if r.status_code == 200:
+                complete(session_id, worker_id)
+                print("✅ Report generated for", session_id)
+                continue
+            error = f"HTTP {r.status_code}: {r.text[:500]}"
+        except Exception as e:
+            error = f"Request failed: {e}"
+
+        try:
+            final = fail(session_id, worker_id, attempt, error)
+            print("❌", "Giving up on" if final else "Will retry", session_id, "-", error)
+        except Exception as e:
+            print("DB error:", e)
+
+
+if __name__ == "__main__":
+    print("🧠 NeuroBloom Worker running...")
+    ensure_schema()
+
+    host = socket.gethostname()
+    threads = [
+        threading.Thread(target=listen_loop, daemon=True),
+        threading.Thread(target=sweep_loop, daemon=True),
+    ] + [
+        threading.Thread(target=work_loop, args=(f"{host}:{os.getpid()}:{i}",), daemon=True)
+        for i in range(WORKERS)
+    ]
+    for t in threads:
+        t.start()
+
+    while True:
+        time.sleep(3600)